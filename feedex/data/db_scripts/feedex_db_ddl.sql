@@ -1,3 +1,4 @@
+PRAGMA auto_vacuum=INCREMENTAL;
 BEGIN TRANSACTION;
 
 
@@ -195,6 +196,8 @@ CREATE INDEX IF NOT EXISTS "idx_entries_read" ON "entries" ("read" ASC);
 CREATE INDEX IF NOT EXISTS "idx_entries_note" ON "entries" ("note" ASC);
 CREATE INDEX IF NOT EXISTS "idx_entries_ix_id" ON "entries" ("ix_id" ASC);
 CREATE INDEX IF NOT EXISTS "idx_entries_ix_id_desc" ON "entries" ("ix_id" DESC);
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_guid" ON "entries" ( "feed_id", "guid" );
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_link" ON "entries" ( "feed_id", "link" );
 
 
 
@@ -228,6 +231,12 @@ CREATE INDEX IF NOT EXISTS "idx_terms_term_desc" ON "terms" ( "term" DESC);
 CREATE INDEX IF NOT EXISTS "idx_terms_context_id" ON "terms" ( "context_id"	ASC );
 CREATE INDEX IF NOT EXISTS "idx_terms_context_id_desc" ON "terms" ( "context_id"	DESC );
 
+
+-- Aggregate tables with their triggers (terms_agg, entry_keywords) are created by DB_UPGRADE_SQL from feedex_data.py
+
+
+
 INSERT INTO params (name, val) VALUES ('doc_count',0);
+INSERT INTO params (name, val) VALUES ('terms_agg',1);
 
 COMMIT;
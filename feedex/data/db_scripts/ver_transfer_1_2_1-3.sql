@@ -0,0 +1,8 @@
+BEGIN TRANSACTION;
+
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_guid" ON "entries" ( "feed_id", "guid" );
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_link" ON "entries" ( "feed_id", "link" );
+
+-- Aggregate tables are created on connect (DB_UPGRADE_SQL in feedex_data.py)
+
+COMMIT;
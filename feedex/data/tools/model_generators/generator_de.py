@@ -26,6 +26,11 @@ Change model data and run the script to generate header file, and then copy it t
 
 import pickle 
 import snowballstemmer
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+from smallsem_model import save_model
 
 
 
@@ -2102,3 +2107,5 @@ filename = model['names'][0] + '_model.pkl'
 with open(filename, "wb") as write_file:
     pickle.dump(model, write_file)
 
+# Generate compact model file (read lazily by SmallSem, pickle is a fallback)
+save_model(model, model['names'][0] + '_model.ssm')
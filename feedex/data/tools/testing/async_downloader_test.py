@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+""" Test for FeedexAsyncDownloader against a local HTTP server.
+    Checks plain responses, conditional requests (304 with ETag), redirects, redirect loops, keep-alive connection reuse,
+    streaming responses in order of completion, cancelling on close,
+    chunked and gzip-encoded bodies, bodies read until connection is closed, size limit and timeouts.
+
+    Usage: async_downloader_test.py
+    Exit status is 1 if any check fails """
+
+
+import sys
+import os
+import gzip
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+
+from feedex_headers import *
+
+
+
+
+BODY = b'<?xml version="1.0"?><rss version="2.0"><channel><title>Test</title></channel></rss>'
+ETAG = '"v1"'
+
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """ Serves test cases by path """
+    protocol_version = 'HTTP/1.1'
+    connections = set() # Client ports of all requests - to check keep-alive
+    lock = threading.Lock()
+
+    def log_message(self, *args): pass
+
+    def _send(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for k,v in headers: self.send_header(k, v)
+        if status not in {204, 304,}: self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status not in {204, 304,}: self.wfile.write(body)
+
+    def do_GET(self):
+        with self.lock: self.connections.add(self.client_address[1])
+        path = self.path.split('?')[0]
+
+        if path == '/ok': self._send(200, BODY, (('Content-Type','application/rss+xml'),))
+
+        elif path == '/etag':
+            if self.headers.get('If-None-Match') == ETAG: self._send(304, headers=(('ETag',ETAG),))
+            else: self._send(200, BODY, (('ETag',ETAG),))
+
+        elif path == '/moved': self._send(301, headers=(('Location','/ok'),))
+        elif path == '/found': self._send(302, headers=(('Location','/temp'),))
+        elif path == '/temp': self._send(307, headers=(('Location',f'http://127.0.0.1:{self.server.server_port}/ok'),))
+        elif path == '/loop': self._send(302, headers=(('Location','/loop'),))
+
+        elif path == '/chunked':
+            data = gzip.compress(BODY)
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            for i in range(0, len(data), 7): self.wfile.write(f'{len(data[i:i+7]):x}\r\n'.encode() + data[i:i+7] + b'\r\n')
+            self.wfile.write(b'0\r\n\r\n')
+
+        elif path == '/close':
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(BODY)
+            self.close_connection = True
+
+        elif path == '/big': self._send(200, b'x' * 4096)
+
+        elif path == '/slow':
+            time.sleep(3)
+            self._send(200, BODY)
+
+        else: self._send(404, b'Not found')
+
+
+
+
+class StandInServer(ThreadingHTTPServer):
+    """ All requests are sent at once, so default listen backlog (5) is too small """
+    request_queue_size = 64
+    daemon_threads = True
+
+    def handle_error(self, request, client_address): pass # Cancelled downloads close connections early
+
+
+
+def check(name, cond, details=''):
+    print(f"""{'OK  ' if cond else 'FAIL'} {name} {'' if cond else details}""")
+    return cond
+
+
+
+
+if __name__ == '__main__':
+
+    fdx.config = {}
+
+    server = StandInServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    results = []
+    dl = FeedexAsyncDownloader(timeout=1, per_host=20, max_redirects=3, max_size=1024)
+
+    reqs = [(f'{base}/ok', {}), (f'{base}/etag', {}), (f'{base}/etag', {'If-None-Match':ETAG}), (f'{base}/moved', {}), (f'{base}/found', {}),
+            (f'{base}/loop', {}), (f'{base}/chunked', {}), (f'{base}/close', {}), (f'{base}/big', {}), (f'{base}/slow', {}), (f'{base}/missing', {}),]
+    ok, etag, not_mod, moved, found, loop, chunked, close, big, slow, missing = dl.download_many(reqs)
+
+    results.append(check('200', ok['status'] == 200 and ok['body'] == BODY and ok['error'] is None, ok))
+    results.append(check('200 with ETag', etag['status'] == 200 and etag['headers'].get('etag') == ETAG, etag))
+    results.append(check('304 for matching ETag', not_mod['status'] == 304 and not_mod['body'] == b'' and not_mod['headers'].get('etag') == ETAG, not_mod))
+    results.append(check('301 redirect', moved['status'] == 301 and moved['href'] == f'{base}/ok' and moved['body'] == BODY, moved))
+    results.append(check('302 -> 307 redirects', found['status'] == 302 and found['href'] == f'{base}/ok' and found['body'] == BODY, found))
+    results.append(check('Redirect loop', loop['status'] is None and loop['error'] is not None, loop))
+    results.append(check('Chunked gzip body', chunked['status'] == 200 and chunked['body'] == BODY, chunked))
+    results.append(check('Body read until close', close['status'] == 200 and close['body'] == BODY, close))
+    results.append(check('Size limit', big['status'] is None and big['error'] is not None, big))
+    results.append(check('Timeout', slow['status'] is None and slow['error'] is not None, slow))
+    results.append(check('404', missing['status'] == 404, missing))
+
+    # With one connection per host, sequential requests should reuse kept-alive connection
+    StandInHandler.connections.clear()
+    resps = FeedexAsyncDownloader(timeout=5, per_host=1).download_many([(f'{base}/ok', {}) for i in range(10)])
+    results.append(check('Keep-alive', all([r['status'] == 200 for r in resps]) and len(StandInHandler.connections) == 1, StandInHandler.connections))
+
+    # Responses should be yielded as they complete, not after the slowest one
+    start = time.time()
+    first = None
+    for i, r in FeedexAsyncDownloader(timeout=5, per_host=20).download_iter([(f'{base}/slow', {}), (f'{base}/ok', {})]):
+        if first is None: first = (i, time.time() - start)
+    results.append(check('Streamed responses', first is not None and first[0] == 1 and first[1] < 1, first))
+
+    # Closing iteration early should cancel pending downloads
+    start = time.time()
+    it = FeedexAsyncDownloader(timeout=5, per_host=20).download_iter([(f'{base}/ok', {}), (f'{base}/slow', {})])
+    next(it)
+    it.close()
+    results.append(check('Cancel on close', time.time() - start < 1, time.time() - start))
+
+    server.shutdown()
+    if not all(results): sys.exit(1)
+    print('All checks passed')
@@ -0,0 +1,250 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+""" Benchmark for SmallSem.extract_features on bundled models.
+    Compares current implementation against the old one (dense co-occurrence matrix, no stemming cache)
+    and checks that results are identical.
+
+    Usage: bench_features.py [LANG] [TEXT_FILE] [RUNS]
+    Without TEXT_FILE a long pseudo-article is generated from model's word lists """
+
+
+import sys
+import os
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+
+import numpy as np
+from smallsem import SmallSem
+
+MODELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'models')
+
+
+
+
+class LegacySmallSem(SmallSem):
+    """ Old implementation for reference """
+
+    def tokenize_feat_gen(self, text, **kwargs):
+        """ Token generator trimmed of trash and stops """
+        
+        for i,t in enumerate(self.tokenize_gen(self.feat_tokenizer, text)):
+            
+            if t in self.divs: continue
+            if self._isnum(t): continue
+
+            tok = t.lower()
+            stemmed = self.stemmer.stemWord(tok)
+            
+            if tok in self.stops or stemmed in self.stops: continue
+
+            if len(tok) >= 150 or len(stemmed) >= 150: continue
+
+            token = {'pos':i, 'var':t, 'term':stemmed}
+            yield token.copy()
+
+
+
+    def extract_features(self, text, depth=10):
+        """ Main method for extracting keywords from a given string. 
+            Returns a list of tuples with n strongest candidates with weights and stemmed forms"""        
+
+        tokens = []
+        token_freqs = {}
+        token_tf_idfs = {}
+
+        # Lazily connect to xapian
+        self._xap_connect()
+        if self.ix_db is None: use_xap = False
+        else: use_xap = True
+
+
+        # Create variant frequency distribution
+        doc_len = 0
+        for t in self.tokenize_feat_gen(text):
+            doc_len += 1
+            fr = token_freqs.get(t['var'],[0,None])[0] + 1
+            token_freqs[t['var']] = (fr, t['term'])
+            tokens.append(t)
+
+        # Ignore empty documents
+        if doc_len == 0: return []
+
+        # Calculate tf-idf-like weight for each variant based on xapian frequencies
+        for k,t in token_freqs.items():
+            klower = k.lower()
+            term = t[1]
+            v = t[0]
+            #matched_docs = 0
+            #for t in self.ix_db.postlist(k): matched_docs += 1
+            #if matched_docs == 0: idf = 1
+            #else: idf = log10(n_docs/matched_docs)
+            #tf = v/doc_len
+            #tf_idf = tf * idf
+
+            if use_xap:
+                if klower in self.stops: 
+                    token_tf_idfs[k] = 0
+                    continue
+                
+                fr = self.ix_db.get_termfreq(term)
+                if fr == 0:
+                    fr = 1
+                    v = v * self.unknown_term_weight # I decided to boost unknown vocab. To be seen if this works ...
+                
+                # Boost upper cases for bicameral models
+                case = self._case(k)
+                if case != 0: 
+                    if self.writing_system == 1 and self.bicameral == 1:
+                        if self.name_cap == 1:
+                            if case == 1: v *= 2
+                            elif case == 2: v *= 3
+                        elif self.name_cap == 2:
+                            if case == 1: v *= 1.5
+                            elif case == 2: v *= 3
+                    elif self.writing_system == 2 and self.bicameral == 1:
+                        if self.name_cap == 1:
+                            if case == 1: v *= 3
+                            elif case == 2: v *= 4
+                        elif self.name_cap == 2:
+                            if case == 1: v *= 3
+                            elif case == 2: v *= 4
+
+                # Build TF-IDFish measure
+                prob = fr
+                tf = v
+                tf_idf = tf / prob
+
+                token_tf_idfs[k] = tf_idf
+            
+            # If no xapian db then use crude heuristics based on common word lists (uncommon = interesting)
+            else: 
+                if klower in self.stops: token_tf_idfs[k] = 0
+                elif k in self.commons: token_tf_idfs[k] = 0
+                elif k in self.swadesh: token_tf_idfs[k] = 0
+                else: token_tf_idfs[k] = v
+            
+
+
+
+        # Generate vocab and assign IDs to unique tokens
+        vocab = {}
+        i = 0
+        for k,v in token_freqs.items():
+            i += 1
+            vocab[k] = (i, token_tf_idfs[k],)
+        
+        # Generate inverted vocab fo easy lookup
+        inv_vocab = {}
+        for k,v in vocab.items(): inv_vocab[v[0]] = (k, v[1])
+
+        # Generate main keyword dictionary to sort later ...
+        kwds = {}
+        for t in tokens:
+            t['id'] = vocab[t['var']][0]
+            t['tf_idf'] = token_tf_idfs[t['var']]
+            kwds[t['var']] = (t['id'], t['term'], t['tf_idf'])
+
+
+
+        #######
+        # Next comes extracting important word pairs using coocurrence matrix. Not really necessary to do it with NymPy,
+        cooc_mx = np.zeros( (max(inv_vocab.keys())+1, max(inv_vocab.keys())+1) )
+        for k,v in vocab.items():
+            for i,t in enumerate(tokens):
+                if t['id'] == v[0] and i < doc_len-1:
+                    other_id = tokens[i+1]['id']
+                    cooc_mx[v[0]][other_id] += 1
+
+        ixs1, ixs2 = np.where(cooc_mx > 1) # Use 
+
+        composites = []
+        for i in range(len(ixs1)):
+            t1 = inv_vocab[ixs1[i]][0]
+            t2 = inv_vocab[ixs2[i]][0]
+            t1_stem = self.stemmer.stemWord(t1.lower())
+            t2_stem = self.stemmer.stemWord(t2.lower())
+
+            composites.append(
+            [f"""{t1} {t2}""", cooc_mx[ixs1[i]][ixs2[i]] * (inv_vocab[ixs1[i]][1]+inv_vocab[ixs2[i]][1])/2, # The weight of each pair is average of weights of components
+             f"""{t1_stem} {t2_stem}""",
+            ]
+            )
+        
+        # Generate single keyword list
+        keywords = []
+        for k,v in kwds.items():
+            keywords.append([k, v[2], v[1],])
+        # ... and merge it with keyword pairs
+        keywords = keywords + composites
+
+        if len(keywords) == 0: return []
+
+        # Finally sort the whole list and return n top results
+        keywords.sort(key=lambda x: x[1], reverse=True)
+        keywords = keywords[:int(depth)]
+
+        # Normalize weights
+        max_weight = keywords[0][1]
+        for i,kw in enumerate(keywords):
+            keywords[i][1] = keywords[i][1]/max_weight
+        
+        return keywords
+
+
+
+
+
+def gen_text(ss, length=5000, seed=1):
+    """ Generate pseudo-article with repeating words and word pairs """
+    rnd = random.Random(seed)
+    words = [w for w in list(ss.ling.get('swadesh',())) + list(ss.ling.get('stops',())) if type(w) is str and w.isalpha()]
+    if len(words) == 0: words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet']
+    vocab = [rnd.choice(words) + rnd.choice(('', 'a', 'o', 'er', 'ing', 'ed',)) for i in range(2000)]
+    toks = []
+    while len(toks) < length:
+        w = rnd.choice(vocab)
+        if rnd.random() < 0.1: w = w.capitalize()
+        toks.append(w)
+        if rnd.random() < 0.05: toks.append(rnd.choice(vocab)) # Repeated pairs
+        if rnd.random() < 0.07: toks[-1] = f'{toks[-1]}.'
+    return ' '.join(toks)
+
+
+
+def bench(ss, text, runs):
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        res = ss.extract_features(text, depth=100)
+        t = time.perf_counter() - start
+        if best is None or t < best: best = t
+    return best, res
+
+
+
+
+if __name__ == '__main__':
+
+    lang = sys.argv[1] if len(sys.argv) > 1 else 'en'
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    new = SmallSem(MODELS_PATH, ling=lang)
+    old = LegacySmallSem(MODELS_PATH, ling=lang)
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'r') as f: text = f.read()
+    else: text = gen_text(new)
+
+    print(f'Model: {new.get_model()}; text length: {len(text)} chars')
+
+    t_old, res_old = bench(old, text, runs)
+    t_new, res_new = bench(new, text, runs)
+
+    same = [[r[0], float(r[1]), r[2]] for r in res_old] == [[r[0], float(r[1]), r[2]] for r in res_new]
+    print(f'Old: {t_old*1000:.1f} ms')
+    print(f'New: {t_new*1000:.1f} ms')
+    print(f'Speedup: {t_old/t_new:.1f}x; identical results: {same}')
+    if not same: sys.exit(1)
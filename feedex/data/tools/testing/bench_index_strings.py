@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+""" Benchmark for FeedexLP.gen_index_strings.
+    Compares current implementation against the old one (string concatenation, no token class cache)
+    and checks that index strings, semantic positions, stats and ranking strings are identical.
+
+    Usage: bench_index_strings.py [LANG] [TEXT_FILE|DB_DIR] [RUNS]
+    With DB_DIR titles, descriptions and texts of up to 1000 newest entries from Feedex database are used.
+    Without either a long pseudo-article is generated from model's word lists """
+
+
+import sys
+import os
+import time
+import random
+import sqlite3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+
+from feedex_headers import *
+
+
+
+
+class LegacyFeedexLP(FeedexLP):
+    """ Old implementation for reference """
+
+    def gen_index_strings(self, text:str, **kwargs):
+        """ Old implementation for reference: string concatenation and classification of every token """
+        field_offset = kwargs.get('field_offset',0)
+        field_len = 0
+
+        ix_token_str = ''
+        ix_exact_token_str = ''
+        
+        # Dictionary of pos lists for semantic stuff
+        sems = {} 
+        for p in SEM_TERMS: sems[p] = []
+
+        
+        # Iterate over all tokens
+        for ipos, t in enumerate(self.tokenize_ix_gen(text, kwargs.get('split',False))):
+
+            tlen = len(t)
+            if tlen < 1: continue
+
+            to_rank = False # Flag marking a token for later ranking 
+
+            # Needed to accurately position semantic wildcards
+            ipos = field_offset + ipos
+            field_len += 1
+
+            tok = ''
+            extok = ''
+
+            if t in self.divs:
+
+                tok = t
+                extok = tok
+                sems[PREFIXES['div']].append(ipos)
+                if t in self.sent_end: self.stats['sent_count'] += 1
+
+
+            elif t in self.punctation:
+                tok = t
+                extok = tok
+                sems[PREFIXES['div']].append(ipos)
+
+            elif self._isnum(t):
+                tok = t
+                extok = tok
+                sems[PREFIXES['num']].append(ipos)
+                self.stats['numerals_count'] += 1
+                self.stats['word_count'] += 1
+
+
+
+
+            else:
+                self.stats['word_count'] += 1
+
+                if self.writing_system == 1: 
+                    self.stats['char_count'] += len(t)
+
+                    case = self._case(t)
+                    if case > 0:
+                        self.stats['caps_count'] += 1
+                        if case == 1: sems[PREFIXES['cap']].append(ipos)
+                        else: sems[PREFIXES['allcap']].append(ipos)
+
+                    syls = len(self.pyphen.inserted(t).split('-'))
+                    if syls >= 3:
+                        self.stats['polysyl_count'] += 1
+                        sems[PREFIXES['polysyl']].append(ipos)
+
+                    cextok = t
+                    t = t.lower()
+                    extok = t
+                    tok = self.stemmer.stemWord(t)
+                    if tok not in self.variants.keys(): self.variants[tok] = []
+                    self.variants[tok].append(t)
+
+                    to_rank = True
+
+
+                elif self.writing_system == 2:
+                    syls = 1
+                    self.stats['char_count'] += 1
+                    case = self.case(t)
+                    if case > 0: 
+                        self.stats['caps_count'] += 1
+                        sems[PREFIXES['cap']].append(ipos)
+                    t = t.lower()
+
+                    if t in self.commons:
+                        self.stats['com_word_count'] += 1
+
+                    tok = t
+                    extok = tok
+
+                    to_rank = True
+
+
+                if tok in self.commons:
+                    self.stats['com_word_count'] += 1
+                elif extok in self.stops:
+                    self.stats['com_word_count'] += 1
+                    to_rank = False
+                elif extok in self.swadesh:
+                    self.stats['com_word_count'] += 1
+                else:
+                    sems[PREFIXES['uncomm']].append(ipos)
+                
+                    # This is a good rule of thumb for 'wild' symbols
+                    if syls <= 1:
+                        if self._isrnum(extok): sems[PREFIXES['rnum']].append(ipos)
+                        elif cextok in UNIT_ENTS: sems[PREFIXES['unit']].append(ipos)
+                        elif cextok in CURRENCY_ENTS: sems[PREFIXES['curr']].append(ipos)
+                        elif self._contains_item(extok, CURRENCY_SHORT_ENTS): sems[PREFIXES['curr']].append(ipos)
+                        elif self._contains_item(extok, GREEK_ENTS): sems[PREFIXES['greek']].append(ipos)
+                        elif self._contains_item(extok, MATH_ENTS): sems[PREFIXES['math']].append(ipos)
+
+
+
+            ix_token_str = f"""{ix_token_str} {tok}"""
+            ix_exact_token_str = f""" {ix_exact_token_str} {extok}"""
+
+            if to_rank:
+                self.rank_string = f'''{self.rank_string}{tok} '''
+
+        return (ix_token_str, ix_exact_token_str, sems, field_len)
+
+
+
+
+
+def gen_texts(LP, length=5000, seed=1):
+    """ Generate pseudo-article with repeating words, names, numbers and punctation """
+    rnd = random.Random(seed)
+    words = [w for w in list(LP.ling.get('swadesh',())) + list(LP.ling.get('stops',())) if type(w) is str and w.isalpha()]
+    if len(words) == 0: words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet']
+    vocab = [rnd.choice(words) + rnd.choice(('', 'a', 'o', 'er', 'ing', 'ed',)) for i in range(2000)]
+    vocab += ['NASA', 'III', 'km', '$', 'alpha', '3.14', '1999', '(', ')', ',']
+    toks = []
+    while len(toks) < length:
+        w = rnd.choice(vocab)
+        if rnd.random() < 0.1: w = w.capitalize()
+        toks.append(w)
+        if rnd.random() < 0.07: toks[-1] = f'{toks[-1]}.'
+    return [' '.join(toks)]
+
+
+
+def load_texts(db_dir):
+    """ Get real feed texts from Feedex DB """
+    conn = sqlite3.connect(f'file:{os.path.join(db_dir, "main.db")}?mode=ro', uri=True)
+    rows = conn.execute("select title, desc, text from entries where coalesce(deleted,0) <> 1 order by id desc limit 1000").fetchall()
+    conn.close()
+    texts = []
+    for r in rows: texts += [t for t in r if type(t) is str and t != '']
+    return texts
+
+
+
+def bench(LP, texts, runs):
+    best = None
+    for i in range(runs):
+        LP.clear()
+        res = []
+        start = time.perf_counter()
+        for t in texts: res.append(LP.gen_index_strings(t))
+        t = time.perf_counter() - start
+        if best is None or t < best: best = t
+    return best, (res, LP.stats.copy(), LP.rank_string, LP.variants.copy())
+
+
+
+
+if __name__ == '__main__':
+
+    lang = sys.argv[1] if len(sys.argv) > 1 else 'en'
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    fdx.config = {}
+    new = FeedexLP(None)
+    old = LegacyFeedexLP(None)
+    new.set_model(lang)
+    old.set_model(lang)
+
+    if len(sys.argv) > 2:
+        if os.path.isdir(sys.argv[2]): texts = load_texts(sys.argv[2])
+        else:
+            with open(sys.argv[2], 'r') as f: texts = [f.read()]
+    else: texts = gen_texts(new)
+
+    print(f'Model: {new.get_model()}; texts: {len(texts)}; length: {sum([len(t) for t in texts])} chars')
+
+    t_old, res_old = bench(old, texts, runs)
+    t_new, res_new = bench(new, texts, runs)
+
+    same = res_old == res_new
+    print(f'Old: {t_old*1000:.1f} ms')
+    print(f'New: {t_new*1000:.1f} ms')
+    print(f'Speedup: {t_old/t_new:.1f}x; identical results: {same}')
+    if not same: sys.exit(1)
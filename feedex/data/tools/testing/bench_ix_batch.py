@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+""" Benchmark for batched Xapian indexing (reindex/import throughput).
+    Compares the old per-document pipeline (synonyms added for every document, document added or replaced
+    by UUID term right away) against batched pipeline used by FeedexEntry.ling (documents queued with docids
+    allocated in advance, synonyms deduplicated per batch, one flush per batch - see FeedexDatabase.ix_add_document/flush_ix).
+    Documents are built the same way as in FeedexEntry.ling (stemmed, exact, semantic and meta prefixes) in both cases,
+    so time for building alone is given as a lower bound for any write strategy.
+
+    Usage: bench_ix_batch.py [COUNT] [MODE] [BATCH]
+        COUNT - number of pseudo-entries (default: 100000)
+        MODE  - 'reindex' (replace existing documents, default) or 'add' (new index)
+        BATCH - batch size (default: 2000, as max_items_per_transaction) """
+
+
+import sys
+import os
+import time
+import random
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+
+from feedex_headers import *
+
+
+
+
+def gen_entries(count, seed=1):
+    """ Generate pseudo-entries: (uuid, feed_id, title, desc, text, author, category, variants) """
+    rnd = random.Random(seed)
+    stems = [''.join([rnd.choice('abcdefghijklmnoprstuwyz') for j in range(rnd.randint(3,8))]) for i in range(5000)]
+    suffixes = ('', 's', 'ed', 'ing', 'er', 'ly')
+    def gen(l): return ' '.join([f'{rnd.choice(stems)}{rnd.choice(suffixes)}' for i in range(l)])
+
+    entries = []
+    for i in range(count):
+        title, desc, text = gen(10), gen(40), gen(300)
+        # Stemming variants as collected by FeedexLP for a document
+        variants = {}
+        for w in f'{title} {desc}'.split():
+            for s in suffixes[1:]:
+                if w.endswith(s):
+                    variants.setdefault(w[:-len(s)], set()).add(w)
+                    break
+        entries.append( (f'{i:032x}', rnd.randint(1,200), title, desc, text, gen(2), gen(1), variants) )
+    return entries
+
+
+
+def build_doc(ixer, e):
+    """ Build document like FeedexEntry.ling does """
+    uuid, feed_id, title, desc, text, author, category, variants = e
+    ix_doc = xapian.Document()
+    ix_doc.set_data(uuid)
+    ixer.set_document(ix_doc)
+
+    ix_doc.add_boolean_term(f'UUID {uuid}')
+    ix_doc.add_boolean_term(f'FEED_ID {feed_id}')
+    ix_doc.add_boolean_term('NOTE 0')
+    ix_doc.add_boolean_term('READ 0')
+    for i in range(3): ix_doc.add_value(i, xapian.sortable_serialise(feed_id))
+
+    for k in ('', PREFIXES['exact'],):
+        ixer.set_termpos(0)
+        for w, f in ((3, title), (2, desc), (1, text)): ixer.index_text(f, w, k)
+    last_pos = ixer.get_termpos() + 100
+
+    for p, s in enumerate(title.split()[:5]): ix_doc.add_posting(f"""{PREFIXES['sem']}{s}""", last_pos + p, 2)
+
+    ixer.set_termpos(last_pos)
+    for k, f in zip(META_PREFIXES, (author, author, desc, title, category, category)): ixer.index_text(f, 1, k)
+    ixer.set_termpos(last_pos)
+    for k, f in zip(META_PREFIXES_EXACT, (author, author, desc, title, category, category)): ixer.index_text(f, 1, k)
+    return ix_doc
+
+
+
+def build_only(ixer, db, entries, ids, batch):
+    for e in entries: build_doc(ixer, e)
+
+
+
+def legacy(ixer, db, entries, ids, batch):
+    """ Old pipeline: synonyms and document written for every entry """
+    for e, docid in zip(entries, ids):
+        if docid is not None: db.get_document(docid)
+        ix_doc = build_doc(ixer, e)
+        for k,v in e[7].items():
+            for s in v: db.add_synonym(k, s)
+        if docid is not None: db.replace_document(f'UUID {e[0]}', ix_doc)
+        else: db.add_document(ix_doc)
+
+
+
+def batched(ixer, db, entries, ids, batch):
+    """ Batched pipeline: documents queued with docids, synonyms merged per batch """
+    pending, syns, next_docid = [], {}, None
+
+    def flush():
+        for docid, ix_doc in pending: db.replace_document(docid, ix_doc)
+        for k,v in syns.items():
+            for s in v: db.add_synonym(k, s)
+        pending.clear()
+        syns.clear()
+
+    for e, docid in zip(entries, ids):
+        if docid is not None: db.get_document(docid)
+        ix_doc = build_doc(ixer, e)
+        for k,v in e[7].items():
+            s = syns.get(k)
+            if s is None: syns[k] = set(v)
+            else: s.update(v)
+        if docid is None:
+            if next_docid is None: next_docid = db.get_lastdocid()
+            next_docid += 1
+            docid = next_docid
+        pending.append( (docid, ix_doc) )
+        if len(pending) >= batch: flush()
+    flush()
+
+
+
+def bench(func, entries, mode, batch):
+    """ Run pipeline in a transaction on a fresh index. Returns seconds """
+    path = tempfile.mkdtemp(prefix='feedex_bench_ix_')
+    try:
+        db = xapian.WritableDatabase(path, xapian.DB_CREATE_OR_OPEN)
+        ids = [None] * len(entries)
+        if mode == 'reindex':
+            ixer = xapian.TermGenerator()
+            db.begin_transaction()
+            ids = [db.add_document(build_doc(ixer, e)) for e in entries]
+            db.commit_transaction()
+
+        ixer = xapian.TermGenerator()
+        ixer.set_stemmer(xapian.Stem('english'))
+        ixer.set_database(db)
+
+        start = time.perf_counter()
+        db.begin_transaction()
+        func(ixer, db, entries, ids, batch)
+        db.commit_transaction()
+        t = time.perf_counter() - start
+        db.close()
+        return t
+    finally: shutil.rmtree(path, ignore_errors=True)
+
+
+
+
+if __name__ == '__main__':
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    mode = sys.argv[2] if len(sys.argv) > 2 else 'reindex'
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    fdx.config = {}
+    entries = gen_entries(count)
+    print(f'Entries: {count}; mode: {mode}; batch: {batch}; synonyms per entry: {sum([len(v) for e in entries for v in e[7].values()])/count:.1f}')
+
+    t_build = bench(build_only, entries, 'add', batch)
+    t_old = bench(legacy, entries, mode, batch)
+    t_new = bench(batched, entries, mode, batch)
+
+    print(f'Building docs only:    {t_build:.1f} s; {count/t_build:.0f} docs/s')
+    print(f'Old (per document):    {t_old:.1f} s; {count/t_old:.0f} docs/s')
+    print(f'Batched:               {t_new:.1f} s; {count/t_new:.0f} docs/s; speedup: {t_old/t_new:.1f}x')
+    print(f'Max. possible speedup with building cost unchanged: {t_old/t_build:.1f}x')
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+""" Benchmark for snippet extraction in full-text queries.
+    Compares the old loop (str_matcher run for every term variant over every field of every row)
+    against compiled multi-term highlighter (FeedexLP.match_snippets) for all rows and for a visible window only.
+    With DB_DIR Xapian's own snippet generator (MSet.snippet) is timed as well.
+
+    Usage: bench_snippets.py [DB_DIR] [QUERY] [WINDOW] [RUNS]
+    With DB_DIR titles, descriptions and texts of up to 1000 newest entries from Feedex database are used.
+    Without it pseudo-articles are generated from a small vocabulary """
+
+
+import sys
+import os
+import time
+import random
+import sqlite3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'feedex'))
+
+from feedex_headers import *
+
+
+
+
+def gen_rows(count=1000, length=400, seed=1):
+    """ Generate pseudo-entries (title, desc, text) """
+    rnd = random.Random(seed)
+    vocab = [''.join([rnd.choice('abcdefghijklmnoprstuwyz') for j in range(rnd.randint(2,9))]) for i in range(3000)]
+    vocab += ['time', 'times', 'timeline', 'market', 'markets', 'Market', 'the', 'a', 'of', '.', ',']
+    def gen(l): return ' '.join([rnd.choice(vocab) for i in range(l)])
+    return [(gen(10), gen(40), gen(length)) for i in range(count)]
+
+
+
+def load_rows(db_dir):
+    """ Get real entries from Feedex DB """
+    conn = sqlite3.connect(f'file:{os.path.join(db_dir, "main.db")}?mode=ro', uri=True)
+    rows = conn.execute("select title, desc, text from entries where coalesce(deleted,0) <> 1 order by id desc limit 1000").fetchall()
+    conn.close()
+    return rows
+
+
+
+def legacy(LP, rows, vars, window):
+    """ Old implementation for reference: every variant matched separately """
+    res = []
+    for r in rows:
+        snips = []
+        for f in r:
+            if type(f) is not str: continue
+            lf = f.lower()
+            for v in vars:
+                (c, sn) = LP.str_matcher((v,), 1, False, False, lf, snippets=True, orig_field=f)
+                for s in sn:
+                    if len(s) == 3 and len(s[1]) <= 70: snips.append(tuple(s))
+        res.append(tuple(snips))
+    return res
+
+
+
+def compiled(LP, rows, vars, window):
+    """ Compiled matcher, snippets only for first rows """
+    matcher = LP.compile_matcher(vars)
+    res = []
+    for r in rows[:window]:
+        snips = []
+        for f in r:
+            if type(f) is not str: continue
+            snips += LP.match_snippets(matcher, f.lower(), orig_field=f, max_len=70)[1]
+        res.append(tuple(snips))
+    return res
+
+
+
+def ix_snippets(LP, rows, mset, window):
+    """ Xapian's snippet generator """
+    stemmer = xapian.Stem('none')
+    flags = getattr(xapian.MSet, 'SNIPPET_EXHAUSTIVE', 0) | getattr(xapian.MSet, 'SNIPPET_EMPTY_WITHOUT_MATCH', 0)
+    res = []
+    for r in rows[:window]:
+        snips = []
+        for f in r:
+            if type(f) is not str or f == '': continue
+            sn = mset.snippet(f, IX_SNIPPET_LENGTH, stemmer, flags, IX_SNIPPET_MARKUP_BEG, IX_SNIPPET_MARKUP_END, '...')
+            if type(sn) is bytes: sn = sn.decode('utf-8')
+            snips += LP.marked_snippets(sn, IX_SNIPPET_MARKUP_BEG, IX_SNIPPET_MARKUP_END, max_len=70)
+        res.append(tuple(snips))
+    return res
+
+
+
+def bench(func, LP, rows, arg, window, runs):
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        res = func(LP, rows, arg, window)
+        t = time.perf_counter() - start
+        if best is None or t < best: best = t
+    return best, res
+
+
+
+
+if __name__ == '__main__':
+
+    db_dir = sys.argv[1] if len(sys.argv) > 1 and os.path.isdir(sys.argv[1]) else None
+    qr = sys.argv[2] if len(sys.argv) > 2 else 'time market'
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    runs = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+
+    fdx.config = {}
+    LP = FeedexLP(None)
+
+    if db_dir is not None: rows = load_rows(db_dir)
+    else: rows = gen_rows()
+
+    # Variants as they would be returned by synonyms of matching stems
+    vars = set()
+    for t in qr.lower().split():
+        vars.add(t)
+        for r in rows:
+            for f in r:
+                if type(f) is not str: continue
+                for w in f.lower().split():
+                    if w.startswith(t) and len(w) <= len(t) + 3: vars.add(w)
+    vars = tuple(sorted(vars))
+
+    print(f'Rows: {len(rows)}; length: {sum([len(f) for r in rows for f in r if type(f) is str])} chars; variants: {len(vars)}; window: {window}')
+
+    t_old, res_old = bench(legacy, LP, rows, vars, len(rows), runs)
+    t_all, res_all = bench(compiled, LP, rows, vars, len(rows), runs)
+    t_win, res_win = bench(compiled, LP, rows, vars, window, runs)
+
+    print(f'Old (all rows):        {t_old*1000:.1f} ms; snippets: {sum([len(s) for s in res_old])}')
+    print(f'Compiled (all rows):   {t_all*1000:.1f} ms; snippets: {sum([len(s) for s in res_all])}; speedup: {t_old/t_all:.1f}x')
+    print(f'Compiled (window):     {t_win*1000:.1f} ms; speedup: {t_old/t_win:.1f}x')
+
+    # Overlapping variants are highlighted once (longest match) and snippet limits apply per field, not per variant
+    same = [set(o) == set(n) for o,n in zip(res_old, res_all)]
+    print(f'Rows with identical snippet sets: {sum(same)}/{len(same)}')
+
+    if db_dir is not None:
+        ix = xapian.Database(os.path.join(db_dir, 'index'))
+        enquire = xapian.Enquire(ix)
+        qp = xapian.QueryParser()
+        qp.set_database(ix)
+        enquire.set_query(qp.parse_query(qr))
+        mset = enquire.get_mset(0, window)
+        t_ix, res_ix = bench(ix_snippets, LP, rows, mset, window, runs)
+        print(f'Xapian (window):       {t_ix*1000:.1f} ms; snippets: {sum([len(s) for s in res_ix])}; speedup: {t_old/t_ix:.1f}x')
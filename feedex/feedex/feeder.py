@@ -44,6 +44,126 @@ class FeedexPipeError(FeedexError):
 
 
 
+def setup_sqlite_conn(conn, curs, **kargs):
+    """ Set up SQLite connection. WAL journal lets readers work while a fetch is writing.
+        Auto vacuum mode of a new DB must be set before switching to WAL or it is ignored """
+    if kargs.get('create', False): curs.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    with conn: curs.execute("PRAGMA case_sensitive_like=true")
+    with conn: curs.execute("PRAGMA automatic_index=false")
+    try: curs.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError: pass # Other connection is busy - journal mode is persistent, so it will be switched later
+    curs.execute("PRAGMA synchronous=NORMAL")
+    curs.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    curs.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+
+
+def has_fts_index(curs):
+    """ Check if optional full-text index was built """
+    try: return curs.execute("select 1 from sqlite_master where type = 'table' and name = 'entries_fts'").fetchone() is not None
+    except sqlite3.Error: return False
+
+
+
+
+class FeedexConnectionPool:
+    """ Process-wide pool of database connections. Idle read connections (with Xapian handles) are lent
+        to threads for exclusive use and all writes go through one shared writer connection """
+
+    def __init__(self, db_path:str, **kargs):
+        self.db_path = db_path
+        self.sql_path = os.path.join(db_path,'main.db')
+        self.ix_path = os.path.join(db_path,'index')
+
+        self.max_idle = scast(kargs.get('max_idle'), int, DB_POOL_MAX_IDLE)
+
+        self.lock = threading.Lock()
+        self.write_lock = threading.RLock() # Serializes writes on shared writer connection
+        self.idle = [] # Idle readers: (conn, curs, ix)
+        self.writer = None
+        self.writer_curs = None
+        self.ix_inos = {} # Index dir inode for each handle, so handles are not reused after index was swapped by compaction
+
+
+    def _open(self):
+        conn = sqlite3.connect(self.sql_path, check_same_thread=False)
+        curs = conn.cursor()
+        setup_sqlite_conn(conn, curs)
+        return conn, curs
+
+
+    def _ix_ino(self):
+        try: return os.stat(self.ix_path).st_ino
+        except OSError: return None
+
+
+    def acquire(self):
+        """ Lend read connection, cursor and index handle to calling thread """
+        with self.lock:
+            if len(self.idle) > 0: conn, curs, ix = self.idle.pop()
+            else: conn, curs, ix = None, None, None
+            old_ino = self.ix_inos.pop(id(ix), None)
+
+        ino = self._ix_ino()
+        if conn is None:
+            conn, curs = self._open()
+            try: ix = xapian.Database(self.ix_path)
+            except (xapian.DatabaseError,):
+                conn.close()
+                raise
+        elif old_ino != ino:
+            ix.close()
+            ix = xapian.Database(self.ix_path)
+        else:
+            # Index handle is reopened only if a new revision was committed meanwhile
+            try: ix.reopen()
+            except (xapian.DatabaseError,):
+                ix.close()
+                ix = xapian.Database(self.ix_path)
+        with self.lock: self.ix_inos[id(ix)] = ino
+        return conn, curs, ix
+
+
+    def release(self, conn, curs, ix):
+        """ Take back lent connections """
+        if conn is None: return 0
+        try: conn.rollback()
+        except sqlite3.Error:
+            with self.lock: self.ix_inos.pop(id(ix), None)
+            conn.close()
+            if isinstance(ix, xapian.Database): ix.close()
+            return 0
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append( (conn, curs, ix,) )
+                return 0
+            self.ix_inos.pop(id(ix), None)
+        conn.close()
+        if isinstance(ix, xapian.Database): ix.close()
+        return 0
+
+
+    def get_writer(self):
+        """ Get shared writer connection (use within write_lock) """
+        with self.lock:
+            if self.writer is None: self.writer, self.writer_curs = self._open()
+        return self.writer, self.writer_curs
+
+
+    def close(self):
+        """ Close all idle connections and writer """
+        with self.lock:
+            for conn, curs, ix in self.idle:
+                conn.close()
+                ix.close()
+            self.idle.clear()
+            self.ix_inos.clear()
+            with self.write_lock:
+                if self.writer is not None: self.writer.close()
+                self.writer, self.writer_curs = None, None
+
+
+
+
 class FeedexDatabase:
     """ Database interface for Feedex with additional maintenance and utilities """
     
@@ -100,10 +220,23 @@ class FeedexDatabase:
         # Define writing indexer
         self.ixer_db = None
         self.ixer = None
+        self.ix_lock = None # Lock file handing index over to next writer
+
+        # Batched index writes: pending (docid, document) pairs, synonyms and next free docid
+        self.ix_pending = []
+        self.ix_pending_syns = {}
+        self.ix_next_docid = None
 
         # Connection ID
         self.conn_id = 0
 
+        # Should connections be taken from process-wide pool? (and the pool they came from)
+        self.pooled = kargs.get('pooled', False)
+        self.pool = None
+
+        # Is full-text index for string matching available?
+        self.fts = False
+
         # ... pointer to lazy loaded Language Processor
         self.LP = None
         self.Q = None
@@ -129,6 +262,8 @@ class FeedexDatabase:
         defaults = kargs.get('defaults', False)
         default_feeds = kargs.get('default_feeds', False)
 
+        if self.pooled and not self.main_conn and os.path.isfile(self.sql_path): return self._connect_pooled()
+
         # Check DB folders ...
         if not os.path.isdir(self.db_path):
             if self.allow_create:
@@ -165,12 +300,11 @@ class FeedexDatabase:
         except (sqlite3.Error, sqlite3.OperationalError, OSError) as e: raise FeedexDatabaseError('DB connection error: %a', e)
 
         # Some technical stuff...
-        try:
-            with self.conn: self.curs.execute("PRAGMA case_sensitive_like=true")
-            with self.conn: self.curs.execute("PRAGMA automatic_index=false")
-            #with self.conn: self.curs.execute("PRAGMA cache_size=5000")
+        try: setup_sqlite_conn(self.conn, self.curs, create=create_sqlite)
         except sqlite3.Error as e: raise FeedexDatabaseError('Error setting up PRAGMA: %a', e)
 
+        self.fts = has_fts_index(self.curs)
+
 
 
         # Handle SQLite structure, if not there...
@@ -180,6 +314,11 @@ class FeedexDatabase:
                 sql_scripts_path = os.path.join(FEEDEX_SYS_SHARED_PATH,'data','db_scripts')
                 with open(os.path.join(sql_scripts_path, 'feedex_db_ddl.sql'), 'r') as sql: sql_ddl = sql.read()
                 with self.conn: self.curs.executescript(sql_ddl)
+                self._upgrade_structure()
+                # Incremental vacuum is needed by maintenance steps - rebuild file if mode was not applied
+                if self.curs.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    self.curs.executescript('PRAGMA auto_vacuum=INCREMENTAL; VACUUM;')
+                    if self.curs.execute('PRAGMA auto_vacuum').fetchone()[0] != 2: msg(FX_ERROR_DB, _('Could not enable incremental vacuum for %a'), self.sql_path)
                 msg(_('Database structure created'))
             except (sqlite3.Error, sqlite3.OperationalError, OSError) as e:
                 raise FeedexDatabaseError('Error writing DDL from %a: %b', os.path.join(sql_scripts_path, 'feedex_db_ddl.sql') , e)
@@ -222,6 +361,15 @@ class FeedexDatabase:
                     self.close(unlock=False)
                     raise FeedexDatabaseError('App version (%a) incompatibile with DB version (%b)', FEEDEX_VERSION, version)
 
+                # Apply idempotent structure updates (e.g. new indexes) for older DBs
+                try:
+                    self._upgrade_structure()
+                    if self.fts: 
+                        with self.conn: self.curs.executescript(FTS_DDL_SQL)
+                except (sqlite3.Error, sqlite3.OperationalError) as e:
+                    self.close(unlock=False)
+                    raise FeedexDatabaseError('Error upgrading DB structure: %a', e)
+
                 if kargs.get('unlock', False): 
                     err = self.unlock()
                     if err == 0:
@@ -285,11 +433,46 @@ class FeedexDatabase:
 
 
 
+    def _upgrade_structure(self):
+        """ Apply idempotent structure updates. One-time data migrations are run only if needed, because they take
+            write lock even if there is nothing to do and connecting would fail while another process is writing """
+        with self.conn: self.curs.executescript(DB_UPGRADE_SQL)
+        if self.curs.execute(PARAM_EXISTS_SQL, ('terms_agg',)).fetchone() is None:
+            with self.conn: self.curs.executescript(TERMS_AGG_FILL_SQL)
+        if self.curs.execute(ENTRY_KEYWORDS_UNIQUE_IX_EXISTS_SQL).fetchone() is None:
+            with self.conn: self.curs.executescript(ENTRY_KEYWORDS_UNIQUE_IX_SQL)
+
+
+
+    def _connect_pooled(self, **kargs):
+        """ Take ready connections from process-wide pool """
+        if fdx.db_pool is None or fdx.db_pool.db_path != self.db_path: fdx.db_pool = FeedexConnectionPool(self.db_path)
+        self.pool = fdx.db_pool
+        try: self.conn, self.curs, self.ix = self.pool.acquire()
+        except (sqlite3.Error, OSError,) as e: 
+            self.pool = None
+            raise FeedexDatabaseError('DB connection error: %a', e)
+        except (xapian.DatabaseError,) as e:
+            self.pool = None
+            raise FeedexIndexError('Error connecting to index at %a: %b', self.ix_path, e)
+
+        self.fts = has_fts_index(self.curs)
+        fdx.conn_num += 1
+        self.conn_id = fdx.conn_num
+        debug(2, f'Connected to pool for {self.db_path} ({self.conn_id})')
+        return 0
+
+
+
     def close(self, **kargs):
         """ Close this connection """            
         if self.main_conn and kargs.get('unlock',True): self.unlock()
-        if isinstance(self.conn, sqlite3.Connection): self.conn.close()
-        if isinstance(self.ix, xapian.Database): self.ix.close()
+        if self.pool is not None:
+            self.pool.release(self.conn, self.curs, self.ix)
+            self.conn, self.curs, self.ix, self.pool = None, None, None, None
+        else:
+            if isinstance(self.conn, sqlite3.Connection): self.conn.close()
+            if isinstance(self.ix, xapian.Database): self.ix.close()
         self.close_ixer()
         fdx.conn_num -= 1
         debug(2,f'Connection {self.conn_id} closed...')
@@ -301,21 +484,28 @@ class FeedexDatabase:
     def connect_ixer(self, **kargs):
         """ Connect writing indexer lazily """
         if not (isinstance(self.ixer_db, xapian.WritableDatabase) and isinstance(self.ixer, xapian.TermGenerator)):
-            while True: # We need to wait indefinitely for index to be free to avoid unindexed entries
+            # We need to wait indefinitely for index to be free to avoid unindexed entries.
+            # Writers queue on lock file and are woken up as soon as the previous one closes the index
+            if self.ix_lock is None: self.ix_lock = FeedexFileLock(os.path.join(self.db_path, 'index.lock'))
+            if not self.ix_lock.acquire(timeout=0):
+                msg(FX_ERROR_DB, _('Index locked by process %a. Waiting...'), self.ix_lock.holder())
+                self.ix_lock.acquire()
+
+            interval = 0.001
+            while True:
                 try: 
                     self.ixer_db = xapian.WritableDatabase(self.ix_path)
                     self.ixer = xapian.TermGenerator()
                     self.ixer_db.begin_transaction()
                     return 0
-                except xapian.DatabaseLockError:
-                    msg(FX_ERROR_DB, _(f"""Index locked. Waiting..."""))
+                except xapian.DatabaseLockError: # Index held by a writer not using lock file - back off
+                    if interval == 0.001: msg(FX_ERROR_DB, _('Index locked. Waiting...'))
                 except xapian.DatabaseError as e:
+                    self.ix_lock.release()
                     raise FeedexIndexError('Error connecting to index at %a: %b', self.ix_path, e)
 
-                time.sleep(10) # Interval is big because of long indexing time for large batches
-        
-            msg(FX_ERROR_LOCK, _('Failed to unlock index at %a (%b)'), self.ix_path, self.conn_id)
-            return -2
+                time.sleep(interval)
+                interval = min(interval * 2, 1)
 
 
 
@@ -327,12 +517,15 @@ class FeedexDatabase:
         if isinstance(self.ixer_db, xapian.WritableDatabase): 
             self.ixer = None
 
-            if commit:
+            if commit and not rollback:
                 msg(_('Writing to index...'))
-                try: self.ixer_db.commit_transaction()
+                try: 
+                    self.flush_ix()
+                    self.ixer_db.commit_transaction()
                 except (xapian.Error,) as e:
                     self.ixer_db.cancel_transaction()
                     self.ixer_db.close()
+                    if self.ix_lock is not None: self.ix_lock.release()
                     return msg(FX_ERROR_INDEX, _('Indexer error: %a'), e)                 
             if rollback:
                 msg(_('Reverting index changes...'))
@@ -340,7 +533,46 @@ class FeedexDatabase:
             
             self.ixer_db.close()
 
+        if self.ix_lock is not None: self.ix_lock.release()
         self.ixer_db = None
+        self.ix_pending.clear()
+        self.ix_pending_syns.clear()
+        self.ix_next_docid = None
+        return 0
+
+
+
+    def ix_add_document(self, ix_doc, **kargs):
+        """ Queue document for batched writing to index. New documents get their docids allocated in advance,
+            so they can be saved to SQL before the batch is flushed. Returns docid """
+        docid = kargs.get('docid')
+        if docid is None:
+            if self.ix_next_docid is None: self.ix_next_docid = self.ixer_db.get_lastdocid()
+            self.ix_next_docid += 1
+            docid = self.ix_next_docid
+        
+        self.ix_pending.append( (docid, ix_doc) )
+        if len(self.ix_pending) >= fdx.config.get('max_items_per_transaction', 2000): self.flush_ix()
+        return docid
+
+
+    def ix_add_synonyms(self, variants:dict):
+        """ Queue stemming variants to be saved as synonyms (deduplicated per batch) """
+        for k,v in variants.items():
+            syns = self.ix_pending_syns.get(k)
+            if syns is None: self.ix_pending_syns[k] = set(v)
+            else: syns.update(v)
+
+
+    def flush_ix(self, **kargs):
+        """ Write queued documents and synonyms to index (within current transaction) """
+        if not isinstance(self.ixer_db, xapian.WritableDatabase): return 0
+        debug(2, f'Flushing {len(self.ix_pending)} documents to index...')
+        for docid, ix_doc in self.ix_pending: self.ixer_db.replace_document(docid, ix_doc)
+        for k,v in self.ix_pending_syns.items():
+            for s in v: self.ixer_db.add_synonym(k, s)
+        self.ix_pending.clear()
+        self.ix_pending_syns.clear()
         return 0
 
 
@@ -463,7 +695,7 @@ class FeedexDatabase:
     def lock(self, **kargs):
         """ Locks DB """
         self.status = 0
-        err = self.run_sql_lock("insert into params values('lock', 1)")
+        err = self.run_sql_lock("insert into params values('lock', :pid)", {'pid':os.getpid()})
         if err != 0: self.status = msg(FX_ERROR_DB, _('DB error (%a): locking'), self.conn_id, log=True)
         return 0
             
@@ -477,11 +709,18 @@ class FeedexDatabase:
     
 
     def locked(self, **kargs):
-        """ Checks if DB is locked """
-        lock = self.qr_sql("select * from params where name = 'lock'", all=True)
+        """ Checks if DB is locked. Locks left by processes that are no longer running are removed """
+        lock = self.qr_sql("select val from params where name = 'lock'", all=True)
         if self.status != 0: return None
         elif lock == []: return False
-        return True
+
+        pids = [scast(l[0], int, 0) for l in lock]
+        if 1 in pids: return True # Older lock without PID
+        for p in pids:
+            if p == os.getpid() or pid_alive(p): return True
+        msg(_('Removing stale lock left by process(es) %a'), ', '.join([str(p) for p in pids]), log=True)
+        if self.unlock() != 0: return None
+        return False
 
 
 
@@ -521,23 +760,24 @@ class FeedexDatabase:
 
 
     def loc_locked(self, **kargs):
-        """ Wait for local unlock """
+        """ Wait for local unlock and take the lock (shared for reading). Returns True if DB stayed locked until timeout """
         timeout = kargs.get('timeout', fdx.config.get('timeout',30))
-        check = kargs.get('check',False)
-        tm = 0
-        while fdx.db_lock:
-            tm += 1
-            if tm >= timeout or check: return True
-            time.sleep(1)
-        fdx.db_lock = True
-        return False
+        if kargs.get('check',False): timeout = 0
+        return not fdx.db_lock.acquire(shared=kargs.get('shared',False), timeout=timeout)
 
 
     ################################################################################
     #   SQL Operations wrappers
     # 
     def _run_sql(self, query, *vals, **kargs):
-        """ Safely run a SQL insert/update """
+        """ Safely run a SQL insert/update. Pooled connections write through shared writer connection """
+        if self.pool is not None:
+            with self.pool.write_lock:
+                conn, curs = self.pool.get_writer()
+                return self._run_sql_on(conn, curs, query, *vals, **kargs)
+        return self._run_sql_on(self.conn, self.curs, query, *vals, **kargs)
+
+    def _run_sql_on(self, conn, curs, query, *vals, **kargs):
         self.status = 0
 
         vals = slist(vals, 0, None)
@@ -545,14 +785,15 @@ class FeedexDatabase:
         elif type(vals) is dict: many = 0
         else: many = -1
         try:
-            if many == 1:
-                with self.conn: self.curs.executemany(query, vals)
+            if kargs.get('script', False): curs.executescript(query) # Runs statements to completion (e.g. incremental_vacuum)
+            elif many == 1:
+                with conn: curs.executemany(query, vals)
             elif many == 0: 
-                with self.conn: self.curs.execute(query, vals)
+                with conn: curs.execute(query, vals)
             else:
-                with self.conn: self.curs.execute(query)
-            self.rowcount = self.curs.rowcount
-            self.lastrowid = self.curs.lastrowid
+                with conn: curs.execute(query)
+            self.rowcount = curs.rowcount
+            self.lastrowid = curs.lastrowid
             return 0
         
         except (sqlite3.Error, sqlite3.OperationalError) as e:
@@ -570,7 +811,7 @@ class FeedexDatabase:
         if not ignore: 
             if self.loc_locked(**kargs): return FX_ERROR_LOCK
         e = self._run_sql(query, *vals, **kargs)
-        if not ignore: fdx.db_lock = False
+        if not ignore: fdx.db_lock.release()
         return e
 
 
@@ -584,7 +825,7 @@ class FeedexDatabase:
         for q in q_query:
             e = self._run_sql(q[0], slist(q,1,None), many=False)
             if e != 0: break
-        if not ignore: fdx.db_lock = False
+        if not ignore: fdx.db_lock.release()
         return e
 
 
@@ -597,7 +838,9 @@ class FeedexDatabase:
         fetch_all = kargs.get('all', False)
         self.status = 0
 
-        if self.loc_locked(**kargs):
+        # Pooled readers have their own connections to WAL database and do not wait for local lock
+        locked = self.pool is None
+        if locked and self.loc_locked(shared=True, **kargs):
             self.status = msg(FX_ERROR_LOCK, _('DB locked locally (%a) (sql: %b)'), self.conn_id, sql, log=True)
             return ()
         
@@ -616,23 +859,49 @@ class FeedexDatabase:
             self.conn.rollback()
             return ()
 
-        finally: fdx.db_lock = False 
+        finally: 
+            if locked: fdx.db_lock.release()
 
 
 
     def qr_sql_iter(self, sql:str, *args, **kargs):
-        """ Query database - iterator """
-        if self.loc_locked(**kargs):
-            self.status = msg(FX_ERROR_LOCK, _('DB locked locally (%a) (sql: %b)'), self.conn_id, sql, log=True)
-            return self.status
+        """ Query database - iterator. Results are streamed in batches from a dedicated cursor
+            and local lock is held only while fetching, so caller can write between batches """
+        batch = scast(kargs.get('batch', QR_ITER_BATCH_SIZE), int, QR_ITER_BATCH_SIZE)
+        self.status = 0
+        curs = None
+        locked = False
         try:
-            for i in self.conn.execute(sql, *args).fetchall(): yield i
+            if self.pool is None:
+                if self.loc_locked(shared=True, **kargs):
+                    self.status = msg(FX_ERROR_LOCK, _('DB locked locally (%a) (sql: %b)'), self.conn_id, sql, log=True)
+                    return self.status
+                locked = True
+            curs = self.conn.cursor()
+            curs.execute(sql, *args)
+            while True:
+                rows = curs.fetchmany(batch)
+                if locked:
+                    fdx.db_lock.release()
+                    locked = False
+                if len(rows) == 0: break
+
+                for r in rows: yield r
+
+                if self.pool is None:
+                    if self.loc_locked(shared=True, **kargs):
+                        self.status = msg(FX_ERROR_LOCK, _('DB locked locally (%a) (sql: %b)'), self.conn_id, sql, log=True)
+                        return self.status
+                    locked = True
+
         except (sqlite3.Error, sqlite3.OperationalError) as e:            
             self.error = f'{e}'
             self.status = msg(FX_ERROR_DB, _('DB error (%a) - read: %b (%c)'), self.conn_id, e, sql,  log=True)
             self.conn.rollback()
             return self.status
-        finally: fdx.db_lock = False
+        finally: 
+            if locked: fdx.db_lock.release()
+            if curs is not None: curs.close()
 
 
 
@@ -724,18 +993,15 @@ class FeedexDatabase:
             return 0
 
         debug(2, f'Loading learned terms ({self.conn_id})...')
-        if fdx.config.get('recom_algo') == 2: fdx.terms_cache = self.qr_sql(LOAD_TERMS_ALGO_2_SQL, all=True)
-        elif fdx.config.get('recom_algo') == 3: fdx.terms_cache = self.qr_sql(LOAD_TERMS_ALGO_3_SQL, all=True)
-        else: fdx.terms_cache = self.qr_sql(LOAD_TERMS_ALGO_1_SQL, all=True)
+        # Only top terms are needed for recommendations - aggregate table is indexed by weight
+        limit = scast(fdx.config.get('recom_limit', 250), int, 250)
+        fdx.terms_cache = self.qr_sql(f'{self.terms_sql()} limit :limit', {'limit':limit + 1}, all=True)
         if self.status != 0: raise FeedexDataError('Error caching learned terms: %a', self.error)
 
         # Build query string for recommendations (better do it once at the beginning)        
-        limit = scast(fdx.config.get('recom_limit', 250), int, 250)
-
         qr_str = ''        
-        for i,t in enumerate(fdx.terms_cache):
+        for t in fdx.terms_cache:
             s = t[0]
-            if i > limit: break
             s = s.strip()
             if s in {'','~','(',')',}: continue
             if ' ' in s: s = f"""({s.replace(' ',' ~2 ')})"""
@@ -747,6 +1013,14 @@ class FeedexDatabase:
 
 
 
+    def terms_sql(self):
+        """ Query for learned terms aggregated according to recommendation algorithm """
+        if fdx.config.get('recom_algo') == 2: return LOAD_TERMS_ALGO_2_SQL
+        elif fdx.config.get('recom_algo') == 3: return LOAD_TERMS_ALGO_3_SQL
+        return LOAD_TERMS_ALGO_1_SQL
+
+
+
     def load_icons(self):
         """ Loads icon paths for feeds into cache """
         debug(2, f'Loading icons ({self.conn_id})...')
@@ -868,7 +1142,9 @@ class FeedexDatabase:
         msg(_('Starting DB miantenance'), log=True)
 
         msg(_('Performing VACUUM'))
-        err = self.run_sql_lock('VACUUM')
+        # Older DBs are switched to incremental vacuum here, as this needs a full VACUUM
+        err = self.run_sql_lock('PRAGMA auto_vacuum=INCREMENTAL')
+        if err == 0: err = self.run_sql_lock('VACUUM')
         if err == 0:
             msg(_('Performing ANALYZE'))
             err = self.run_sql_lock('ANALYZE')
@@ -876,24 +1152,107 @@ class FeedexDatabase:
             msg(_('REINDEXING all tables'))
             err = self.run_sql_lock('REINDEX')
 
-        if err == 0:
-            err = self._update_doc_count()
-            doc_count = self.get_doc_count()
+        if err == 0: err = self._update_maint_stats()
+        if err == 0: err = self.compact_index()
+        # All statements above commit through the writer, so there is nothing left to commit here
+        if err == 0: msg(_('DB maintenance completed'), log=True)
+        else: msg(FX_ERROR_DB, _('DB maintenance failed!'), log=True)
+
 
+
+    def _update_maint_stats(self, **kargs):
+        """ Recalculate doc count and feed weights and mark maintenance as done """
+        err = self._update_doc_count()
+        doc_count = self.get_doc_count()
+
+        if err == 0:
             msg(_('Updating feed recomm. weights...'))            
             err = self.run_sql_lock("""update feeds set recom_weight = 0""")
-            stats_delta = {}
-            if err == 0:
-                feed_weight_list = self.qr_sql(FEED_FREQ_MAINT_SQL, all=True)
-                for w in feed_weight_list: stats_delta[w[0]] = w[1]
-                err = self.update_stats(stats_delta, ignore_lock=True)
+        stats_delta = {}
+        if err == 0:
+            feed_weight_list = self.qr_sql(FEED_FREQ_MAINT_SQL, all=True)
+            for w in feed_weight_list: stats_delta[w[0]] = w[1]
+            err = self.update_stats(stats_delta, ignore_lock=True)
 
         if err == 0: err = self.run_sql_lock("""insert into actions values('maintenance',:doc_count)""", {'doc_count':doc_count})
-        if err == 0:
-            self.conn.commit()
-            msg(_('DB maintenance completed'), log=True)
-        else: msg(FX_ERROR_DB, _('DB maintenance failed!'), log=True)
+        if err == 0: err = self.bump_data_gen() # Feed weights are used in recommendations
+        return err
+
+
+
+    def maintenance_step(self, **kargs): return self.run_locked(FX_LOCK_FETCH, self._maintenance_step, **kargs)
+    def _maintenance_step(self, **kargs):
+        """ Incremental maintenance to be run between fetches. Every step is a short transaction, so other 
+            connections can work meanwhile. Steps are skipped when time budget (seconds) runs out
+                budget  - time budget (default from config, 0 turns it off)
+                force   - ignore thresholds for index compaction and statistics
+                compact - allow index compaction (it is not time-limited, so it is never done after fetching) """
+        budget = scast(kargs.get('budget', fdx.config.get('maint_time_budget', MAINT_TIME_BUDGET)), float, MAINT_TIME_BUDGET)
+        force = kargs.get('force', False)
+        if budget <= 0: return 0
+        deadline = time.monotonic() + budget
+
+        # Return free pages to file system in small chunks
+        if scast(slist(self.qr_sql('PRAGMA auto_vacuum', one=True), 0, 0), int, 0) == 2:
+            freed = 0
+            while time.monotonic() < deadline:
+                free_pages = scast(slist(self.qr_sql('PRAGMA freelist_count', one=True), 0, 0), int, 0)
+                if self.status != 0: return self.status
+                if free_pages <= 0: break
+                err = self.run_sql_lock(f'PRAGMA incremental_vacuum({MAINT_VACUUM_STEP_PAGES})', script=True)
+                if err != 0: return err
+                freed += min(free_pages, MAINT_VACUUM_STEP_PAGES)
+            if freed > 0: debug(2, f'Incremental vacuum freed {freed} pages')
+
+        # Analyze only tables whose statistics are out of date
+        if time.monotonic() < deadline:
+            err = self.run_sql_lock('PRAGMA optimize', script=True)
+            if err != 0: return err
+
+        doc_count = self.get_doc_count()
+        if kargs.get('compact', False) and time.monotonic() < deadline and (force or doc_count - scast(self.get_saved_param('ix_compacted', type=int), int, 0) >= MAINT_IX_COMPACT_DOCS):
+            err = self.compact_index()
+            if err not in (0, FX_ERROR_LOCK,): return err
 
+        if time.monotonic() < deadline and (force or self.check_due_maintenance()):
+            err = self._update_maint_stats()
+            if err != 0: return err
+        return 0
+
+
+
+    def compact_index(self, **kargs):
+        """ Compact index into a side directory and swap it with the current one. Writers wait for index lock, 
+            while readers keep using old files until they reopen """
+        if isinstance(self.ixer_db, xapian.WritableDatabase): return msg(FX_ERROR_LOCK, _('Index is being written to. Compaction skipped'))
+        if self.ix_lock is None: self.ix_lock = FeedexFileLock(os.path.join(self.db_path, 'index.lock'))
+        if not self.ix_lock.acquire(timeout=0): return msg(FX_ERROR_LOCK, _('Index locked by process %a. Compaction skipped'), self.ix_lock.holder())
+
+        tmp_path = f'{self.ix_path}.compact'
+        old_path = f'{self.ix_path}.old'
+        try:
+            for p in (tmp_path, old_path,):
+                if os.path.isdir(p): rmtree(p)
+            msg(_('Compacting index...'))
+            src = xapian.Database(self.ix_path)
+            # Doc ids are kept, as they are referenced by entries
+            try: src.compact(tmp_path, xapian.DBCOMPACT_NO_RENUMBER)
+            finally: src.close()
+            os.rename(self.ix_path, old_path)
+            os.rename(tmp_path, self.ix_path)
+        except (xapian.Error, OSError,) as e:
+            if not os.path.isdir(self.ix_path) and os.path.isdir(old_path): os.rename(old_path, self.ix_path)
+            rmtree(tmp_path, ignore_errors=True)
+            self.ix_lock.release()
+            return msg(FX_ERROR_INDEX, _('Error compacting index: %a'), e)
+        self.ix_lock.release()
+        rmtree(old_path, ignore_errors=True)
+
+        if self.pool is None and isinstance(self.ix, xapian.Database):
+            self.ix.close()
+            self.ix = xapian.Database(self.ix_path)
+        msg(_('Index compacted'), log=True)
+        return self.save_param('ix_compacted', self.get_doc_count())
 
 
 
@@ -901,7 +1260,7 @@ class FeedexDatabase:
         """ Check if database maintenance is required """
         last_maint = slist(self.qr_sql("""select max(coalesce(time,0)) from actions where name = 'maintenance' """, one=True), 0, 0)
         doc_count = self.get_doc_count()
-        if doc_count - scast(last_maint, int, 0) >= 100000: return True
+        if doc_count - scast(last_maint, int, 0) >= MAINT_DUE_DOCS: return True
         else: return False
 
  
@@ -932,10 +1291,9 @@ class FeedexDatabase:
             delta = scast(v, int, 0)
             if delta != 0:
                 if fdx.feeds_cache is None: self.load_feeds(**kargs)
-                for i,f in enumerate(fdx.feeds_cache):
-                    if f[FEEDS_SQL_TABLE.index('id')] == k and f[FEEDS_SQL_TABLE.index('is_category')] != 1:
-                        do_reload = True
-                        err = self.run_sql_lock('update feeds set recom_weight = coalesce(recom_weight,0) + :delta where id = :id', {'delta':delta, 'id':k})
+                if fdx.load_feed(k) != -1:
+                    do_reload = True
+                    err = self.run_sql_lock('update feeds set recom_weight = coalesce(recom_weight,0) + :delta where id = :id', {'delta':delta, 'id':k})
 
 
         if not fdx.single_run and do_reload and err == 0: 
@@ -957,6 +1315,16 @@ class FeedexDatabase:
         
 
 
+    def bump_data_gen(self, **kargs):
+        """ Increment data generation counter, so results cached before are not used anymore """
+        return self.run_sql_multi_lock(*DATA_GEN_BUMP_SQL, **kargs)
+
+    def get_data_gen(self, **kargs):
+        """ Retrieve data generation counter from params """
+        return self.get_saved_param('data_gen', type=int, default=0)
+
+
+
     def get_doc_count(self, **kargs):
         """ Retrieve entry count from params"""
         if fdx.doc_count is not None: return fdx.doc_count
@@ -1048,32 +1416,75 @@ class FeedexDatabase:
 
 
     def import_entries(self, **kargs):
-        """ Wraper for inserting entries from list of dicts or a file """
+        """ Wraper for inserting entries from list of dicts, a file or a pipe. Input (JSON array or one JSON object per line)
+            is streamed and committed in batches. Progress is saved after each batch, so failed import can be resumed """
         pipe = kargs.get('pipe',False)
         efile = kargs.get('efile')
         elist = kargs.get('elist')
-
-        contents = ''
-        if elist is None:
-            if pipe:
-                for line in sys.stdin: contents = f"{contents}\n{line}"
-            elif efile is not None:
-                try:
-                    with open(efile, "r") as f: contents = f.read()
-                except OSError as e: return msg(FX_ERROR_IO, _('Error reading %a file: %b'), efile, e)
-
-            try: elist = json.loads(contents)
-            except (json.JSONDecodeError) as e: return msg(FX_ERROR_IO, _('Error parsing JSON: %a'), e)
-
-        # Validate data received from json
-        if not isinstance(elist, (list, tuple)):  return msg(FX_ERROR_IO, _('Invalid input: must be a list of dicts...'))
-        
-        if pipe: msg(_('Importing entries ...'))
-        else: msg(_('Importing entries from %a...'), efile)
+        batch_size = scast(kargs.get('batch'), int, IMPORT_BATCH_SIZE)
+
+        f = None
+        if elist is not None:
+            # Validate data received from caller
+            if not isinstance(elist, (list, tuple)):  return msg(FX_ERROR_IO, _('Invalid input: must be a list of dicts...'))
+            source, items = None, elist
+        elif pipe:
+            source, items = '<stdin>', json_items_gen(sys.stdin)
+            msg(_('Importing entries ...'))
+        elif efile is not None:
+            source = os.path.abspath(efile)
+            try: f = open(efile, 'r')
+            except OSError as e: return msg(FX_ERROR_IO, _('Error reading %a file: %b'), efile, e)
+            items = json_items_gen(f)
+            msg(_('Importing entries from %a...'), efile)
+        else: return msg(FX_ERROR_IO, _('Nothing to import'))
+
+        skip = 0
+        if kargs.get('resume', False) and source is not None:
+            progress = scast(self.get_saved_param('import_progress'), str, '').rsplit('\t', 1)
+            if progress[0] == source: skip = scast(slist(progress, 1, 0), int, 0)
+            if skip > 0: msg(_('Resuming import after %a items...'), skip)
+            else: msg(_('No saved progress for %a. Starting from the beginning...'), source)
 
         entry = FeedexEntry(self)
-        err = entry.add_many(elist)
-        return err
+        read = 0 # Items read from input so far ...
+        done = skip # ... and already committed
+        batch = []
+        err = 0
+        try:
+            for i in items:
+                read += 1
+                if read <= skip: continue
+                if type(i) not in (dict, list, tuple,):
+                    msg(FX_ERROR_VAL, _('Invalid item %a format (must be list or dict)!'), read)
+                    continue
+                batch.append(i)
+                if len(batch) < batch_size: continue
+
+                err = entry.add_many(batch)
+                if err != 0: break
+                batch.clear()
+                done = read
+                if source is not None: self.save_param('import_progress', f'{source}\t{done}')
+                msg(_('Processed %a items...'), done)
+
+            if err == 0 and len(batch) > 0:
+                err = entry.add_many(batch)
+                if err == 0: done = read
+
+        except ValueError as e: err = msg(FX_ERROR_IO, *e.args) # Raised by JSON stream with message and args
+        except OSError as e: err = msg(FX_ERROR_IO, _('Error reading input: %a'), e)
+        finally:
+            if f is not None: f.close()
+
+        if err != 0:
+            if source is not None:
+                self.save_param('import_progress', f'{source}\t{done}')
+                msg(FX_ERROR_IO, _('Import stopped after %a items. Run it again with --resume option to continue'), done)
+            return err
+
+        if source is not None: self.clear_param('import_progress')
+        return msg(_('Import finished (%a items processed)'), done)
 
 
 
@@ -1162,15 +1573,15 @@ class FeedexDatabase:
 
         handler = None
         # Data handlers init - to lazy load later...
-        rss_handler = None
-        html_handler = None
-        script_handler = None
+        handlers = {}
         
         feed = FeedexFeed(self, exists=True)
         entry = FeedexEntry(self, exists=True)
 
         self.cache_feeds()
 
+        # Collect feeds due for processing...
+        feeds_due, feeds_serial = [], []
         for f in fdx.feeds_cache.copy():
 
             feed.populate(f)
@@ -1182,6 +1593,10 @@ class FeedexDatabase:
             if feed_ids is not None and feed['id'] not in feed_ids: continue
             if feed['is_category'] not in {0,None} or feed['handler'] in {'local',}: continue
 
+            if feed['handler'] not in FEEDEX_HANDLERS:
+                msg(FX_ERROR_HANDLER, _('Handler %a not recognized!'), feed['handler'])
+                continue     
+
             # Ignore unhealthy feeds...
             if scast(feed['error'],int,0) >= fdx.config.get('error_threshold',5) and not kargs.get('ignore_errors',False):
                 msg(_('Feed %a ignored due to previous errors'), feed.name(id=True))
@@ -1195,50 +1610,57 @@ class FeedexDatabase:
                     debug(2, f'Feed {feed["id"]} ignored (interval: {feed["interval"]}, diff: {diff})')
                     continue
 
+            # Only HTTP-based handlers can download in advance, others (e.g. scripts) are processed one by one
+            if issubclass(FEEDEX_HANDLERS[feed['handler']], FeedexRSSHandler): feeds_due.append(f)
+            else: feeds_serial.append(f)
+
+            # Stop if this was the specified feed
+            if feed_id != 0: break
+
+
+        # Download concurrently if there is more than one feed to process, otherwise do it one by one in the loop below
+        workers = scast(fdx.config.get('fetch_workers', 1), int, 1)
+        if not update_only and len(feeds_due) > 1 and fdx.config.get('fetch_engine','threads') == 'async': jobs = self._download_many_async(feeds_due, force=force)
+        elif not update_only and workers > 1 and len(feeds_due) > 1: jobs = self._download_many(feeds_due, workers, force=force)
+        else: jobs = ((f, None) for f in feeds_due)
+        if feeds_serial != []: jobs = self._chain_jobs(jobs, ((f, None) for f in feeds_serial))
+
+
+        dedupe_days = scast(fdx.config.get('dedupe_days', 0), int, 0)
+
+        # Single writer loop - all DB and index writes happen here
+        for f, handler in jobs:
+
+            feed.populate(f)
+
             msg(_('Processing %a ...'), feed.name())
 
-            now = datetime.now()
-            now_raw = int(now.timestamp())
+            last_checked = scast(feed['lastchecked'], int, 0)
             last_read = scast(feed['lastread'], int, 0)
             
-            
-            # Choose/lazy-load appropriate handler           
-            if feed['handler'] == 'rss':
-                if rss_handler is None: rss_handler = FeedexRSSHandler(self)
-                handler = rss_handler
-            elif feed['handler'] == 'html':
-                if html_handler is None: html_handler = FeedexHTMLHandler(self)
-                handler = html_handler
-            elif feed['handler'] == 'script':
-                if script_handler is None: script_handler = FeedexScriptHandler(self)
-                handler = script_handler
-            elif feed['handler'] == 'local':
-                msg(_('Channel handled locally... Ignoring...'))
-                continue
-            else:
-                msg(FX_ERROR_HANDLER, _('Handler %a not recognized!'), feed['handler'])
-                continue     
+            # Choose/lazy-load appropriate handler, if feed was not downloaded already
+            if handler is None:
+                if handlers.get(feed['handler']) is None: handlers[feed['handler']] = FEEDEX_HANDLERS[feed['handler']](self)
+                handler = handlers[feed['handler']]
+                handler.set_agent(feed['user_agent'])
 
-            # Set up feed-specific user agent
-            agent = scast(feed['user_agent'], str, '').strip() 
-            if agent != '':
-                msg(_('Using custom User Agent: %a'), feed['user_agent'])
-                handler.set_agent(agent)
-            else: handler.set_agent(None)
+            if scast(feed['user_agent'], str, '').strip() != '': msg(_('Using custom User Agent: %a'), feed['user_agent'])
 
             # Start fetching ...
             if not update_only:
 
-                pguids = self.qr_sql("""select distinct guid from entries e where e.feed_id = :feed_id""", {'feed_id':feed['id']} , all=True)
-                if handler.compare_links: plinks = self.qr_sql("""select distinct link from entries e where e.feed_id = :feed_id""", {'feed_id':feed['id']} , all=True, ignore_errors=False)
-                else: plinks = ()
+                # Sets of previous guids/links for dedupe (optionally only recent ones)
+                if dedupe_days > 0: since = last_read - (dedupe_days * 86400)
+                else: since = None
+                pguids = {r[0] for r in self.qr_sql(DEDUPE_GUIDS_SQL, {'feed_id':feed['id'], 'since':since} , all=True)}
+                if handler.compare_links: plinks = {r[0] for r in self.qr_sql(DEDUPE_LINKS_SQL, {'feed_id':feed['id'], 'since':since} , all=True, ignore_errors=False)}
+                else: plinks = set()
                 
                 if self.status != 0:
                     msg(FX_ERROR_DB, _('Feed %a ignored due to DB error: %b'), feed.name(), self.error, log=True)
                     continue
 
-
-                handler.set_feed(feed)
+                if not handler.downloaded: handler.set_feed(feed)
                 for item in handler.fetch(force=force, pguids=pguids, plinks=plinks, last_read=last_read, last_checked=last_checked):
                     
                     if isinstance(item, dict):
@@ -1274,11 +1696,6 @@ class FeedexDatabase:
                 feed.update_meta(handler.feed_meta_delta, no_commit=True)
 
 
-
-            # Stop if this was the specified feed (i.e. there was a feed specified and a loop was executed)...
-            if feed_id != 0: break
-
-
         # Push final entries to DB (the same as when tech_counter hit before)           
         if not update_only:
             err = entry.commit()
@@ -1308,12 +1725,100 @@ class FeedexDatabase:
 
         if not update_only: msg(_('Finished fetching (%a new articles), duration: %b'), self.new_items, duration)
         else: msg(_('Finished updating metadata, duration: %a'), duration)
-        
+
+        # Fetch lock is already held, so maintenance does not collide with next fetch
+        if not update_only and not kargs.get('no_maintenance', False): self._maintenance_step()
+
         return 0
 
 
 
 
+    def _download_many(self, feeds, workers:int, **kargs):
+        """ Download feeds concurrently with a bounded pool of worker threads. Yields (feed, handler) tuples in order of completion,
+            so the caller (a single writer) can parse and save them while other downloads are still running """
+        force = kargs.get('force', False)
+        per_host = scast(fdx.config.get('fetch_workers_per_host', 2), int, 2)
+
+        # Downloads from the same host are limited with semaphores
+        host_locks = {}
+        jobs = []
+        for f, handler in self._feed_handlers(feeds):
+            host = urllib.parse.urlsplit(scast(handler.ifeed['url'], str, '')).netloc.lower()
+            if host not in host_locks: host_locks[host] = threading.BoundedSemaphore(per_host)
+            jobs.append( (f, handler, host_locks[host]) )
+
+        def _download(job):
+            f, handler, host_lock = job
+            with host_lock:
+                try: handler.prefetch(force=force)
+                except Exception as e:
+                    handler.error, handler.downloaded = True, True
+                    handler.download_err = msg(FX_ERROR_HANDLER, _('Download error: %a'), e)
+            return f, handler
+
+        debug(2, f'Downloading {len(jobs)} feeds with {workers} workers ({per_host} per host)...')
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_download, j) for j in jobs]
+            for fut in as_completed(futures): yield fut.result()
+        finally: pool.shutdown(wait=True, cancel_futures=True)
+
+
+
+
+    def _download_many_async(self, feeds, **kargs):
+        """ Download feeds at once with asynchronous engine. Responses are parsed later by each handler (in the writer loop).
+            Feeds requiring authentication handlers are left to be downloaded the usual way """
+        force = kargs.get('force', False)
+        jobs = self._feed_handlers(feeds)
+        reqs, req_jobs, other_jobs = [], [], []
+        for job in jobs:
+            headers = job[1].request_headers(force=force)
+            if headers is None:
+                other_jobs.append(job)
+                continue
+            reqs.append( (job[1].ifeed['url'], headers) )
+            req_jobs.append(job)
+
+        debug(2, f'Downloading {len(reqs)} feeds with async engine...')
+        # Handlers are yielded as soon as their responses arrive, so the writer can save them while other downloads are running
+        downloader = FeedexAsyncDownloader()
+        done = set()
+        for i, response in downloader.download_iter(reqs):
+            req_jobs[i][1].set_response(response)
+            done.add(i)
+            yield req_jobs[i]
+
+        # ... the rest are downloaded the usual way
+        for i, job in enumerate(req_jobs):
+            if i not in done: yield job
+        for job in other_jobs: yield job
+
+
+
+    def _chain_jobs(self, *jobs):
+        """ Yield jobs from many generators one after another """
+        for js in jobs: yield from js
+
+
+
+    def _feed_handlers(self, feeds):
+        """ Create a separate handler for every feed, as handlers are stateful """
+        jobs = []
+        for f in feeds:
+            ifeed = FeedexFeed(self, exists=True)
+            ifeed.populate(f)
+            handler = FEEDEX_HANDLERS[ifeed['handler']](self)
+            handler.set_agent(ifeed['user_agent'])
+            handler.set_feed(ifeed)
+            jobs.append( (f, handler) )
+        return jobs
+
+
+
+
 
 
 
@@ -1353,30 +1858,21 @@ class FeedexDatabase:
             if index: msg(_("Reindexing entries..."), log=True)
         
             err = 0
-            page = 0
-            t_start_id = 0
-            t_end_id = 0
-            stop = False
 
             if rank: self.connect_QP() # Needed to bypass lock
 
-            while not stop:
-                t_start_id = start_id + (page * batch_size)
-                page += 1
-                t_end_id = start_id + (page * batch_size)
-                vs = {'start_id':t_start_id, 'end_id':t_end_id}
-                if t_end_id >= end_id:
-                    t_end_id = end_id
-                    stop = True
+            workers = scast(kargs.get('workers'), int, 1)
+            if workers > 1: return self._recalculate_mp(start_id, end_id, workers, batch_size, learn=learn, rank=rank, index=index)
 
-                for e in self.qr_sql_iter(RECALC_MULTI_SQL, vs):
+            for rows in self._recalc_pages(start_id, end_id, batch_size):
+                for e in rows:
                     entry.populate(e)
                     if learn: err = entry.relearn(no_commit=True)
                     elif rank: err = entry.rerank(no_commit=True)
                     elif index: err = entry.reindex(no_commit=True)
-                if self.status != 0: return self.status
                 err = entry.commit()
                 if err != 0: return msg(err, _('Recalculation aborted due to errors'))
+            if self.status != 0: return self.status
             
             msg(_('Recalculation finished!'), log=True)
             return 0
@@ -1391,6 +1887,97 @@ class FeedexDatabase:
 
 
 
+    def _recalc_pages(self, start_id:int, end_id:int, batch_size:int):
+        """ Generator for paging through entries to recalculate """
+        page = 0
+        stop = False
+        while not stop:
+            t_start_id = start_id + (page * batch_size)
+            page += 1
+            t_end_id = start_id + (page * batch_size)
+            if t_end_id >= end_id:
+                t_end_id = end_id
+                stop = True
+            rows = self.qr_sql(RECALC_MULTI_SQL, {'start_id':t_start_id, 'end_id':t_end_id}, all=True)
+            if self.status != 0: return
+            if len(rows) > 0: yield rows
+
+
+
+    def _recalculate_mp(self, start_id:int, end_id:int, workers:int, batch_size:int, **kargs):
+        """ Recalculate entries using a pool of worker processes for linguistic processing.
+            Workers get batches of rows and return compact results, while this process does all writes to DB and index """
+        if kargs.get('learn', False): mode, action = 'learn', 'relearn'
+        elif kargs.get('rank', False): mode, action = 'rank', 'rerank'
+        else: mode, action = 'index', 'reindex'
+
+        # Rules are validated once here and shipped to workers
+        self.connect_LP()
+        if mode == 'rank': 
+            self.cache_rules()
+            if fdx.rules_val_cache is None: self.LP.validate_rules()
+        elif mode == 'learn': self.cache_terms()
+
+        chunk_size = max(1, batch_size // workers)
+        if 'fork' in multiprocessing.get_all_start_methods(): ctx = multiprocessing.get_context('fork')
+        else: ctx = None
+
+        entry = FeedexEntry(self, exists=True)
+        pending = deque()
+        uncommitted = 0
+        msg(_('Using %a worker processes...'), workers)
+
+        def _apply(rows, future):
+            # Any exception raised in a worker is re-raised here
+            try: results = future.result()
+            except Exception as e: return msg(FX_ERROR_LP, _('Worker process error: %a'), e, log=True)
+            for row, res in zip(rows, results):
+                entry.populate(row)
+                if res is None: continue
+                err = getattr(entry, action)(no_commit=True, results=res)
+                if err != 0: return err
+            return 0
+
+        pool = None
+        try:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=recalc_worker_init, initargs=(fdx.config, fdx.rules_val_cache,))
+            for rows in self._recalc_pages(start_id, end_id, batch_size):
+                for i in range(0, len(rows), chunk_size):
+                    chunk = rows[i:i+chunk_size]
+                    pending.append( (chunk, pool.submit(recalc_worker, chunk, mode, MAX_FEATURES_PER_ENTRY)) )
+
+                # Keep workers busy while limiting memory use
+                while len(pending) > workers * 2:
+                    chunk, future = pending.popleft()
+                    err = _apply(chunk, future)
+                    if err != 0: return msg(err, _('Recalculation aborted due to errors'))
+                    uncommitted += len(chunk)
+                
+                if uncommitted >= batch_size:
+                    err = entry.commit()
+                    if err != 0: return msg(err, _('Recalculation aborted due to errors'))
+                    uncommitted = 0
+
+            while len(pending) > 0:
+                chunk, future = pending.popleft()
+                err = _apply(chunk, future)
+                if err != 0: return msg(err, _('Recalculation aborted due to errors'))
+
+        except (OSError, BrokenProcessPool,) as e:
+            return msg(FX_ERROR_LP, _('Worker process error: %a'), e, log=True)
+
+        finally:
+            if pool is not None: pool.shutdown(wait=True, cancel_futures=True)
+
+        if self.status != 0: return self.status
+        err = entry.commit()
+        if err != 0: return msg(err, _('Recalculation aborted due to errors'))
+
+        msg(_('Recalculation finished!'), log=True)
+        return 0
+
+
+
 
 
 
@@ -1414,14 +2001,47 @@ class FeedexDatabase:
         if err != 0: return err
         else:
             deleted_terms = self.rowcount
+            self.bump_data_gen()
             if not fdx.single_run: self.load_terms()
             return msg(_('Deleted %a learned keywords'), deleted_terms)
 
 
 
+    def rebuild_fts(self, **kargs): return self.run_locked(FX_LOCK_ALL, self._rebuild_fts, **kargs)
+    def _rebuild_fts(self, **kargs):
+        """ Create (if needed) and rebuild full-text index used to speed up string matching """
+        msg(_('Building full-text index...'), log=True)
+        if self.loc_locked(): return msg(FX_ERROR_LOCK, _('DB locked locally!'))
+        try:
+            with self.conn: self.curs.executescript(FTS_DDL_SQL)
+        except (sqlite3.Error, sqlite3.OperationalError) as e:
+            fdx.db_lock.release()
+            return msg(FX_ERROR_DB, _('Could not create full-text index (SQLite with FTS5 trigram tokenizer is needed): %a'), e, log=True)
+        err = self._run_sql(FTS_REBUILD_SQL)
+        fdx.db_lock.release()
+        if err != 0: return err
+        self.fts = True
+        return msg(_('Full-text index rebuilt'), log=True)
+
+
+    def drop_fts(self, **kargs): return self.run_locked(FX_LOCK_ALL, self._drop_fts, **kargs)
+    def _drop_fts(self, **kargs):
+        """ Remove full-text index (string matching falls back to table scans) """
+        if self.loc_locked(): return msg(FX_ERROR_LOCK, _('DB locked locally!'))
+        try:
+            with self.conn: self.curs.executescript(FTS_DROP_SQL)
+        except (sqlite3.Error, sqlite3.OperationalError) as e:
+            return msg(FX_ERROR_DB, _('Error removing full-text index: %a'), e, log=True)
+        finally: fdx.db_lock.release()
+        self.fts = False
+        return msg(_('Full-text index removed'), log=True)
+
+
+
     def empty_trash(self, **kargs): return self.run_locked({FX_LOCK_FETCH, FX_LOCK_FEED, FX_LOCK_ENTRY,}, self._empty_trash, **kargs)
     def _empty_trash(self, **kargs):
-        """ Removes all deleted items permanently """
+        """ Removes all deleted items permanently. Entries are purged in chunks with set-based deletes, 
+            index documents of deleted channels are removed by their FEED_ID term """
         # Delete permanently with all data
         terms_deleted = 0
         entries_deleted = 0
@@ -1430,28 +2050,70 @@ class FeedexDatabase:
         if err != 0: return err
         terms_deleted = self.rowcount
 
-        entry = FeedexEntry(self, exists=True)
-        for e in self.qr_sql_iter('select * from entries where coalesce(deleted,0) > 0'):
-            entry.populate(e)
-            err = entry._oper(FX_ENT_ACT_DEL_PERM, no_commit=True)
+        del_feeds = [f[FEEDS_SQL_TABLE.index('id')] for f in fdx.feeds_cache if scast(f[FEEDS_SQL_TABLE.index('deleted')], int, 0) > 0]
+
+        # Entries deleted one by one were already removed from index, so only whole channels are left
+        if len(del_feeds) > 0:
+            msg(_('Removing deleted channels from index...'))
+            self.connect_ixer()
+            try:
+                for f in del_feeds: self.ixer_db.delete_document(f'FEED_ID {f}')
+            except xapian.DatabaseError as e:
+                self.close_ixer(rollback=True)
+                return msg(FX_ERROR_INDEX, _('Index error: %a'), e)
+            err = self.close_ixer()
             if err != 0: return err
-            entries_deleted += 1
-        if self.status != 0: return self.status
-        err = entry.commit()
-        if err != 0: return err
-        
-        feed = FeedexFeed(self, exists=True)
-        for f in fdx.feeds_cache:
-            if scast(f[FEEDS_SQL_TABLE.index('deleted')], int, 0) == 0: continue
-            feed.populate(f)
-            entries_deleted += feed.get_doc_count()
-            err = feed._oper(FX_ENT_ACT_DEL_PERM, no_commit=True)
+
+        # Images are listed once instead of checking files for each entry
+        images = {}
+        for d in (self.img_path, self.cache_path,):
+            try:
+                with os.scandir(d) as it:
+                    for f in it:
+                        if not f.name.endswith('.img'): continue
+                        eid = scast(f.name[:-4], int, None)
+                        if eid is not None: images.setdefault(eid, []).append(f.path)
+            except OSError as e: msg(FX_ERROR_IO, _('Error reading %a: %b'), d, e)
+
+        last = 0
+        while True:
+            ids = self.qr_sql(EMPTY_TRASH_ENTRY_IDS_SQL, {'last':last, 'limit':EMPTY_TRASH_CHUNK}, all=True)
+            if self.status != 0: return self.status
+            if len(ids) == 0: break
+
+            pars = {'last':last, 'limit':EMPTY_TRASH_CHUNK}
+            err = self.run_sql_lock(EMPTY_TRASH_ENTRY_TERMS_SQL, pars)
             if err != 0: return err
-            feeds_deleted += 1
-        if self.status != 0: return self.status
-        err = feed.commit()
+            terms_deleted += self.rowcount
+            err = self.run_sql_lock(EMPTY_TRASH_ENTRIES_SQL, pars)
+            if err != 0: return err
+            entries_deleted += self.rowcount
+
+            for i in ids:
+                for im_file in images.pop(i[0], ()):
+                    try: os.remove(im_file)
+                    except (OSError, IOError,) as e: msg(FX_ERROR_IO, _('Error removing image %a: %b'), im_file, e)
+
+            last = ids[-1][0]
+            msg(_('Removed %a entries...'), entries_deleted)
+
+        for f in del_feeds:
+            im_file = os.path.join(self.icon_path, f'feed_{f}.ico')
+            if os.path.isfile(im_file):
+                try: os.remove(im_file)
+                except (OSError, IOError,) as e: msg(FX_ERROR_IO, _('Error removing %a: %b'), im_file, e)
+
+        err = self.run_sql_multi_lock(*EMPTY_TRASH_FEEDS_SQL)
+        if err != 0: return err
+        feeds_deleted = self.rowcount
+        err = self.bump_data_gen()
         if err != 0: return err
 
+        # Refresh caches once at the end
+        if not fdx.single_run:
+            self.load_feeds()
+            self.load_terms()
+
         return msg(_('Trash emptied: %a channels/categories, %b entries, %c learned keywords removed'), feeds_deleted, entries_deleted, terms_deleted, log=True)
                      
 
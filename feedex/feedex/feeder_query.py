@@ -52,6 +52,85 @@ class FeedexQueryInterface:
 
 
 
+class FeedexQueryCache:
+    """ Persistent cache of composite query results (one compressed pickle per query). Keys contain 
+        data generation, so results are not used after data changes. Least recently used files are removed 
+        above size limit """
+
+    def __init__(self, path:str, **kargs):
+        self.path = path
+        self.max_size = scast(kargs.get('max_size'), int, QUERY_CACHE_MAX_SIZE)
+        self.ttl = scast(kargs.get('ttl'), int, QUERY_CACHE_TTL)
+
+
+    def key(self, *args):
+        """ Make key from any JSON-like parameters """
+        return hashlib.sha1(json.dumps(args, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+    def get(self, key:str):
+        """ Get cached data or None """
+        cache_file = os.path.join(self.path, f'{key}.pkl')
+        try:
+            with open(cache_file, 'rb') as f: created, data = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError: return None
+        except (OSError, pickle.UnpicklingError, zlib.error, EOFError, ValueError, TypeError, AttributeError, ImportError) as e:
+            debug(2, f'Invalid query cache file {cache_file}: {e}')
+            return None
+        
+        if time.time() - scast(created, float, 0) > self.ttl: return None
+        try: os.utime(cache_file) # Modification time marks last use
+        except OSError: pass
+        return data
+
+
+    def put(self, key:str, data):
+        """ Save data to cache and evict old items if over size limit """
+        cache_file = os.path.join(self.path, f'{key}.pkl')
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        try:
+            raw = zlib.compress(pickle.dumps( (time.time(), data,), protocol=pickle.HIGHEST_PROTOCOL))
+            if len(raw) > self.max_size: return 0
+            if not os.path.isdir(self.path): os.makedirs(self.path)
+            with open(tmp_file, 'wb') as f: f.write(raw)
+            os.replace(tmp_file, cache_file)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            return msg(FX_ERROR_IO, _('Error writing query cache: %a'), e)
+        return self._evict()
+
+
+    def _evict(self):
+        files = []
+        total = 0
+        try:
+            with os.scandir(self.path) as it:
+                for f in it:
+                    if not f.name.endswith('.pkl'): continue
+                    st = f.stat()
+                    files.append( (st.st_mtime, st.st_size, f.path,) )
+                    total += st.st_size
+        except OSError as e: return msg(FX_ERROR_IO, _('Error reading query cache: %a'), e)
+        
+        if total <= self.max_size: return 0
+        files.sort()
+        for mtime, size, path in files:
+            if total <= self.max_size: break
+            try: 
+                os.remove(path)
+                total -= size
+            except OSError: pass
+        return 0
+
+
+    def clear(self):
+        """ Remove all cached results """
+        if os.path.isdir(self.path): rmtree(self.path, ignore_errors=True)
+        return 0
+
+
+
+
+
 class FeedexQuery(FeedexQueryInterface):
     """ Class for query parsing, searching and rule matching for Feedex """
 
@@ -92,6 +171,10 @@ class FeedexQuery(FeedexQueryInterface):
 
         self.snippets_lst = [] # Snippet lists for query results (string search)
 
+        self.keyset = None # Ordering columns usable for seek pagination of last query
+
+        self.cache = FeedexQueryCache(os.path.join(self.DB.db_path, 'query_cache')) # Results of composite queries
+
 
 
 
@@ -125,8 +208,7 @@ class FeedexQuery(FeedexQueryInterface):
         cnt = kargs.get('cnt',False)
         snippets = kargs.get('snippets',True)
         recom = kargs.get('recom', False)
-        
-        max_context_length = fdx.config.get('max_context_length', 500)
+        ix_matches = None
 
         # Construct phrase if needed
         if kargs.get('phrase') is None:
@@ -155,31 +237,31 @@ class FeedexQuery(FeedexQueryInterface):
             else: ix_qr, enquire = ret
 
 
-            ix_matches = enquire.get_mset(filters['start_n'],  filters['page_len'] )
+            if filters.get('no_limit', False): ix_matches = enquire.get_mset(0, self.DB.ix.get_doccount())
+            else: ix_matches = enquire.get_mset(filters['start_n'],  filters['page_len'] )
 
             self.ix_results.clear()
             self.ix_results_ids.clear()
             
             if recom: max_rank_recom = ix_matches.get_max_attained()/20
 
+            term_vars = {} # Matching terms resolved to string variants (synonym lookups are repeated across documents)
             for ixm in ix_matches:
                 self.ix_results_ids.append(ixm.docid)
                 
-                if cnt or rank:
-                    snips = []
-                    if snippets:
-                        for t in enquire.matching_terms(ixm):
-                            t = t.decode("utf-8")
-                            if len(t) >=2 and t[1] == PREFIXES['exact']: snips.append(t[2:])
-                            elif len(t) > 1 and t[0] == PREFIXES['exact']: snips.append(t[1:])
-                            elif t.startswith(PREFIXES['sem']): continue
-                            else:
-                                if t[0] in META_PREFIXES: t = t[1:]
-                                for v in self.DB.ix.synonyms(t): snips.append(v.decode("utf-8"))
-                    count = ixm.rank
-                else: 
-                    count = None
-                    snips = ()
+                if cnt or rank: count = ixm.rank
+                else: count = None
+
+                if snippets:
+                    vars = set()
+                    for t in enquire.matching_terms(ixm):
+                        vs = term_vars.get(t)
+                        if vs is None:
+                            vs = self._term_vars(t)
+                            term_vars[t] = vs
+                        vars.update(vs)
+                    snips = tuple(sorted(vars))
+                else: snips = ()
 
                 self.ix_results[ixm.docid] = (ixm.weight, ixm.rank, count, snips)
 
@@ -198,6 +280,9 @@ class FeedexQuery(FeedexQueryInterface):
 
         # Query SQL database
         (query, vals) = self._build_sql(self.phrase, filters, **kargs)
+        if filters.get('after') is not None and (self.keyset is None or len(filters['after']) != len(self.keyset)):
+            self._empty(result=ResultEntry())
+            return msg(FX_ERROR_QUERY, _('Seek key can only be used with ordering by date or ID!'))
 
         # Merge Xapian stats with SQL results
         ranked = False #Are results ranked?
@@ -207,7 +292,7 @@ class FeedexQuery(FeedexQueryInterface):
             for r in self.DB.qr_sql_iter(query, vals):
                 self.result.populate(r)
 
-                if rank or cnt or snippets: ix_result = self.ix_results.get(self.result['ix_id'], (0,0,0,[]))
+                if rank or cnt: ix_result = self.ix_results.get(self.result['ix_id'], (0,0,0,()))
 
                 # Append Xapian ranking to SQL results                
                 if rank: 
@@ -218,28 +303,6 @@ class FeedexQuery(FeedexQueryInterface):
                 
                 if cnt: self.result['count'] = ix_result[0]
 
-                if snippets:  # ... and try to extract snippets 
-                    
-                    if filters.get('field') is not None: field_lst = (filters.get('field'),)
-                    else: field_lst = LING_TEXT_LIST
-                        
-                    snips = []
-                    vars = ix_result[3].copy()
-                        
-                    for f in field_lst:
-                        f = self.result[f]
-                        if type(f) is not str: continue
-                        lf = f.lower()
-                        for v in vars:
-                            (c, sn) = self.LP.str_matcher((v,), 1, False, False, lf, snippets=snippets, orig_field=f)
-                            if snippets:
-                                for s in sn:
-                                    if len(s) == 3 and (len(s[1]) <= max_context_length or max_context_length == 0): # check this to avoid showing long matches
-                                        snips.append(tuple(s))
-
-
-                    self.result['snippets'] = tuple(snips)
-
                 self.results.append(self.result.tuplify(all=True))
 
 
@@ -253,9 +316,6 @@ class FeedexQuery(FeedexQueryInterface):
             for r in self.DB.qr_sql_iter(query, vals):
                 self.result.populate(r)
 
-                if snippets: 
-                    snips = []
-                    sn = []
                 if rank or cnt:
                     if filters.get('field') is not None: field_lst = (filters.get('field'),)
                     else: field_lst = LING_TEXT_LIST
@@ -266,15 +326,8 @@ class FeedexQuery(FeedexQueryInterface):
                         if type(f) is not str: continue
                         if case_ins: lf = f.lower()
                         else: lf = f
-                        (c, sn) = self.LP.str_matcher(self.phrase['spl_string'], self.phrase['spl_string_len'], self.phrase['beg'], self.phrase['end'], lf, snippets=snippets, orig_field=f)
+                        (c, sn) = self.LP.str_matcher(self.phrase['spl_string'], self.phrase['spl_string_len'], self.phrase['beg'], self.phrase['end'], lf, snippets=False)
                         count += c
-                        if snippets: 
-                            for s in sn:
-                                if len(s) == 3 and (len(s[1]) <= max_context_length or max_context_length == 0): # check this to avoid showing long wildcard matches        
-                                    snips.append(s)
-                            
-
-                if snippets: self.result['snippets'] = tuple(snips)
 
                 # Append a simple rank 
                 if rank:
@@ -324,6 +377,12 @@ class FeedexQuery(FeedexQueryInterface):
 
         if rev: self._rev()
 
+        # Extract snippets only for rows that are shown - grouping keeps all, depth keeps only top results
+        if snippets and ranked:
+            snippet_window = kargs.get('snippet_window')
+            if snippet_window is None and kargs.get('allow_group',False) and filters.get('group') is None: snippet_window = filters.get('depth')
+            self._build_snippets(qtype, filters, case_ins, snippet_window, ix_matches)
+
         # Group results, if needed
         if kargs.get('allow_group',False):
             if filters.get('group') is not None:
@@ -357,10 +416,31 @@ class FeedexQuery(FeedexQueryInterface):
 #
 
 
-    def recommend(self, filters, **kargs):
+    def _run_cached(self, action, func, *args, **kargs):
+        """ Run composite query or restore its results from cache if data did not change since """
+        if self.action is None: self.action = action
+        if not fdx.config.get('use_query_cache', True) or kargs.get('no_cache', False): return func(*args, **kargs)
+
+        key = self.cache.key(action, args, kargs, self.DB.get_data_gen(), fdx.recom_qr_str, fdx.config.get('lang'))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.result = cached[0]()
+            self.results, self.result_no, self.result_no2 = cached[1], cached[2], cached[3]
+            debug(2, f'Results taken from query cache ({key})')
+            return 0
+
+        err = func(*args, **kargs)
+        if err == 0: self.cache.put(key, (self.result.__class__, self.results, self.result_no, self.result_no2,))
+        return err
+
+
+
+    def recommend(self, filters, **kargs): 
+        self.DB.cache_terms()
+        return self._run_cached(FX_ENT_QR_RECOM, self._recommend, filters, **kargs)
+    def _recommend(self, filters, **kargs):
         """ Rank by recommendation from filterred entries """
         if self.action is None: self.action = FX_ENT_QR_RECOM
-        self.DB.cache_terms()
         filters['qtype'] = 1
         err = self.query(fdx.recom_qr_str, filters, w_scheme='tfidf', rank=True, recom=True, snippets=False, no_history=True, no_wildcards=True, allow_group=kargs.get('allow_group',True))        
         return err
@@ -369,7 +449,8 @@ class FeedexQuery(FeedexQueryInterface):
 
 
 
-    def trends(self, qr, filters, **kargs):
+    def trends(self, qr, filters, **kargs): return self._run_cached(FX_ENT_QR_TRENDS, self._trends, qr, filters, **kargs)
+    def _trends(self, qr, filters, **kargs):
         """ Extract trends from group of entries (can get time consuming) """
         if self.action is None: self.action = FX_ENT_QR_TRENDS
         qr = scast(qr, str, '')
@@ -381,25 +462,10 @@ class FeedexQuery(FeedexQueryInterface):
 
         self.query(qr, filters, rank=False, cnt=False, snippets=False, no_history=True, allow_group=False)
         
-        self.results = list(self.results)
-        self.results.sort(key=lambda x: x[self.result.get_index('lang')]) # Sort results by language to minimize language model reloading
-
-        keywords = {}
-        for r in self.results:
-            lang = r[self.result.get_index('lang')]
-            self.LP.set_model(lang)
-            if flang is not None:
-                if self.LP.get_model() != flang: continue
-
-            raw_text = ''
-            for f in LING_TEXT_LIST:
-                raw_text = f"""{raw_text}
-{scast(r[self.result.get_index(f)], str, '')}"""
-
-            kwds = self.LP.extract_features(raw_text, MAX_FEATURES_PER_ENTRY)
-            for kw in kwds:
-                weight = keywords.get(kw[0],(0,0))[0]
-                keywords[kw[0]] = (weight + kw[1], kw[2])
+        keywords = self._stored_keywords(self.results, model=flang)
+        if type(keywords) is not dict:
+            self._empty(result=ResultTerm())
+            return keywords
 
         self.result = ResultTerm()
         self.results = []
@@ -418,7 +484,8 @@ class FeedexQuery(FeedexQueryInterface):
 
 
 
-    def trending(self, qr, filters, **kargs):
+    def trending(self, qr, filters, **kargs): return self._run_cached(FX_ENT_QR_TRENDING, self._trending, qr, filters, **kargs)
+    def _trending(self, qr, filters, **kargs):
         """ Get trending articles from given filters"""
         if self.action is None: self.action = FX_ENT_QR_TRENDING
         qr = scast(qr, str, '')
@@ -517,101 +584,75 @@ class FeedexQuery(FeedexQueryInterface):
 
 
     def _build_time_series(self, group, rev, do_rank, **kargs):
-        """ Converts frequency dictionary to time series """
+        """ Converts results to time series. Results are put into buckets numbered by local hour/day/month 
+            with integer arithmetic and gaps are filled by stepping through bucket numbers, 
+            so dates are formatted once per data point """
         result = ResultEntry()
+        if do_rank: val_ix, val_tp = result.get_index('rank'), float
+        else: val_ix, val_tp = result.get_index('count'), int
+        pubdate_ix = result.get_index('pubdate')
+
+        if group == 'hourly': span = 3600
+        else: span = 86400
 
-        # Count results by specific date keys
+        # Count results by bucket numbers
+        offsets = {} # UTC offsets are cached for each day without a DST change (False marks days with a change)
+        months = {}
         freq_dict = {}
         for r in self.results:
-            result.clear()
-            result.populate(r)
-            if do_rank: rnk = scast(result['rank'], float, 0)
-            else: rnk = scast(result['count'], int, 0)
-            dtetime = scast(result['pubdate'], int, 0)
-
-            if group == 'hourly':
-                hour = time.strftime('%Y-%m-%d %H', time.localtime(dtetime)) + ":00:00"
-                freq_dict[hour] = freq_dict.get(hour,0) + rnk
-
-            elif group == 'daily':
-                day = time.strftime('%Y-%m-%d', time.localtime(dtetime)) + " 00:00:00"
-                freq_dict[day] = freq_dict.get(day,0) + rnk
-                    
-            elif group == 'monthly':
-                month = time.strftime('%Y-%m', time.localtime(dtetime)) + "-01 00:00:00"
-                freq_dict[month] = freq_dict.get(month,0) + rnk                    
-
-  
-        # Construct time series from frequency dictionary
-        data_points = []
+            dtetime = r[pubdate_ix]
+            if type(dtetime) is not int: dtetime = scast(dtetime, int, 0)
+            q = dtetime // 86400
+            off = offsets.get(q)
+            if off is None:
+                off = time.localtime(q * 86400).tm_gmtoff
+                if off != time.localtime(q * 86400 + 86399).tm_gmtoff: off = False
+                offsets[q] = off
+            if off is False: off = time.localtime(dtetime).tm_gmtoff
+            k = (dtetime + off) // span
+            
+            if group == 'monthly':
+                m = months.get(k)
+                if m is None:
+                    d = date.fromordinal(k + TS_EPOCH_ORDINAL)
+                    m = d.year * 12 + d.month - 1
+                    months[k] = m
+                k = m
+
+            val = r[val_ix]
+            if type(val) is not val_tp: val = scast(val, val_tp, 0)
+            freq_dict[k] = freq_dict.get(k,0) + val
+
+
+        # Find range of non-zero data points
         mx = 0
-        for f in freq_dict.keys():
-            freq = freq_dict.get(f,0)
+        k_min, k_max = None, None
+        for k, freq in freq_dict.items():
             if freq == 0: continue
             if freq > mx: mx = freq
-            data_points.append([f, round(freq, 3)])
+            if k_min is None or k < k_min: k_min = k
+            if k_max is None or k > k_max: k_max = k
 
-        data_points.sort(key=lambda x: x[0], reverse=False)
+        if k_min is None:
+            self._empty(result=ResultTimeSeries())
+            return 0
 
-        date_start = data_points[0][0]
-        date_end = data_points[-1][0]
+        # Populate every step on date, even if there were 0 occurences
+        epoch = datetime(1970,1,1)
+        if group == 'hourly': disp_fmt, step = '%Y-%m-%d %H:%M', relativedelta(hours=1)
+        elif group == 'daily': disp_fmt, step = '%Y-%m-%d', relativedelta(days=1)
+        else: disp_fmt, step = '%Y-%m', relativedelta(months=1)
+        dsecond_minus = relativedelta(seconds=-1)
 
         time_series = []
-        ts = date_start
-
-        mon_rel = relativedelta(months=1)
-        day_rel = relativedelta(days=1)
-        
-        if group == "hourly": 
-            ts_from = datetime.strptime(date_start, "%Y-%m-%d %H:%M:%S")
-            ts_to = ts_from + timedelta(hours=1) - timedelta(seconds=1)
-            ts_from = ts_from.strftime("%Y-%m-%d %H:%M:%S")
-            ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-            time_series.append([date_start[:-3], ts_from, ts_to, freq_dict[date_start]])
-        
-        elif group == "daily": 
-            ts_from = datetime.strptime(date_start, "%Y-%m-%d %H:%M:%S")
-            ts_to = ts_from + day_rel - timedelta(seconds=1)
-            ts_from = ts_from.strftime("%Y-%m-%d %H:%M:%S")
-            ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-            time_series.append([date_start[:-9], ts_from, ts_to, freq_dict[date_start]])
-        
-        elif group == "monthly": 
-            ts_from = datetime.strptime(date_start, "%Y-%m-%d %H:%M:%S")
-            ts_to = ts_from + mon_rel - timedelta(seconds=1)
-            ts_from = ts_from.strftime("%Y-%m-%d %H:%M:%S")
-            ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-            time_series.append([date_start[:-12], ts_from, ts_to, freq_dict[date_start]])
-
-        # Populate every step on date, even if there were 0 occurences
-        while ts != date_end:
-            tst = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-            if group == "hourly":
-                tst += timedelta(hours=1)
-                ts_disp = tst.strftime("%Y-%m-%d %H:%M")
-                ts_from = tst.strftime("%Y-%m-%d %H:%M:%S")
-                ts_to = tst + timedelta(hours=1) - timedelta(seconds=1)
-                ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-            elif group == "daily":
-                tst += day_rel
-                ts_disp = tst.strftime("%Y-%m-%d")
-                ts_from = tst.strftime("%Y-%m-%d %H:%M:%S")
-                ts_to = tst + day_rel - timedelta(seconds=1)
-                ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-            elif group == "monthly":
-                tst += mon_rel
-                ts_disp = tst.strftime("%Y-%m")
-                ts_from = tst.strftime("%Y-%m-%d %H:%M:%S")
-                ts_to = tst + mon_rel - timedelta(seconds=1)
-                ts_to = ts_to.strftime("%Y-%m-%d %H:%M:%S")
-
-            ts = tst.strftime("%Y-%m-%d %H:%M:%S")
-            fr = freq_dict.get(ts,0)
-            time_series.append( (ts_disp, ts_from, ts_to, fr,) )
-
-        time_series.sort(key=lambda x: x[0], reverse=True)
-
-        self.results = time_series.copy()
+        for k in range(k_max, k_min-1, -1):
+            if group == 'hourly': tst = epoch + timedelta(hours=k)
+            elif group == 'daily': tst = epoch + timedelta(days=k)
+            else: tst = datetime(k // 12, k % 12 + 1, 1)
+            ts_to = tst + step + dsecond_minus
+            time_series.append( (tst.strftime(disp_fmt), tst.strftime("%Y-%m-%d %H:%M:%S"), ts_to.strftime("%Y-%m-%d %H:%M:%S"), freq_dict.get(k,0),) )
+
+        self.results = time_series
         
         if rev: self._rev()
         self.results = tuple(self.results)
@@ -722,27 +763,14 @@ class FeedexQuery(FeedexQueryInterface):
         self.query(term, filters, rank=True, cnt=True, doc_count=doc_count, snippets=False, no_history=True, no_wildcards=True, allow_group=False)
         self.result_no2 = len(self.results)
 
-        kwd_list = []
-        # Generate keywords for fist N best matches
-        for i,r in enumerate(self.results):
-            if i > TERM_NET_DEPTH: break
-
-            result.populate(r)
-            self.LP.set_model(result['lang'], sample=f"""{result['title']} {result['desc']}"""[:1000])          
-
-            learning_string = ''
-            for f in LING_TEXT_LIST: learning_string = f"""{learning_string}  {scast(self.result[f], str, '')}"""
-
-            # ... and collect them to result list
-            kwds = self.LP.extract_features(learning_string, depth=MAX_FEATURES_PER_ENTRY)
-            for kw in kwds: kwd_list.append( (kw[0],kw[1]) )
-
-        # Consolidate results
-        freq_dist = {}
-        for kw in kwd_list: freq_dist[kw[0]] = freq_dist.get(kw[0],0) + kw[1] 
+        # Get keywords for fist N best matches
+        keywords = self._stored_keywords(self.results[:TERM_NET_DEPTH+1])
+        if type(keywords) is not dict:
+            self._empty(result=ResultTerm())
+            return keywords
 
         self.results = []
-        for k,v in freq_dist.items(): self.results.append( (k,v) )
+        for k,v in keywords.items(): self.results.append( (k,v[0]) )
 
         self.results.sort(key=lambda x: x[1], reverse=True)
 
@@ -764,6 +792,60 @@ class FeedexQuery(FeedexQueryInterface):
 
 
 
+    def _stored_keywords(self, results, **kargs):
+        """ Aggregate keywords of result entries from keyword store. Keywords of entries not analysed yet are 
+            extracted and saved first. Returns dict: form -> (weight sum, term) or error code
+                model - use only keywords extracted with this language model """
+        model = kargs.get('model')
+        result = ResultEntry()
+        id_ix = result.get_index('id')
+
+        # Find entries without stored keywords
+        ids = [r[id_ix] for r in results if type(r[id_ix]) is int]
+        missing = set(ids)
+        for i in range(0, len(ids), ENTRY_KEYWORDS_CHUNK):
+            chunk = ids[i:i+ENTRY_KEYWORDS_CHUNK]
+            for r in self.DB.qr_sql(ENTRY_KEYWORDS_MISSING_SQL % ','.join(['?'] * len(chunk)), chunk, all=True): missing.discard(r[0])
+            if self.DB.status != 0: return FX_ERROR_DB
+
+        if len(missing) > 0:
+            msg(_('Extracting keywords from %a entries...'), len(missing))
+            to_extract = [r for r in results if r[id_ix] in missing]
+            to_extract.sort(key=lambda x: coalesce(x[result.get_index('lang')],'')) # Sort by language to minimize language model reloading
+            kw_q = []
+            for i,r in enumerate(to_extract):
+                result.populate(r)
+                self.LP.set_model(result['lang'], sample=f"""{result['title']} {result['desc']}"""[:1000])
+                lp_model = self.LP.get_model()
+
+                learning_string = ''
+                for f in LING_TEXT_LIST: learning_string = f"""{learning_string}  {scast(result[f], str, '')}"""
+                kwds = self.LP.extract_features(learning_string, depth=MAX_FEATURES_PER_ENTRY)
+                for kw in kwds: kw_q.append( (result['id'], scast(kw[2], str, ''), scast(kw[0], str, ''), scast(kw[1], float, 0), lp_model,) )
+                if len(kwds) == 0: kw_q.append( (result['id'], None, None, 0, lp_model,) )
+
+                if len(kw_q) >= ENTRY_KEYWORDS_CHUNK or i == len(to_extract) - 1:
+                    err = self.DB.run_sql_lock('insert or ignore into entry_keywords values(?,?,?,?,?)', kw_q)
+                    if err != 0: return err
+                    kw_q = []
+
+        # Aggregate stored keywords
+        if model is not None: model_cond, model_val = 'and k.model = ?', [model]
+        else: model_cond, model_val = '', []
+        keywords = {}
+        for i in range(0, len(ids), ENTRY_KEYWORDS_CHUNK):
+            chunk = ids[i:i+ENTRY_KEYWORDS_CHUNK]
+            for r in self.DB.qr_sql(ENTRY_KEYWORDS_AGG_SQL % (','.join(['?'] * len(chunk)), model_cond), chunk + model_val, all=True):
+                kw = keywords.get(r[0])
+                if kw is None: keywords[r[0]] = (r[1], r[2],)
+                else: keywords[r[0]] = (kw[0] + r[1], kw[1],)
+            if self.DB.status != 0: return FX_ERROR_DB
+        return keywords
+
+
+
+
+
     def time_series(self, term:str, filters, **kargs):
         """ Get term frequency in time and output as a table of data points or a plot in terminal """
         if self.action is None: self.action = FX_ENT_QR_TS
@@ -775,7 +857,7 @@ class FeedexQuery(FeedexQueryInterface):
         group = filters.get('group','daily')
         rev = filters.get('rev', False)
         filters['rev'] = False
-        filters['page_len'] = filters.get('page_len', 10000)
+        filters['no_limit'] = True # Bucketing is cheap, so all matches are counted
         self.query(term, filters, w_scheme='coord', rank=False, cnt=True, snippets=False, allow_group=False)
 
         if len(self.results) == 0:
@@ -791,6 +873,98 @@ class FeedexQuery(FeedexQueryInterface):
 
 
 
+    def _bucket_results(self, key, depth:int):
+        """ Sort results into buckets in one pass. Key is a column index or a function on result row.
+            Returns dict: key -> [children (up to depth), count, importance sum, weight sum] """
+        imp_ix = self.result.get_index('importance')
+        weight_ix = self.result.get_index('weight')
+        key_func = key if callable(key) else None
+        buckets = {}
+        for r in self.results:
+            if key_func is None: k = r[key]
+            else: k = key_func(r)
+            b = buckets.get(k)
+            if b is None:
+                b = [[], 0, 0, 0]
+                buckets[k] = b
+            b[1] += 1
+            b[2] += coalesce(r[imp_ix],0)
+            b[3] += coalesce(r[weight_ix],0)
+            if b[1] <= depth: b[0].append(list(r))
+        return buckets
+
+
+    def _node(self, bucket, **kargs):
+        """ Populate result with group node and bucket aggregates """
+        self.result.clear()
+        for k,v in kargs.items(): self.result[k] = v
+        self.result['is_node'] = 1
+        self.result['children_no'] = len(bucket[0])
+        self.result['count'] = bucket[1]
+        self.result['importance'] = bucket[2]
+        self.result['weight'] = bucket[3]
+        return self.result.listify()
+
+
+
+    def _cluster_results(self, depth:int):
+        """ Group results into stories in a single pass (leader clustering). Documents are described by their
+            top weighted index terms and taken in result order: each one joins the most similar story leader 
+            or starts a new story (up to depth+1 stories). 
+            Returns list of (leader index, [(similarity, child index),...]) """
+        ix_id_ix = self.result.get_index('ix_id')
+
+        # Term vectors are read from index once per document
+        vecs = []
+        df = {}
+        for r in self.results:
+            vec = {}
+            if r[ix_id_ix] is not None:
+                try:
+                    for t in self.DB.ix.termlist(r[ix_id_ix]):
+                        term = t.term.decode('utf-8')
+                        if len(term) < 3 or term[0].isupper(): continue # Skip prefixed terms
+                        vec[term] = t.wdf
+                except (xapian.DocNotFoundError, xapian.InvalidArgumentError, UnicodeDecodeError,): vec = {}
+            for t in vec.keys(): df[t] = df.get(t,0) + 1
+            vecs.append(vec)
+
+        doc_no = len(vecs)
+        max_df = max(2, int(doc_no * SIMILAR_CLUSTER_MAX_DF))
+        sigs = []
+        for vec in vecs:
+            weights = []
+            for t,f in vec.items():
+                if df[t] > max_df: continue
+                weights.append( (t, (1 + log10(f)) * log10(doc_no/df[t]),) )
+            weights.sort(key=lambda x: x[1], reverse=True)
+            weights = weights[:SIMILAR_CLUSTER_TERMS]
+            norm = sum([w[1]**2 for w in weights]) ** 0.5
+            if norm > 0: sigs.append({w[0]: w[1]/norm for w in weights})
+            else: sigs.append({})
+
+        clusters = []
+        postings = {} # Term -> stories whose leaders have it
+        for i, sig in enumerate(sigs):
+            cands = set()
+            for t in sig.keys(): cands.update(postings.get(t, ()))
+            best, best_sim = None, 0
+            for c in cands:
+                leader_sig = sigs[clusters[c][0]]
+                sim = 0
+                for t,v in sig.items(): sim += v * leader_sig.get(t,0)
+                if sim > best_sim: best, best_sim = c, sim
+
+            if best is not None and best_sim >= SIMILAR_CLUSTER_THRESHOLD: clusters[best][1].append( (best_sim, i,) )
+            elif len(clusters) <= depth:
+                for t in sig.keys(): postings.setdefault(t, []).append(len(clusters))
+                clusters.append( (i, [],) )
+
+        for c in clusters: c[1].sort(key=lambda x: x[0], reverse=True)
+        return clusters
+
+
+
     def group(self, **kargs):
         """ Creates and prints a tree with results grouped by a column """
         group_by = kargs.get('group','category')
@@ -806,196 +980,66 @@ class FeedexQuery(FeedexQueryInterface):
             feeds = fdx.feeds_cache.copy()
             feeds.sort(key=lambda x: coalesce(x[feed.get_index('display_order')],0), reverse=False)
 
-
-
-        if group_by == 'category':
-            parent_id_ix = self.result.get_index('parent_id')
-            for f in feeds:
-                if coalesce(f[feed.get_index('is_category')],0) == 1:
-                    node_tmp = []
-                    count = 0
-                    feed.populate(f)
-                    for r in self.results:
-                        if r[parent_id_ix] == feed['id']:
-                            count += 1
-                            node_tmp.append(list(r))
-                            if count >= depth: break
-
-                    if count > 0:
-                        self.result.clear()
-                        self.result['title'] = f'{fdx.get_feed_name(feed["id"], with_id=False)}'
-                        self.result['desc'] = f[feed.get_index('subtitle')]
-                        self.result['feed_id'] = f[feed.get_index('id')]
-                        self.result['is_node'] = 1
-                        self.result['children_no'] = count
-                        results_tmp.append(self.result.listify())
-                        results_tmp = results_tmp + node_tmp
-
-        elif group_by == 'feed':
-            feed_id_ix = self.result.get_index('feed_id')            
+            if group_by == 'category': 
+                buckets = self._bucket_results(self.result.get_index('parent_id'), depth)
+                is_cat = 1
+            else: 
+                buckets = self._bucket_results(self.result.get_index('feed_id'), depth)
+                is_cat = 0
+            
             for f in feeds:
-                if coalesce(f[feed.get_index('is_category')],0) != 1:
-                    node_tmp = []
-                    count = 0
-                    feed.populate(f)
-                    for r in self.results:
-                        if r[feed_id_ix] == feed['id']:
-                            count += 1
-                            node_tmp.append(list(r))
-                            if count >= depth: break
-
-                    if count > 0:
-                        self.result.clear()
-                        self.result['title'] = f'{fdx.get_feed_name(feed["id"], with_id=False)}'
-                        self.result['desc'] = f[feed.get_index('subtitle')]
-                        self.result['feed_id'] = f[feed.get_index('id')]
-                        self.result['is_node'] = 1
-                        self.result['children_no'] = count
-                        results_tmp.append(self.result.listify())
-                        results_tmp = results_tmp + node_tmp
+                if (coalesce(f[feed.get_index('is_category')],0) == 1) != (is_cat == 1): continue
+                b = buckets.get(f[feed.get_index('id')])
+                if b is None: continue
+                results_tmp.append(self._node(b, title=f'{fdx.get_feed_name(f[feed.get_index("id")], with_id=False)}', desc=f[feed.get_index('subtitle')], feed_id=f[feed.get_index('id')]))
+                results_tmp.extend(b[0])
+
 
         elif group_by == 'flag':
-            flag_ix = self.result.get_index('flag')
+            buckets = self._bucket_results(self.result.get_index('flag'), depth)
             for f in fdx.flags_cache.keys():
-                node_tmp = []
-                count = 0
-                for r in self.results:
-                    if r[flag_ix] == f:
-                        count += 1
-                        node_tmp.append(list(r))
-                        if count >= depth: break
-
-                if count > 0:
-                    self.result.clear()
-                    self.result['title'] = f'{fdx.get_flag_name(f)}'
-                    self.result['desc'] = f'{fdx.get_flag_desc(f)}'
-                    self.result['flag'] = f
-                    self.result['is_node'] = 1
-                    self.result['children_no'] = count
-                    results_tmp.append(self.result.listify())
-                    results_tmp = results_tmp + node_tmp
-
-
+                b = buckets.get(f)
+                if b is None: continue
+                results_tmp.append(self._node(b, title=f'{fdx.get_flag_name(f)}', desc=f'{fdx.get_flag_desc(f)}', flag=f))
+                results_tmp.extend(b[0])
 
 
 
         elif group_by == 'similar':
 
             tmp_result = ResultEntry()
-            matched_ids = []
-            ungrouped_tmp = self.results.copy()
-
-            id_ix = self.result.get_index('id')
-
-            filters = kargs.copy()
-            filters['group'] = None
-            filters['allow_group'] = False
-            filters['rank'] = True
-            filters['cnt'] = True
-            filters['snippets'] = False
-            filters['rev'] = False
-            filters['sort'] = None
-            filters['depth'] = int(len(self.results)/depth)
-
-            node_count = 0
-
-            for r in ungrouped_tmp:
-                if node_count > depth: break
-                if r[id_ix] not in matched_ids:
-                    count = 0
-                    node_tmp = []
-                    tmp_result.clear()
-                    tmp_result.populate(r)
-                    tmp_result['is_node'] = 1
-                    node_count += 1
-                    filters['fallback_sort'] = 'id'
-                    matched_ids.append(r[id_ix])
-                    self.similar(r[id_ix], filters)
-                    for t in self.results:
-                        if t[id_ix] not in matched_ids and r[id_ix] != t[id_ix]: 
-                            count += 1
-                            matched_ids.append(t[id_ix])
-                            node_tmp.append(list(t))
-                            if t[tmp_result.index('rank')] < 20: break
-                            #if count >= depth: break
-
-                    tmp_result['children_no'] = count
-                    results_tmp.append(tmp_result.listify())
-                    results_tmp = results_tmp + node_tmp
-                
-
+            for leader, children in self._cluster_results(depth):
+                tmp_result.clear()
+                tmp_result.populate(self.results[leader])
+                tmp_result['is_node'] = 1
+                tmp_result['children_no'] = len(children)
+                results_tmp.append(tmp_result.listify())
+                for c in children: results_tmp.append(list(self.results[c[1]]))
 
 
 
         elif group_by in {'hourly', 'daily', 'monthly',}:
 
             pubdate_ix = self.result.get_index('pubdate')
-            timetable = []
-            tt_added = []
-
-            dmonth = relativedelta(months=+1)
-            dday = relativedelta(days=+1)
-            dhour = relativedelta(hours=+1)
+            # Bucket keys are parts of local time, so dates are formatted once per bucket, not per result
+            if group_by == 'hourly': 
+                key_len, step, disp_fmt = 4, relativedelta(hours=+1), '%Y-%m-%d %H:00'
+            elif group_by == 'daily':
+                key_len, step, disp_fmt = 3, relativedelta(days=+1), '%Y-%m-%d'
+            else:
+                key_len, step, disp_fmt = 2, relativedelta(months=+1), '%Y-%m'
             dsecond_minus = relativedelta(seconds=-1)
 
-            for r in self.results:
-
-                dtetime = scast(r[pubdate_ix], int, 0)
-
-                if group_by == 'hourly':
-                    hour = f"{time.strftime('%Y-%m-%d %H', time.localtime(dtetime))}:00"
-                    if hour in tt_added: continue
-                    beg = datetime.strptime(hour, "%Y-%m-%d %H:%M")
-                    end = beg + dhour + dsecond_minus
-                    timetable.append( (beg.timestamp(), end.timestamp(), hour) )
-                    tt_added.append(hour)
-
-                elif group_by == 'daily':
-                    day_disp = time.strftime('%Y-%m-%d', time.localtime(dtetime))
-                    day =  f"{day_disp} 00:00:00"
-                    if day in tt_added: continue
-                    beg = datetime.strptime(day, "%Y-%m-%d %H:%M:%S")
-                    end = beg + dday + dsecond_minus
-                    timetable.append( (beg.timestamp(), end.timestamp(), day_disp) )
-                    tt_added.append(day)
-
-                elif group_by == 'monthly':
-                    month_disp = time.strftime('%Y-%m', time.localtime(dtetime))
-                    month = f"{month_disp}-01 00:00:00"
-                    if month in tt_added: continue
-                    beg = datetime.strptime(month, "%Y-%m-%d %H:%M:%S")
-                    end = beg + dmonth + dsecond_minus
-                    timetable.append( (beg.timestamp(), end.timestamp(), month_disp) )
-                    tt_added.append(month)
-
-            timetable.sort(key=lambda x: x[2], reverse=True)
-
-            for t in timetable:
-                node_tmp = []
-                count = 0
-                
-                beg = t[0]
-                end = t[1]
-                ts = t[2]
+            buckets = self._bucket_results(lambda r: time.localtime(scast(r[pubdate_ix], int, 0))[:key_len], depth)
 
-                for r in self.results:
-                    pubdate = scast(r[pubdate_ix], int, 0)
-                    if pubdate >= beg and pubdate <= end:
-                        count += 1
-                        node_tmp.append(list(r))
-                        if count >= depth: break
-                    
-                if count > 0:
-                    self.result.clear()
-                    self.result['title'] = ts
-                    self.result['pubdate_str'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(beg))
-                    self.result['adddate_str'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(end))
-                    self.result['flag_name'] = 'calendar'
-                    self.result['feed_name'] = group_by
-                    self.result['is_node'] = 1
-                    self.result['children_no'] = count
-                    results_tmp.append(self.result.listify())
-                    results_tmp = results_tmp + node_tmp
+            for k in sorted(buckets.keys(), reverse=True):
+                b = buckets[k]
+                beg = datetime(*(k + (1,1,1)[key_len:3]))
+                end = beg + step + dsecond_minus
+                results_tmp.append(self._node(b, title=beg.strftime(disp_fmt), 
+                                    pubdate_str=beg.strftime('%Y-%m-%d %H:%M:%S'), adddate_str=end.strftime('%Y-%m-%d %H:%M:%S'), 
+                                    flag_name='calendar', feed_name=group_by))
+                results_tmp.extend(b[0])
 
         self.results = results_tmp.copy()
 
@@ -1105,9 +1149,8 @@ class FeedexQuery(FeedexQueryInterface):
         """ List user's rules in DB """
         if self.action is None: self.action = FX_ENT_QR_META_KW_TERMS
         if kargs.get('short', True):
-            self.DB.cache_terms()
             self.result = ResultKwTermShort()
-            self.results = fdx.terms_cache
+            self.results = self.DB.qr_sql(self.DB.terms_sql(), all=True)
         else:
             self.result = ResultKwTerm()
             self.results = self.DB.qr_sql(LOAD_TERMS_LONG_SQL, all=True)
@@ -1307,10 +1350,21 @@ class FeedexQuery(FeedexQueryInterface):
         page_len = scast(filters.get('page_len'), int, fdx.config.get('page_length',3000))
         page = scast(filters.get('page'), int, 1)
         if page <= 1: page = 1
-        if page_len <= 1: page_len = 3000
-        filters['start_n'] = page_len * (page - 1)
+        offset = scast(filters.get('offset'), int, -1)
+        # Result windows ask for exact number of rows left, even a single one
+        if offset >= 0 or filters.get('after') is not None:
+            if page_len < 1: page_len = 3000
+        elif page_len <= 1: page_len = 3000
+        if offset >= 0: filters['start_n'] = offset
+        else: filters['start_n'] = page_len * (page - 1)
         filters['page_len'] = page_len
 
+        # Seek key (values of ordering columns from the last row of previous window)
+        if filters.get('after') is not None:
+            if not isiter(filters.get('after')): return msg(FX_ERROR_QUERY, _('Invalid seek key!'))
+            filters['after'] = tuple(scast(a, int, None) for a in filters['after'])
+            if len(filters['after']) == 0 or filters['after'][-1] is None: return msg(FX_ERROR_QUERY, _('Invalid seek key!'))
+
         if filters.get('group') is not None: 
             if filters.get('group') not in {'category', 'feed', 'flag', 'hourly', 'daily', 'monthly', 'similar',}: 
                 return msg(FX_ERROR_QUERY, _('Invalid grouping! Must be: %a'), 'category, feed, flag, similar, hourly, daily or monthly')
@@ -1389,6 +1443,13 @@ class FeedexQuery(FeedexQueryInterface):
                 else:
                     if field is None: cond = "\n(lower(e.title) LIKE lower(:phrase)  ESCAPE '\\' OR lower(e.desc) LIKE lower(:phrase)  ESCAPE '\\' OR lower(e.category) LIKE lower(:phrase)  ESCAPE '\\' OR lower(e.text) LIKE lower(:phrase)  ESCAPE '\\')\n"
                     else: cond = f"\n( lower({PREFIXES[field]['sql']}) LIKE lower(:phrase) ESCAPE '\\')\n"
+
+                # Narrow down candidates with full-text index if available (LIKE above is still checked on them)
+                if self.DB.fts and (field is None or field in FTS_COLUMNS):
+                    fts_match = self._fts_match(phrase['sql'], field)
+                    if fts_match is not None:
+                        vals['fts_match'] = fts_match
+                        cond = f"\ne.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH :fts_match)\nand {cond}"
             else:
                 cond = "\n2=2\n"
 
@@ -1483,13 +1544,12 @@ class FeedexQuery(FeedexQueryInterface):
 
         # Build SQL comma-separated list for Xapian results. This may be very long
         if filters.get('IX_ID_list') is not None and isiter(filters.get('IX_ID_list')) and len(filters.get('IX_ID_list',[])) > 0:
-            ids = ''
+            ids = []
             for i in filters.get('IX_ID_list',[]):
                 i = scast(i, int, None)
                 if i is None: continue
-                ids = f'{ids}{i},'
-            ids = ids[:-1]
-            query = f"{query}\nand e.ix_id in ({ids})"
+                ids.append(str(i))
+            query = f"{query}\nand e.ix_id in ({','.join(ids)})"
             ext_filter = True
 
         # exclude certain id (e.g. for similarity search)
@@ -1497,25 +1557,33 @@ class FeedexQuery(FeedexQueryInterface):
             query = f"{query}\n and e.id <> {scast(filters.get('exclude_id'), int, -1)}"
 
         # Sorting options
-        if not isempty(filters.get('sort')):
-            sort_fields = filters['sort']
+        if not isempty(filters.get('sort')): sort_fields = filters['sort']
+        elif phrase.get('empty',False):
+            if not isempty(filters.get('fallback_sort')): sort_fields = filters['fallback_sort']
+            else: sort_fields = ['e.pubdate DESC']
+        else: sort_fields = None
+
+        # Keyset (seek) pagination is possible only for SQL-ordered pages on (pubdate, id) or (id)
+        if sort_fields is not None and not ext_filter: self.keyset = self._keyset(sort_fields)
+        else: self.keyset = None
+
+        seek = False
+        if self.keyset is not None and filters.get('after') is not None and len(filters['after']) == len(self.keyset):
+            seek = True
+            query = f"{query}\nand {self._seek_cond(filters['after'], vals)}"
+
+        if sort_fields is not None:
             query = f"{query}\nORDER BY"
             for sf in sort_fields: query = f'{query} {sf}, '
             query = f'{query} e.id DESC'
 
-        elif phrase.get('empty',False):
-            if not isempty(filters.get('fallback_sort')):
-                sort_fields = filters['fallback_sort']
-                query = f"{query}\nORDER BY"
-                for sf in sort_fields: query = f'{query} {sf}, '
-                query = f'{query} e.id DESC'
-            else:
-                query = f"{query}\nORDER BY e.pubdate DESC, e.id DESC"
-            
 
 
         # Pages
-        if not ext_filter:            
+        if seek:
+            query = f"{query}\nLIMIT :page_len"
+            vals['page_len'] = scast(filters.get('page_len', fdx.config.get('page_length',3000)), int, 3000)
+        elif not ext_filter and not filters.get('no_limit', False):
             query = f"{query}\nLIMIT :page_len OFFSET :start_n"
             vals['start_n'] = scast(filters.get('start_n'), int, 0)
             vals['page_len'] = scast(filters.get('page_len', fdx.config.get('page_length',3000)), int, 3000)
@@ -1552,8 +1620,7 @@ class FeedexQuery(FeedexQueryInterface):
         if filters.get('cat') is not None:
             cat_id = scast(filters.get('cat'), int, -1)
             feed_str = f'FEED_ID:{cat_id}'
-            for f in fdx.feeds_cache:
-                if f[FEEDS_SQL_TABLE.index('parent_id')] == cat_id: feed_str = f"""{feed_str} OR FEED_ID:{f[FEEDS_SQL_TABLE.index('id')]}"""
+            for f in fdx.get_feed_children(cat_id): feed_str = f"""{feed_str} OR FEED_ID:{f}"""
             filter_qr = f"""{filter_qr} AND ({feed_str})"""
 
         if filters.get('FEED_ID_list') is not None and isiter(filters.get('FEED_ID_list')) and len(filters.get('FEED_ID_list',[])) > 0:
@@ -1785,12 +1852,131 @@ class FeedexQuery(FeedexQueryInterface):
         sql = string.replace('%', '\%')
         sql = sql.replace('_', '\_')
         return sql
- 
+
+
+
+    def _term_vars(self, term):
+        """ Resolve matching index term into string variants to look for in text """
+        t = term.decode("utf-8")
+        if len(t) >=2 and t[1] == PREFIXES['exact']: return (t[2:],)
+        elif len(t) > 1 and t[0] == PREFIXES['exact']: return (t[1:],)
+        elif t.startswith(PREFIXES['sem']): return ()
+        if t[0] in META_PREFIXES: t = t[1:]
+        return tuple([v.decode("utf-8") for v in self.DB.ix.synonyms(t)])
+
+
+
+    def _build_snippets(self, qtype:int, filters:dict, case_ins:bool, window, mset, **kargs):
+        """ Extract snippets for first results (all if window is None) after sorting, so rows not shown are skipped.
+            Full-text results use one compiled matcher per variant set, or Xapian's snippet generator if configured """
+        max_context_length = fdx.config.get('max_context_length', 500)
+        if filters.get('field') is not None: field_lst = (filters.get('field'),)
+        else: field_lst = LING_TEXT_LIST
+
+        use_ix = qtype == 1 and mset is not None and fdx.config.get('ix_snippets', False) and hasattr(mset, 'snippet')
+        if use_ix:
+            stemmer = xapian.Stem('none')
+            ix_flags = getattr(xapian.MSet, 'SNIPPET_EXHAUSTIVE', 0) | getattr(xapian.MSet, 'SNIPPET_EMPTY_WITHOUT_MATCH', 0)
+        matchers = {} # Compiled matchers by variant set
+
+        if window is None or window > len(self.results): window = len(self.results)
+        for i in range(window):
+            self.result.populate(self.results[i])
+            snips = []
+
+            if qtype == 1:
+                vars = self.ix_results.get(self.result['ix_id'], (0,0,0,()))[3]
+
+                if use_ix:
+                    for f in field_lst:
+                        f = self.result[f]
+                        if type(f) is not str or f == '': continue
+                        sn = mset.snippet(f, IX_SNIPPET_LENGTH, stemmer, ix_flags, IX_SNIPPET_MARKUP_BEG, IX_SNIPPET_MARKUP_END, '...')
+                        if type(sn) is bytes: sn = sn.decode('utf-8')
+                        snips += self.LP.marked_snippets(sn, IX_SNIPPET_MARKUP_BEG, IX_SNIPPET_MARKUP_END, max_len=max_context_length)
+
+                # Stemmed terms may not be highlighted by Xapian - fall back to variants from synonyms then
+                if len(snips) == 0 and len(vars) > 0:
+                    if vars not in matchers: matchers[vars] = self.LP.compile_matcher(vars)
+                    for f in field_lst:
+                        f = self.result[f]
+                        if type(f) is not str: continue
+                        snips += self.LP.match_snippets(matchers[vars], f.lower(), orig_field=f, max_len=max_context_length)[1]
+
+            else:
+                for f in field_lst:
+                    f = self.result[f]
+                    if type(f) is not str: continue
+                    if case_ins: lf = f.lower()
+                    else: lf = f
+                    (c, sn) = self.LP.str_matcher(self.phrase['spl_string'], self.phrase['spl_string_len'], self.phrase['beg'], self.phrase['end'], lf, snippets=True, orig_field=f)
+                    for s in sn:
+                        if len(s) == 3 and (len(s[1]) <= max_context_length or max_context_length == 0): # check this to avoid showing long wildcard matches
+                            snips.append(s)
+
+            self.result['snippets'] = tuple(snips)
+            self.results[i] = self.result.tuplify(all=True)
+
+
+
     def _rev(self, **kargs):
         if type(self.results) is not list: self.results = list(self.results)
         self.results.reverse()
 
 
+    def _fts_match(self, sql:str, field):
+        """ Convert LIKE pattern to full-text MATCH expression of its literal runs (None if none is long enough) """
+        runs = []
+        run = ''
+        esc = False
+        for c in sql:
+            if esc:
+                run = f'{run}{c}'
+                esc = False
+            elif c == '\\': esc = True
+            elif c in {'%', '_',}:
+                runs.append(run)
+                run = ''
+            else: run = f'{run}{c}'
+        runs.append(run)
+
+        terms = []
+        for r in runs:
+            if len(r) >= FTS_MIN_TOKEN_LEN: terms.append('"' + r.replace('"', '""') + '"')
+        if len(terms) == 0: return None
+
+        match = ' AND '.join(terms)
+        if field is not None: match = f'{{{field}}} : ({match})'
+        return match
+
+
+    def _keyset(self, sort_fields:list):
+        """ Resolve ordering columns usable for keyset pagination (None if ordering does not allow it) """
+        if len(sort_fields) != 1: return None
+        field, order = sort_fields[0].split(' ')
+        if field == 'e.pubdate': return (('pubdate', order), ('id', 'DESC'),)
+        elif field == 'e.id': return (('id', order),)
+        return None
+
+
+    def _seek_cond(self, after:tuple, vals:dict):
+        """ Build SQL condition selecting rows past the seek key. Conditions are kept as index ranges so
+            deep windows cost the same as the first one. Rows without pubdate sort last in descending order
+            and are not included after a non-empty date - they are pulled by seeking with empty date key """
+        if self.keyset[0][0] == 'id':
+            vals['after_id'] = after[0]
+            if self.keyset[0][1] == 'ASC': return 'e.id > :after_id'
+            return 'e.id < :after_id'
+
+        vals['after_pubdate'], vals['after_id'] = after
+        if self.keyset[0][1] == 'ASC':
+            if after[0] is None: return '((e.pubdate IS NULL and e.id < :after_id) or e.pubdate IS NOT NULL)'
+            return '(e.pubdate >= :after_pubdate and (e.pubdate > :after_pubdate or e.id < :after_id))'
+        else:
+            if after[0] is None: return '(e.pubdate IS NULL and e.id < :after_id)'
+            return '(e.pubdate <= :after_pubdate and (e.pubdate < :after_pubdate or e.id < :after_id))'
+
+
     def parse_json_query(self, json_str:str, **kargs):
         """ Parse json string for query phrase and filters """
         filters = {}
@@ -1841,6 +2027,92 @@ class FeedexQuery(FeedexQueryInterface):
 
 
 
+class FeedexQueryWindow:
+    """ Lazy window over query results. Consecutive chunks are pulled on demand by seeking past the last row
+        when ordering allows it (by date or ID) and by offset otherwise """
+
+    def __init__(self, qp, qr:str, filters:dict, **kargs):
+        self.QP = qp
+        self.qr = qr
+        self.filters = filters.copy()
+        self.kargs = kargs
+
+        self.window = scast(kargs.get('window'), int, QUERY_WINDOW_LENGTH)
+        if self.window <= 1: self.window = QUERY_WINDOW_LENGTH
+
+        # Page filters limit the whole window stream
+        page = scast(self.filters.pop('page', None), int, 1)
+        self.limit = scast(self.filters.pop('page_len', None), int, fdx.config.get('page_length',3000))
+        if page <= 1: page = 1
+        if self.limit <= 1: self.limit = 3000
+
+        # String matching is ranked in Python over the whole page, so it can not be split into smaller windows
+        if fdx.res_query_type(self.filters.get('qtype')) == 0 and self.filters.get('sort') is None and scast(qr, str, '').strip() != '':
+            self.window = self.limit
+
+        self.after = kargs.get('after') # Seek key to start from
+        if self.after is None: self.offset = self.limit * (page - 1)
+        else: self.offset = 0
+
+        self.rev = self.filters.pop('rev', False)
+
+        self.pulled = 0 # Rows pulled so far
+        self.windows = 0 # Windows pulled so far
+        self.done = False
+        self.status = 0
+
+
+
+    def __iter__(self):
+        while not self.done:
+            results = self.next()
+            if len(results) > 0: yield results
+
+
+
+    def next(self, **kargs):
+        """ Pull next window of results. Returns tuple of results (empty if exhausted or on error) """
+        if self.done: return ()
+
+        page_len = min(self.window, self.limit - self.pulled)
+
+        filters = self.filters.copy()
+        filters['page_len'] = page_len
+        if self.after is not None: filters['after'] = self.after
+        else: filters['offset'] = self.offset + self.pulled
+
+        qargs = self.kargs.copy()
+        for k in ('window', 'after', 'allow_group',): qargs.pop(k, None)
+        if self.windows > 0: qargs['no_history'] = True
+
+        self.status = self.QP.query(self.qr, filters, **qargs)
+        if self.status != 0:
+            self.done = True
+            return ()
+
+        results = tuple(self.QP.results)[:page_len]
+        self.pulled += len(results)
+        self.windows += 1
+
+        keyset = self.QP.keyset
+        if keyset is not None and len(results) > 0:
+            self.after = tuple(results[-1][self.QP.result.get_index(k[0])] for k in keyset)
+
+        if len(results) < page_len:
+            # Entries without dates come last - seek them separately
+            if keyset is not None and keyset[0] == ('pubdate', 'DESC',) and self.after is not None and self.after[0] is not None:
+                self.after = (None, sys.maxsize)
+            else: self.done = True
+
+        if self.pulled >= self.limit: self.done = True
+
+        if self.rev: results = tuple(reversed(results))
+        return results
+
+
+
+
+
 class FeedexCatalogQuery(FeedexQueryInterface):
     """ Interface for querying feed import catalog """
     def __init__(self, **kargs) -> None:
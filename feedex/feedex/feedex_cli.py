@@ -70,6 +70,7 @@ class FeedexCLI:
     def cprint(self, ent, **kargs):
         """ Print entity deciding format """
         if isinstance(ent, FeedexQueryInterface): return self.out_table(ent, **kargs)
+        elif isinstance(ent, FeedexQueryWindow): return self.out_window(ent, **kargs)
         elif isinstance(ent, FeedexEntry): return self.out_entry(ent, **kargs)
         elif isinstance(ent, FeedexFeed): return self.out_feed(ent, **kargs)
         elif isinstance(ent, FeedexDBStats): return self.out_db_stats(ent)
@@ -382,7 +383,7 @@ Available column names for this query: %b"""), c, fld_list)
                     msg(_('Data saved to %a as CSV'), self.ofile)
                 except OSError as e: return msg(FX_ERROR_IO, _("Error saving CSV data to %a file: %b"), self.ofile, e)
             else:
-                print(header)
+                if not kargs.get('no_header', False): print(header)
                 for r in results: print(self._line(table, r))
  
 
@@ -404,9 +405,9 @@ Available column names for this query: %b"""), c, fld_list)
                 except OSError as e: return msg(FX_ERROR_IO, _('Error saving data to %a file: %b'), self.ofile, e)
 
             else:
-                print(cli_mu(header))
+                if not kargs.get('no_header', False): print(cli_mu(header))
                 for r in results: print(self._line(table, r, mask=mask, interline=line, snip_delim=snip_delim))
-                print(f"""
+                if not kargs.get('no_footer', False): print(f"""
                       
 ----------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 {cli_mu(footer)}""")
@@ -417,6 +418,36 @@ Available column names for this query: %b"""), c, fld_list)
 
 
 
+    def out_window(self, win, **kargs):
+        """ Print results window by window as they are pulled, so first lines do not wait for the whole list """
+        qr = win.QP
+        if self.plot or self.ofile is not None or self.output not in {'cli', 'long', 'headlines', 'notes', 'csv',}:
+            # These outputs need a whole result list
+            results = []
+            for r in win: results.extend(r)
+            if win.status != 0: return win.status
+            qr.results = tuple(results)
+            qr.result_no = len(results)
+            qr.result_no2 = 0
+            return self.out_table(qr, **kargs)
+
+        first = True
+        for r in win:
+            qr.results = r
+            err = self.out_table(qr, no_header=not first, no_footer=True, **kargs)
+            if err not in {None, 0,}: return err
+            first = False
+        if win.status != 0: return win.status
+
+        # Footer with total count
+        qr.results = ()
+        qr.result_no = win.pulled
+        qr.result_no2 = 0
+        return self.out_table(qr, no_header=not first, **kargs)
+
+
+
+
     def _plot(self, data_points, **kargs):
         """ Plots a dataset in a terminal """
         mx = kargs.get('mx', 0)
@@ -353,9 +353,11 @@ class SQLContainerEditable(SQLContainer):
 
     # Skeleton commit methods
     def commit(self, **kargs):
+        changed = len(self.oper_q) > 0 or self.action in {FX_ENT_ACT_RELEARN, FX_ENT_ACT_RERANK, FX_ENT_ACT_REINDEX,}
         err = self._hook(FX_ENT_STAGE_PRE_COMMIT, **kargs)
         if err == 0: err = self._oper_commit(**kargs)
         if err == 0: err = self._hook(FX_ENT_STAGE_POST_COMMIT, **kargs)
+        if err == 0 and changed and self.entity in DATA_GEN_ENTITIES: err = self.DB.bump_data_gen()
         if err == 0: err = self.recache()
         if err == 0: self.clear_q()
         return err
@@ -73,10 +73,35 @@ FEEDEX_HELP_ABOUT=f"""
 
 # Hardcoded params
 MAX_SNIPPET_COUNT = 50
+IX_SNIPPET_LENGTH = 300 # Length of snippets generated by Xapian (chars)
+IX_SNIPPET_MARKUP_BEG = '\x02' # Markers for matches in Xapian snippets (never present in texts)
+IX_SNIPPET_MARKUP_END = '\x03'
 MAX_RANKING_DEPTH = 70 
 MAX_LAST_UPDATES = 35
 MAX_FEATURES_PER_ENTRY = 30
+QR_ITER_BATCH_SIZE = 500 # Rows fetched at once when streaming query results
+IMPORT_BATCH_SIZE = 500 # Imported entries committed at once
+EMPTY_TRASH_CHUNK = 5000 # Entries purged at once when emptying trash
+MAINT_TIME_BUDGET = 2 # Seconds for incremental maintenance step after fetching
+MAINT_VACUUM_STEP_PAGES = 500 # Pages freed in one incremental vacuum transaction
+MAINT_DUE_DOCS = 100000 # New documents after which full maintenance is suggested
+MAINT_IX_COMPACT_DOCS = 50000 # New documents after which index is compacted
+TS_EPOCH_ORDINAL = 719163 # Ordinal of 1970-01-01 for converting day numbers to dates
+QUERY_CACHE_MAX_SIZE = 33554432 # Max. total size of cached query results (bytes)
+QUERY_CACHE_TTL = 900 # Cached query results expire after this time anyway (for relative date filters)
+JSON_STREAM_CHUNK = 1048576 # Chars read at once when streaming JSON input
+JSON_STREAM_MAX_ITEM = 67108864 # Max. size (chars) of a single item in streamed JSON array
+QUERY_WINDOW_LENGTH = 250 # Rows pulled at once by lazy result windows
+LP_TOKEN_CACHE_MAX = 200000 # Max. cached token classes per language model (for indexing)
+SQLITE_CACHE_SIZE = -65536 # Page cache per connection (negative - in KiB)
+SQLITE_MMAP_SIZE = 268435456 # Memory-mapped I/O size in bytes
+DB_POOL_MAX_IDLE = 8 # Max. idle read connections kept in pool
+FILE_LOCK_POLL_MAX = 0.05 # Max. interval (s) for polling a busy lock file when waiting with timeout
+ENTRY_KEYWORDS_CHUNK = 5000 # Entries handled at once when reading/saving stored keywords
 TERM_NET_DEPTH = 30
+SIMILAR_CLUSTER_TERMS = 20 # Top weighted index terms describing a document when grouping by similarity
+SIMILAR_CLUSTER_THRESHOLD = 0.25 # Min. cosine similarity to a story's leading entry
+SIMILAR_CLUSTER_MAX_DF = 0.5 # Terms found in bigger part of results are ignored in grouping
 SOURCE_URL_WEIGHT = 0.1
 
 
@@ -156,44 +181,32 @@ order by freq desc
 
 LOAD_TERMS_ALGO_1_SQL="""
 select
-t.term,
-sum(t.weight * coalesce(e.read,0)) as weight, 
-t.model,
-t.form
-from terms t
-join entries e on e.id = t.context_id
-join feeds f on f.id = e.feed_id
-where coalesce(e.deleted,0) == 0 and coalesce(f.deleted,0) == 0
-group by t.term, t.model
-order by weight desc
+term,
+weight_1 as weight,
+nullif(model,'') as model,
+form
+from terms_agg
+order by weight_1 desc
 """
 
 LOAD_TERMS_ALGO_2_SQL="""
 select
-t.term,
-sum(t.weight * coalesce(e.read,0) * coalesce(e.weight)) as weight,
-t.model,
-t.form
-from terms t
-join entries e on e.id = t.context_id
-join feeds f on f.id = e.feed_id
-where coalesce(e.deleted,0) == 0 and coalesce(f.deleted,0) == 0
-group by t.term, t.model
-order by weight desc
+term,
+weight_2 as weight,
+nullif(model,'') as model,
+form
+from terms_agg
+order by weight_2 desc
 """
 
 LOAD_TERMS_ALGO_3_SQL="""
 select
-t.term,
-sum(t.weight * coalesce(e.read,0) * coalesce(e.readability,0)) as weight, 
-t.model,
-t.form
-from terms t
-join entries e on e.id = t.context_id
-join feeds f on f.id = e.feed_id
-where coalesce(e.deleted,0) == 0 and coalesce(f.deleted,0) == 0
-group by t.term, t.model
-order by weight desc
+term,
+weight_3 as weight,
+nullif(model,'') as model,
+form
+from terms_agg
+order by weight_3 desc
 """
 
 
@@ -230,6 +243,22 @@ EMPTY_TRASH_TERMS_SQL = """delete from terms where context_id in
 ( select e.ix_id from entries e where coalesce(e.deleted,0) > 0 or e.feed_id in 
 ( select f.id from feeds f where coalesce(f.deleted,0) > 0)  )"""
 
+# Entries to be removed when emptying trash are purged in chunks (in order of ids)
+EMPTY_TRASH_ENTRY_IDS_SQL = """select e.id from entries e where e.id > :last and ( coalesce(e.deleted,0) > 0 or e.feed_id in 
+( select f.id from feeds f where coalesce(f.deleted,0) > 0) ) order by e.id limit :limit"""
+EMPTY_TRASH_ENTRY_TERMS_SQL = f"""delete from terms where context_id in ( {EMPTY_TRASH_ENTRY_IDS_SQL} )"""
+EMPTY_TRASH_ENTRIES_SQL = f"""delete from entries where id in ( {EMPTY_TRASH_ENTRY_IDS_SQL} )"""
+# Data generation is bumped on every change to data. Cached query results are used only within the same generation
+DATA_GEN_BUMP_SQL = (
+("update params set val = coalesce(cast(val as integer),0) + 1 where name = 'data_gen'",),
+("insert into params select 'data_gen', 1 where not exists (select 1 from params where name = 'data_gen')",),
+)
+
+EMPTY_TRASH_FEEDS_SQL = (
+("update feeds set parent_id = NULL where parent_id in ( select f.id from feeds f where coalesce(f.deleted,0) > 0 )",),
+("delete from feeds where coalesce(deleted,0) > 0",),
+)
+
 
 SEARCH_HISTORY_SQL = """
 select string,
@@ -256,6 +285,234 @@ and e.id <= :end_id
 order by e.id ASC
 """
 
+
+# Previous guids/links of a feed for duplicate detection (:since limits to recently added ones)
+DEDUPE_GUIDS_SQL = """select distinct e.guid from entries e where e.feed_id = :feed_id and e.guid is not null and (:since is null or e.adddate >= :since)"""
+DEDUPE_LINKS_SQL = """select distinct e.link from entries e where e.feed_id = :feed_id and e.link is not null and (:since is null or e.adddate >= :since)"""
+
+
+# Idempotent structure updates applied to new DBs after DDL and to existing DBs on connect. Aggregate tables
+# and their triggers are defined only here
+# Learned terms aggregated for recommendations. Weight columns correspond to recom_algo 1-3.
+# Table is kept up to date by triggers on terms, entries and feeds, so no full rebuilds are needed
+TERMS_AGG_DDL_SQL = """
+CREATE TABLE IF NOT EXISTS "terms_agg" (
+	"term"	TEXT NOT NULL,
+	"model"	TEXT NOT NULL,
+	"form"	TEXT,
+	"weight_1"	NUMERIC,
+	"weight_2"	NUMERIC,
+	"weight_3"	NUMERIC,
+	"count"	INTEGER,
+	PRIMARY KEY("term","model")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_terms_agg_weight_1" ON "terms_agg" ( "weight_1" DESC );
+CREATE INDEX IF NOT EXISTS "idx_terms_agg_weight_2" ON "terms_agg" ( "weight_2" DESC );
+CREATE INDEX IF NOT EXISTS "idx_terms_agg_weight_3" ON "terms_agg" ( "weight_3" DESC );
+
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_terms_ins" AFTER INSERT ON "terms" BEGIN
+	INSERT INTO terms_agg (term, model, form, weight_1, weight_2, weight_3, count)
+	SELECT coalesce(NEW.term,''), coalesce(NEW.model,''), NEW.form,
+	coalesce(NEW.weight,0) * coalesce(e.read,0), 
+	coalesce(NEW.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0), 
+	coalesce(NEW.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0), 
+	1
+	FROM entries e JOIN feeds f ON f.id = e.feed_id
+	WHERE e.id = NEW.context_id AND coalesce(e.deleted,0) = 0 AND coalesce(f.deleted,0) = 0
+	ON CONFLICT (term, model) DO UPDATE SET weight_1 = weight_1 + excluded.weight_1, weight_2 = weight_2 + excluded.weight_2, weight_3 = weight_3 + excluded.weight_3, count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_terms_del" AFTER DELETE ON "terms" BEGIN
+	UPDATE terms_agg SET weight_1 = terms_agg.weight_1 - d.weight_1, weight_2 = terms_agg.weight_2 - d.weight_2, weight_3 = terms_agg.weight_3 - d.weight_3, count = terms_agg.count - 1
+	FROM (SELECT 
+		coalesce(OLD.weight,0) * coalesce(e.read,0) AS weight_1,
+		coalesce(OLD.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0) AS weight_2,
+		coalesce(OLD.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0) AS weight_3
+		FROM entries e JOIN feeds f ON f.id = e.feed_id
+		WHERE e.id = OLD.context_id AND coalesce(e.deleted,0) = 0 AND coalesce(f.deleted,0) = 0) AS d
+	WHERE terms_agg.term = coalesce(OLD.term,'') AND terms_agg.model = coalesce(OLD.model,'');
+	DELETE FROM terms_agg WHERE term = coalesce(OLD.term,'') AND model = coalesce(OLD.model,'') AND count <= 0;
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_entries_upd" AFTER UPDATE OF read, weight, readability, deleted, feed_id ON "entries" 
+WHEN OLD.read IS NOT NEW.read OR OLD.weight IS NOT NEW.weight OR OLD.readability IS NOT NEW.readability OR OLD.deleted IS NOT NEW.deleted OR OLD.feed_id IS NOT NEW.feed_id
+BEGIN
+	UPDATE terms_agg SET weight_1 = terms_agg.weight_1 - d.weight_1, weight_2 = terms_agg.weight_2 - d.weight_2, weight_3 = terms_agg.weight_3 - d.weight_3, count = terms_agg.count - d.count
+	FROM (SELECT coalesce(t.term,'') AS term, coalesce(t.model,'') AS model,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0)) AS weight_1,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0) * coalesce(OLD.weight,0)) AS weight_2,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0) * coalesce(OLD.readability,0)) AS weight_3,
+		count(*) AS count
+		FROM terms t JOIN feeds f ON f.id = OLD.feed_id
+		WHERE t.context_id = OLD.id AND coalesce(OLD.deleted,0) = 0 AND coalesce(f.deleted,0) = 0
+		GROUP BY 1, 2) AS d
+	WHERE terms_agg.term = d.term AND terms_agg.model = d.model;
+
+	INSERT INTO terms_agg (term, model, form, weight_1, weight_2, weight_3, count)
+	SELECT coalesce(t.term,''), coalesce(t.model,''), min(t.form),
+	sum(coalesce(t.weight,0) * coalesce(NEW.read,0)),
+	sum(coalesce(t.weight,0) * coalesce(NEW.read,0) * coalesce(NEW.weight,0)),
+	sum(coalesce(t.weight,0) * coalesce(NEW.read,0) * coalesce(NEW.readability,0)),
+	count(*)
+	FROM terms t JOIN feeds f ON f.id = NEW.feed_id
+	WHERE t.context_id = NEW.id AND coalesce(NEW.deleted,0) = 0 AND coalesce(f.deleted,0) = 0
+	GROUP BY 1, 2
+	ON CONFLICT (term, model) DO UPDATE SET weight_1 = weight_1 + excluded.weight_1, weight_2 = weight_2 + excluded.weight_2, weight_3 = weight_3 + excluded.weight_3, count = count + excluded.count;
+
+	DELETE FROM terms_agg WHERE count <= 0 AND (term, model) IN (SELECT coalesce(t.term,''), coalesce(t.model,'') FROM terms t WHERE t.context_id = OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_entries_del" AFTER DELETE ON "entries" BEGIN
+	UPDATE terms_agg SET weight_1 = terms_agg.weight_1 - d.weight_1, weight_2 = terms_agg.weight_2 - d.weight_2, weight_3 = terms_agg.weight_3 - d.weight_3, count = terms_agg.count - d.count
+	FROM (SELECT coalesce(t.term,'') AS term, coalesce(t.model,'') AS model,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0)) AS weight_1,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0) * coalesce(OLD.weight,0)) AS weight_2,
+		sum(coalesce(t.weight,0) * coalesce(OLD.read,0) * coalesce(OLD.readability,0)) AS weight_3,
+		count(*) AS count
+		FROM terms t JOIN feeds f ON f.id = OLD.feed_id
+		WHERE t.context_id = OLD.id AND coalesce(OLD.deleted,0) = 0 AND coalesce(f.deleted,0) = 0
+		GROUP BY 1, 2) AS d
+	WHERE terms_agg.term = d.term AND terms_agg.model = d.model;
+
+	DELETE FROM terms_agg WHERE count <= 0 AND (term, model) IN (SELECT coalesce(t.term,''), coalesce(t.model,'') FROM terms t WHERE t.context_id = OLD.id);
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_feeds_upd" AFTER UPDATE OF deleted ON "feeds" 
+WHEN (coalesce(OLD.deleted,0) = 0) <> (coalesce(NEW.deleted,0) = 0)
+BEGIN
+	UPDATE terms_agg SET weight_1 = terms_agg.weight_1 - d.weight_1, weight_2 = terms_agg.weight_2 - d.weight_2, weight_3 = terms_agg.weight_3 - d.weight_3, count = terms_agg.count - d.count
+	FROM (SELECT coalesce(t.term,'') AS term, coalesce(t.model,'') AS model,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0)) AS weight_1,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0)) AS weight_2,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0)) AS weight_3,
+		count(*) AS count
+		FROM terms t JOIN entries e ON e.id = t.context_id
+		WHERE e.feed_id = OLD.id AND coalesce(e.deleted,0) = 0 AND coalesce(OLD.deleted,0) = 0
+		GROUP BY 1, 2) AS d
+	WHERE terms_agg.term = d.term AND terms_agg.model = d.model;
+
+	INSERT INTO terms_agg (term, model, form, weight_1, weight_2, weight_3, count)
+	SELECT coalesce(t.term,''), coalesce(t.model,''), min(t.form),
+	sum(coalesce(t.weight,0) * coalesce(e.read,0)),
+	sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0)),
+	sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0)),
+	count(*)
+	FROM terms t JOIN entries e ON e.id = t.context_id
+	WHERE e.feed_id = NEW.id AND coalesce(e.deleted,0) = 0 AND coalesce(NEW.deleted,0) = 0
+	GROUP BY 1, 2
+	ON CONFLICT (term, model) DO UPDATE SET weight_1 = weight_1 + excluded.weight_1, weight_2 = weight_2 + excluded.weight_2, weight_3 = weight_3 + excluded.weight_3, count = count + excluded.count;
+
+	DELETE FROM terms_agg WHERE count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_terms_agg_feeds_del" AFTER DELETE ON "feeds" WHEN coalesce(OLD.deleted,0) = 0 BEGIN
+	UPDATE terms_agg SET weight_1 = terms_agg.weight_1 - d.weight_1, weight_2 = terms_agg.weight_2 - d.weight_2, weight_3 = terms_agg.weight_3 - d.weight_3, count = terms_agg.count - d.count
+	FROM (SELECT coalesce(t.term,'') AS term, coalesce(t.model,'') AS model,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0)) AS weight_1,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0)) AS weight_2,
+		sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0)) AS weight_3,
+		count(*) AS count
+		FROM terms t JOIN entries e ON e.id = t.context_id
+		WHERE e.feed_id = OLD.id AND coalesce(e.deleted,0) = 0
+		GROUP BY 1, 2) AS d
+	WHERE terms_agg.term = d.term AND terms_agg.model = d.model;
+
+	DELETE FROM terms_agg WHERE count <= 0;
+END;
+"""
+
+# Keywords extracted from entries for analytics (trends, term nets). Rows with NULL term mark entries without keywords.
+# Keywords are removed when entry's text changes, so they are extracted again when needed
+ENTRY_KEYWORDS_DDL_SQL = """
+CREATE TABLE IF NOT EXISTS "entry_keywords" (
+	"entry_id"	INTEGER NOT NULL,
+	"term"	TEXT,
+	"form"	TEXT,
+	"weight"	NUMERIC,
+	"model"	TEXT
+);
+
+CREATE TRIGGER IF NOT EXISTS "trg_entry_keywords_entries_del" AFTER DELETE ON "entries" BEGIN
+	DELETE FROM entry_keywords WHERE entry_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_entry_keywords_entries_upd" AFTER UPDATE OF "title", "desc", "tags", "category", "text", "author", "publisher", "contributors", "lang" ON "entries" BEGIN
+	DELETE FROM entry_keywords WHERE entry_id = OLD.id;
+END;
+"""
+
+# One row per entry and form, so concurrent extractions can not store keywords twice. Run only if the index 
+# is missing - duplicates stored by older versions are removed first
+ENTRY_KEYWORDS_UNIQUE_IX_EXISTS_SQL = "select 1 from sqlite_master where type = 'index' and name = 'idx_entry_keywords_entry_id_form'"
+ENTRY_KEYWORDS_UNIQUE_IX_SQL = """
+DELETE FROM entry_keywords WHERE rowid NOT IN (SELECT min(rowid) FROM entry_keywords GROUP BY entry_id, coalesce(form,''));
+DROP INDEX IF EXISTS "idx_entry_keywords_entry_id";
+CREATE UNIQUE INDEX IF NOT EXISTS "idx_entry_keywords_entry_id_form" ON "entry_keywords" ( "entry_id", coalesce("form",'') );
+"""
+
+ENTRY_KEYWORDS_MISSING_SQL = "select distinct entry_id from entry_keywords where entry_id in ( %s )"
+ENTRY_KEYWORDS_AGG_SQL = """select k.form, sum(coalesce(k.weight,0)), min(k.term) from entry_keywords k 
+where k.entry_id in ( %s ) and k.term is not null %s group by k.form"""
+
+# Initial fill for DBs created before aggregate table was introduced (run only if 'terms_agg' param is missing)
+TERMS_AGG_FILL_SQL = """
+INSERT INTO terms_agg (term, model, form, weight_1, weight_2, weight_3, count)
+SELECT coalesce(t.term,''), coalesce(t.model,''), min(t.form),
+sum(coalesce(t.weight,0) * coalesce(e.read,0)),
+sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.weight,0)),
+sum(coalesce(t.weight,0) * coalesce(e.read,0) * coalesce(e.readability,0)),
+count(*)
+FROM terms t
+JOIN entries e ON e.id = t.context_id
+JOIN feeds f ON f.id = e.feed_id
+WHERE coalesce(e.deleted,0) = 0 AND coalesce(f.deleted,0) = 0 AND NOT EXISTS (SELECT 1 FROM params WHERE name = 'terms_agg')
+GROUP BY 1, 2;
+INSERT INTO params (name, val) SELECT 'terms_agg', 1 WHERE NOT EXISTS (SELECT 1 FROM params WHERE name = 'terms_agg');
+"""
+PARAM_EXISTS_SQL = "select 1 from params where name = ?"
+
+# Optional full-text shadow index for string matching queries. Trigram tokenizer matches substrings, so it can
+# prefilter LIKE conditions (exact LIKE is still applied to candidates to keep wildcard and case semantics)
+FTS_DDL_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS "entries_fts" USING fts5(title, "desc", category, text, content='entries', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS "trg_entries_fts_ins" AFTER INSERT ON "entries" BEGIN
+	INSERT INTO entries_fts (rowid, title, "desc", category, text) VALUES (NEW.id, NEW.title, NEW."desc", NEW.category, NEW.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_entries_fts_del" AFTER DELETE ON "entries" BEGIN
+	INSERT INTO entries_fts (entries_fts, rowid, title, "desc", category, text) VALUES ('delete', OLD.id, OLD.title, OLD."desc", OLD.category, OLD.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_entries_fts_upd" AFTER UPDATE OF title, "desc", category, text ON "entries" BEGIN
+	INSERT INTO entries_fts (entries_fts, rowid, title, "desc", category, text) VALUES ('delete', OLD.id, OLD.title, OLD."desc", OLD.category, OLD.text);
+	INSERT INTO entries_fts (rowid, title, "desc", category, text) VALUES (NEW.id, NEW.title, NEW."desc", NEW.category, NEW.text);
+END;
+"""
+
+FTS_REBUILD_SQL = """INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')"""
+
+FTS_DROP_SQL = """
+DROP TRIGGER IF EXISTS "trg_entries_fts_ins";
+DROP TRIGGER IF EXISTS "trg_entries_fts_del";
+DROP TRIGGER IF EXISTS "trg_entries_fts_upd";
+DROP TABLE IF EXISTS "entries_fts";
+"""
+
+FTS_COLUMNS = ('title', 'desc', 'category', 'text',)
+FTS_MIN_TOKEN_LEN = 3 # Trigram index can only match literal runs of at least 3 characters
+
+DB_UPGRADE_SQL = f"""
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_guid" ON "entries" ( "feed_id", "guid" );
+CREATE INDEX IF NOT EXISTS "idx_entries_feed_id_link" ON "entries" ( "feed_id", "link" );
+{TERMS_AGG_DDL_SQL}
+{ENTRY_KEYWORDS_DDL_SQL}
+"""
+
 # Main entities
 FX_ENT_ENTRY = 1
 FX_ENT_FEED = 2
@@ -274,6 +531,9 @@ FX_ENT_FETCH = 12
 FX_ENT_HISTORY = 13
 FX_ENT_DB_STATS = 14
 
+# Entities whose changes bump data generation
+DATA_GEN_ENTITIES = (FX_ENT_ENTRY, FX_ENT_FEED, FX_ENT_RULE, FX_ENT_FLAG,)
+
 FX_ENTITIES = {FX_ENT_ENTRY, FX_ENT_FEED, FX_ENT_FLAG, FX_ENT_RULE, FX_ENT_QUERY, FX_ENT_CAT_ITEM,
                FX_ENT_CONTEXT, FX_ENT_TERM, FX_ENT_KW_TERM, FX_ENT_TS, FX_ENT_FETCH, FX_ENT_HISTORY, 
                FX_ENT_DB_STATS,}
@@ -608,11 +868,17 @@ FEEDEX_CONFIG_LIST = (
 ('default_interval',    _('Default News Check Interval'), int, 45,   (('gt',0),) ),
 ('error_threshold',     _('Feed Error Limit'),            int, 5,   (('ge',0),) ),
 ('max_items_per_transaction', _('Max Items per Transaction'), int, 2000,   (('gt',0),) ),
+('dedupe_days',         _('Dedupe Window (days, 0=all)'), int, 0,   (('ge',0),) ),
+('maint_time_budget',   _('Maintenance Time after Fetch (s, 0=off)'), int, MAINT_TIME_BUDGET,   (('ge',0),) ),
+('fetch_engine',        _('Fetching Engine'),             str, 'threads',   (('in', {'threads','async',}),) ),
+('fetch_workers',       _('Concurrent Downloads'),        int, 8,   (('gt',0),) ),
+('fetch_workers_per_host', _('Concurrent Downloads per Host'), int, 2,   (('gt',0),) ),
 
 ('use_keyword_learning',_('Use Keyword Learning'),   bool, True,  None ),
 ('recom_algo',          _('Recomm. Algorithm'),      int, 1,   (('in', {1,2,3,}),) ),
 ('recom_limit',         _('Recomm. Term Limit'),     int, 200,   (('gt',0),) ),
 ('no_history',          _('No Search History'),      bool, False,  None ),
+('use_query_cache',     _('Cache Recomm. and Trends'), bool, True,  None ),
 
 ('default_entry_weight',_('Default New Note Weight'),int, 2,   (('ge',0),) ),
 ('default_rule_weight', _('Default New Rule Weight'),int, 2,   (('ge',0),) ),
@@ -620,6 +886,7 @@ FEEDEX_CONFIG_LIST = (
 ('default_depth',       _('Default Query Depth'),    int, 10,   (('gt',0),) ),
 ('default_page_len',    _('Default Page Length'),    int, 3000,   (('gt',0),) ),
 ('max_context_length',  _('Max Context Length'),     int, 70,   (('gt',0),) ),
+('ix_snippets',         _('Use Xapian Snippets'),    bool, False,  None ),
 
 ('do_redirects',        _('Follow Link Redirects?'),  bool, True,  None ),
 ('save_perm_redirects', _('Save Perm. Link Redirects?'),   bool, False,  None ),
@@ -318,12 +318,20 @@ Usage: <b>feedex [parameters|filters] [actions] [arguments]</b>
         Exports/imports can be used to move data between DBs. In addition you can export query results with --ofile option
         and then import it to new DB with --add-entries-from-file. This way you can archive or trim big databases.
 
+        --import-entries-from-file [FILENAME]   Import entries from JSON file (a list or one entry per line)
+        --import-entries-from-pipe              Import entries from JSON piped to input
+        --resume                                Continue import interrupted by error, skipping entries saved before it
+
+        Entries are imported and saved in batches, so files of any size can be used
+
 
         --reindex [ID]                          Index and relculate linguistic stats and tokens for all/IDd entry
         --rerank [ID]                           Recalculate importance and flag stats for all/IDd entry
         --relearn [ID]                          (Re)learn features from all read entries/IDd entry
 
         --batch_size=INT                        The size of processed entries before committing
+        --workers=INT                           Number of worker processes for linguistic processing of mass
+                                                reindex/rerank/relearn (default: 1 - no workers)
 
         
         --download-catalog [OUTPUT DIR]         Download feed catalog from blog.feedspot.com. For development and testing
@@ -343,6 +351,14 @@ Usage: <b>feedex [parameters|filters] [actions] [arguments]</b>
 
         --db-maintenance                        Perform maintenance on the database (VACUUM, ANALYZE and REINDEX)
                                                 to reduce DB size
+        --db-maintenance-step                   Perform incremental maintenance without locking out other users:
+                                                free unused pages, refresh statistics, compact index.
+                                                Also done after each fetch (see 'maint_time_budget' option),
+                                                except for index compaction
+
+        --rebuild-fts-index                     Create/rebuild full-text index to speed up string matching queries
+                                                on large databases (needs SQLite with FTS5 trigram tokenizer)
+        --drop-fts-index                        Remove full-text index
 
                                                 
 
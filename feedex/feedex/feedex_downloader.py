@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+""" Asynchronous HTTP downloader for Feedex - an alternative fetching engine """
+
+from feedex_headers import *
+
+
+
+
+class FeedexAsyncDownloader:
+    """ Downloads many resources at once using asyncio with per-host keep-alive connection pools
+        and per-request timeouts (no need to touch global socket timeout) """
+
+    REDIRECT_CODES = {301, 302, 303, 307, 308,}
+    NO_BODY_CODES = {204, 304,}
+
+    def __init__(self, **kargs):
+        self.timeout = scast(kargs.get('timeout', fdx.config.get('fetch_timeout', 20)), int, 20)
+        self.per_host = scast(kargs.get('per_host', fdx.config.get('fetch_workers_per_host', 2)), int, 2)
+        self.max_redirects = scast(kargs.get('max_redirects', 5), int, 5)
+        self.max_size = scast(kargs.get('max_size', MAX_DOWNLOAD_SIZE), int, MAX_DOWNLOAD_SIZE)
+
+        self.pools = {} # Idle connections: (scheme, host, port) -> [(reader, writer),...]
+        self.host_locks = {} # Semaphores limiting concurrent requests per host
+        self.ssl_ctx = None
+
+
+
+    def download_many(self, reqs, **kargs):
+        """ Download a list of (url, headers) tuples. Returns a list of response dicts in the same order:
+            {'url', 'href', 'status', 'headers', 'body', 'error'} """
+        if len(reqs) == 0: return []
+        return asyncio.run(self._download_many(reqs))
+
+
+
+    def download_iter(self, reqs, **kargs):
+        """ Download a list of (url, headers) tuples with event loop running in a separate thread.
+            Yields (index, response) tuples in order of completion, so responses can be processed while others are still downloading.
+            Closing the generator early cancels remaining downloads """
+        if len(reqs) == 0: return
+        resps = queue.Queue()
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(self._download_iter(reqs, resps))
+
+        def _run():
+            try: loop.run_until_complete(task)
+            except BaseException as e: debug(2, f'Async download stopped: {e}')
+            finally: resps.put(None)
+
+        thread = threading.Thread(target=_run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                resp = resps.get()
+                if resp is None: break
+                yield resp
+        finally:
+            if not task.done(): loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+
+
+
+    async def _download_many(self, reqs):
+        try: return await asyncio.gather(*[self._download(url, headers) for url, headers in reqs])
+        finally: await self._close_all()
+
+    async def _download_iter(self, reqs, resps):
+        async def _download_put(i, url, headers): resps.put( (i, await self._download(url, headers)) )
+        try: await asyncio.gather(*[_download_put(i, url, headers) for i, (url, headers) in enumerate(reqs)])
+        finally: await self._close_all()
+
+
+
+    async def _download(self, url:str, headers:dict):
+        """ Download single resource following redirects """
+        resp = {'url':url, 'href':url, 'status':None, 'headers':{}, 'body':b'', 'error':None}
+        first_status = None
+        try:
+            for i in range(self.max_redirects + 1):
+                status, rheaders, body = await asyncio.wait_for(self._request(resp['href'], headers), self.timeout)
+                location = rheaders.get('location')
+                if status in self.REDIRECT_CODES and location not in {None, '',}:
+                    if first_status is None: first_status = status
+                    resp['href'] = urllib.parse.urljoin(resp['href'], location)
+                    continue
+                break
+
+            else: raise ValueError(_('Too many redirects'))
+
+            # Report redirects the same way feedparser does
+            if first_status is not None and status not in self.NO_BODY_CODES and status < 400:
+                if first_status in {301, 308,}: status = 301
+                else: status = 302
+
+            resp['status'], resp['headers'], resp['body'] = status, rheaders, body
+
+        except asyncio.TimeoutError: resp['error'] = _('Timeout')
+        except (OSError, ValueError, EOFError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, zlib.error,) as e: resp['error'] = scast(e, str, _('Unknown error'))
+
+        return resp
+
+
+
+    async def _request(self, url:str, headers:dict):
+        """ Send single GET request, reusing idle connection to host if possible """
+        u = urllib.parse.urlsplit(url)
+        scheme = u.scheme.lower()
+        if scheme not in {'http', 'https',} or u.hostname is None: raise ValueError(f"""{_('Unsupported URL')}: {url}""")
+        port = coalesce(u.port, 443 if scheme == 'https' else 80)
+        key = (scheme, u.hostname, port)
+        path = coalesce(nullif(u.path,''), '/')
+        if u.query != '': path = f'{path}?{u.query}'
+        host = u.hostname if u.port is None else f'{u.hostname}:{u.port}'
+
+        if key not in self.host_locks: self.host_locks[key] = asyncio.Semaphore(self.per_host)
+        async with self.host_locks[key]:
+            idle = self.pools.setdefault(key, [])
+            while True:
+                if len(idle) > 0:
+                    reader, writer = idle.pop()
+                    reused = True
+                else:
+                    reader, writer = await self._connect(key)
+                    reused = False
+
+                try: status, rheaders, body, keep_alive = await self._exchange(reader, writer, host, path, headers)
+                except (ConnectionError, asyncio.IncompleteReadError, EOFError,):
+                    writer.close()
+                    if reused: continue # Stale keep-alive connection - retry on a fresh one
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+
+                if keep_alive: idle.append( (reader, writer) )
+                else: writer.close()
+                return status, rheaders, body
+
+
+
+    async def _connect(self, key):
+        scheme, hostname, port = key
+        if scheme == 'https':
+            if self.ssl_ctx is None: self.ssl_ctx = ssl.create_default_context()
+            return await asyncio.open_connection(hostname, port, ssl=self.ssl_ctx)
+        return await asyncio.open_connection(hostname, port)
+
+
+
+    async def _exchange(self, reader, writer, host:str, path:str, headers:dict):
+        """ Write request and read response (status, headers, body, keep_alive) """
+        req = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip, deflate\r\nConnection: keep-alive\r\n'
+        for k,v in headers.items():
+            if v in {None, '',}: continue
+            req = f'{req}{k}: {v}\r\n'
+        writer.write(f'{req}\r\n'.encode('latin-1', errors='replace'))
+        await writer.drain()
+
+        status_line = (await reader.readline()).decode('latin-1').strip()
+        if status_line == '': raise ConnectionError(_('Connection closed by server'))
+        version, status = slist(status_line.split(), 0, ''), scast(slist(status_line.split(), 1, None), int, None)
+        if status is None: raise ValueError(_('Invalid HTTP status line'))
+
+        rheaders = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in {'\r\n', '\n', '',}: break
+            k, _sep, v = line.partition(':')
+            rheaders[k.strip().lower()] = v.strip()
+
+        keep_alive = version == 'HTTP/1.1' and rheaders.get('connection','').lower() != 'close'
+
+        # Stream body to buffer
+        buffer = io.BytesIO()
+        if status in self.NO_BODY_CODES or 100 <= status < 200: pass
+        elif 'chunked' in rheaders.get('transfer-encoding','').lower():
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    while (await reader.readline()) not in {b'\r\n', b'\n', b'',}: pass # Trailers
+                    break
+                buffer.write(await reader.readexactly(size))
+                await reader.readexactly(2)
+                if buffer.tell() > self.max_size: raise ValueError(f"""{_('Resource too large! Max. size:')} {self.max_size}""")
+        elif rheaders.get('content-length') is not None:
+            size = scast(rheaders.get('content-length'), int, 0)
+            if size > self.max_size: raise ValueError(f"""{_('Resource too large! Max. size:')} {self.max_size}""")
+            while size > 0:
+                chunk = await reader.read(min(size, FEEDEX_MB))
+                if not chunk: raise EOFError(_('Connection closed by server'))
+                buffer.write(chunk)
+                size -= len(chunk)
+        else:
+            keep_alive = False
+            while True:
+                chunk = await reader.read(FEEDEX_MB)
+                if not chunk: break
+                buffer.write(chunk)
+                if buffer.tell() > self.max_size: raise ValueError(f"""{_('Resource too large! Max. size:')} {self.max_size}""")
+
+        body = buffer.getvalue()
+        encoding = rheaders.get('content-encoding','').lower()
+        if encoding == 'gzip': body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            try: body = zlib.decompress(body)
+            except zlib.error: body = zlib.decompress(body, -zlib.MAX_WBITS)
+
+        return status, rheaders, body, keep_alive
+
+
+
+    async def _close_all(self):
+        """ Close all idle connections """
+        for idle in self.pools.values():
+            for reader, writer in idle:
+                writer.close()
+                try: await writer.wait_closed()
+                except (OSError, ConnectionError,): pass
+        self.pools.clear()
+        self.host_locks.clear()
@@ -284,6 +284,7 @@ class FeedexEntry(SQLContainerEditable):
 
             if stage == FX_ENT_STAGE_POST_OPER:
                 self.DB.connect_ixer()
+                self.DB.flush_ix() # Pending writes could otherwise restore deleted doc
                 try: ix_doc = self.DB.ixer_db.get_document(self.vals['ix_id'])
                 except (xapian.DocNotFoundError,): ix_doc = None
                 if isinstance(ix_doc, xapian.Document):
@@ -465,6 +466,7 @@ class FeedexEntry(SQLContainerEditable):
         to_disp = kargs.get('to_disp',False)
         counter = kargs.get('counter',0) # Counter for generating UUIDs
         rebuilding = kargs.get('rebuilding',False) # This tells if we are creating index anew and, if yes, we clear IX_IDs
+        results = kargs.get('results') # Precomputed results of LP from a worker process (see recalc_worker)
 
         # LP lazy load and caching
         self.DB.connect_LP()
@@ -472,7 +474,8 @@ class FeedexEntry(SQLContainerEditable):
         if learn: self.DB.cache_terms()
 
         # Setup language and remember if detection was tried
-        if self.action == FX_ENT_ACT_ADD:
+        if results is not None: pass
+        elif self.action == FX_ENT_ACT_ADD:
             self.vals['lang'] = self.DB.LP.set_model(self.vals['lang'], sample=f"""{self.vals['title']} {self.vals['desc']}  {self.vals['text']} """[:4000])
         elif self.action == FX_ENT_ACT_UPD:
             if scast(self.backup_vals['desc'], str, '').strip() == '' and scast(self.backup_vals['text'], str, '').strip() == '' and self.backup_vals['lang'] == self.vals['lang']:
@@ -483,8 +486,16 @@ class FeedexEntry(SQLContainerEditable):
         self.set_feed()
 
 
-        if index or rank: 
+        if results is not None:
+            if results.get('stats') is not None: self.merge(results['stats'])
+            self.ix_strings = results.get('ix_strings')
+            variants = results.get('variants', {})
+            if rank: self.vals['importance'], self.vals['flag'] = results['importance'], results['flag']
+            rank = False
+
+        elif index or rank: 
             self.ix_strings, self.rank_string = self.DB.LP.index(self.vals)
+            variants = self.DB.LP.variants
             if stats: 
                 self.DB.LP.calculate_stats()
                 self.merge(self.DB.LP.stats)            
@@ -567,21 +578,16 @@ class FeedexEntry(SQLContainerEditable):
             for k in META_PREFIXES_EXACT:
                 for f in self.ix_strings[k]: self.DB.ixer.index_text( scast(f[1], str, ''), scast(f[0], int, 1), k)
 
-            # Save stemming variants
-            for k,v in self.DB.LP.variants.items():
-                for s in v: self.DB.ixer_db.add_synonym(k,s)
-
-            # Add/Replace in Database
-            if exists:
-                try: self.vals['ix_id'] = self.DB.ixer_db.replace_document(f'UUID {uuid}', ix_doc)
-                except (xapian.DatabaseError, xapian.DocNotFoundError,) as e: 
-                    return msg(FX_ERROR_INDEX, _('Index error: %a'), e)
-                debug(2, f'Replaced Xapian doc {uuid}: {self.vals["ix_id"]}')
-            else:            
-                try: self.vals['ix_id'] = self.DB.ixer_db.add_document(ix_doc)
-                except (xapian.DatabaseError,) as e: 
-                    return msg(FX_ERROR_INDEX, _('Index error: %a'), e)
-                debug(2, f"""Added Xapian doc {uuid}: {self.vals['ix_id']}""")
+            # Save stemming variants (deduplicated and written with the batch)
+            self.DB.ix_add_synonyms(variants)
+
+            # Queue for adding/replacing in Database
+            try:
+                if exists: self.vals['ix_id'] = self.DB.ix_add_document(ix_doc, docid=self.vals['ix_id'])
+                else: self.vals['ix_id'] = self.DB.ix_add_document(ix_doc)
+            except (xapian.DatabaseError, xapian.DocNotFoundError,) as e: 
+                return msg(FX_ERROR_INDEX, _('Index error: %a'), e)
+            debug(2, f"""Queued Xapian doc {uuid}: {self.vals['ix_id']}""")
 
             self.DB.lastxapdocid = self.vals['ix_id']
 
@@ -595,11 +601,13 @@ class FeedexEntry(SQLContainerEditable):
             # Learn text features by creating a learning string and running smallsem on it...
             self.learning_string = ''
             for f in LING_TEXT_LIST: self.learning_string = f"""{self.learning_string}  {scast(self.vals[f], str, '')}"""
-            depth = kargs.get('learning_depth', MAX_FEATURES_PER_ENTRY)
-            terms_tmp = self.DB.LP.extract_features(self.learning_string, depth=depth)
-
-
-            model = self.DB.LP.get_model()
+            if results is not None: 
+                terms_tmp = results['features']
+                model = results['model']
+            else:
+                depth = kargs.get('learning_depth', MAX_FEATURES_PER_ENTRY)
+                terms_tmp = self.DB.LP.extract_features(self.learning_string, depth=depth)
+                model = self.DB.LP.get_model()
 
             self.terms.clear()
             if self.action in {FX_ENT_ACT_ADD,}:
@@ -636,7 +644,7 @@ class FeedexEntry(SQLContainerEditable):
 
         msg(_('Reindexing %a...'), self.vals['id'])
         self.index = True
-        err = self.ling(index=self.index, rank=False, learn=False)
+        err = self.ling(index=self.index, rank=False, learn=False, results=kargs.get('results'))
         if err != 0: 
             self.DB.close_ixer(rollback=True)
             return err
@@ -655,7 +663,7 @@ class FeedexEntry(SQLContainerEditable):
 
         msg(_('Ranking %a...'), self.vals['id'])
         self.rank = True
-        err = self.ling(index=False, rank=True, learn=False)
+        err = self.ling(index=False, rank=True, learn=False, results=kargs.get('results'))
         if err != 0: return err
         if self.sql_str is None: self.sql_str = 'update entries set importance = :importance, flag = :flag where id = :id'
         self.oper_q.append({'importance':self.vals['importance'], 'flag':self.vals['flag'], 'id':self.vals['id']})
@@ -675,7 +683,7 @@ class FeedexEntry(SQLContainerEditable):
 
         msg(_('Relearning %a...'), self.vals['id'])
         self.learn = True
-        err = self.ling(index=False, rank=False, learn=self.learn)
+        err = self.ling(index=False, rank=False, learn=self.learn, results=kargs.get('results'))
         if err != 0: return err
         for t in self.terms: self.terms_oper_q.append(t.copy())
 
@@ -57,14 +57,13 @@ class FeedexFeed(SQLContainerEditable):
             return 0
     
     def get_by_id(self, id:int):
-        id = scast(id, int, -1)
-        for f in fdx.feeds_cache:
-            if f[self.get_index('id')] == id:
-                self.populate(f)
-                if self.vals['is_category'] != 1: self.ent_name = _('Feed')
-                else: self.ent_name = _('Category')
-                self.exists = True
-                return 0
+        f = fdx.load_parent(id)
+        if f != -1:
+            self.populate(f)
+            if self.vals['is_category'] != 1: self.ent_name = _('Feed')
+            else: self.ent_name = _('Category')
+            self.exists = True
+            return 0
         return msg(FX_ERROR_NOT_FOUND, _('Channel/Category %a not found!'), id)
 
 
@@ -77,10 +76,8 @@ class FeedexFeed(SQLContainerEditable):
 
     def get_parent(self, **kargs):
         """ Load parent into container """
-        for f in fdx.feeds_cache:
-            if f[self.parent_feed.get_index('id')] == self.vals['parent_id']:
-                self.parent_feed.populate(f)
-                break
+        f = fdx.load_parent(self.vals['parent_id'])
+        if f != -1: self.parent_feed.populate(f)
 
     def get_doc_count(self, **kargs):
         if self.doc_count is not None: return self.doc_count
@@ -395,13 +392,7 @@ class FeedexFeed(SQLContainerEditable):
                 name = self.vals['name']
                 cat_names_ids[self.vals['id']] = name
                 
-                found = False
-                for f in fdx.feeds_cache:
-                    if f[FEEDS_SQL_TABLE.index('is_category')] == 1:
-                        if f[FEEDS_SQL_TABLE.index('name')] == name:
-                            found = True
-                            break
-                if not found:
+                if fdx.res_cat_name(name) in {None, -1,}:
                     err = self.add(validate=True, no_commit=True)
                     if err != 0: 
                         msg(err, _('Item %a skipped...'), ii)
@@ -546,17 +537,13 @@ class FeedexCatalog(ResultCatItem):
         self.cat_q = []
         self.cat_im_dict = {}
         
-        self.present_feeds = []
-        for f in fdx.feeds_cache:
-            if f[self.feed.get_index('is_category')] != 1 and f[self.feed.get_index('deleted')] != 1 and f[self.feed.get_index('url')] not in {None, '',}:
-                self.present_feeds.append(f[self.feed.get_index('url')])
         
         for ci in fdx.catalog:
             if ci[self.get_index('is_node')] == 1: 
                 self.cat_im_dict[ci[self.get_index('name')]] = ci[self.get_index('thumbnail')]
                 continue
             if ci[self.get_index('id')] in ids:
-                if ci[self.get_index('link_res')] in self.present_feeds: continue
+                if fdx.res_feed_url(ci[self.get_index('link_res')]) != -1: continue
                 if ci[self.get_index('link_res')] not in self.url_q:
                     c = ci.copy()
                     parent_name = ''
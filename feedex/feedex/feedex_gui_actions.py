@@ -111,7 +111,7 @@ class FeedexGUIActions:
         else:
             return -1
 
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         DB.fetch(id=feed_id, force=ignore_modified, ignore_interval=ignore_interval)
 
 
@@ -164,7 +164,7 @@ class FeedexGUIActions:
         fdx.bus_append(FX_ACTION_BLOCK_FETCH)
 
         feed_id = args[-1]
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         DB.fetch(id=feed_id, update_only=True, force=True)
 
         self.MW.lock.acquire()
@@ -183,7 +183,7 @@ class FeedexGUIActions:
         msg(_('Adding Channel...') )
         fdx.bus_append(FX_ACTION_BLOCK_FETCH)
 
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item.set_interface(DB)
         err = item.add_from_url(item.vals.copy())
         
@@ -250,7 +250,7 @@ class FeedexGUIActions:
 
     def edit_entry_thr(self, new:bool, item:FeedexEntry, new_image):
         """ Add/Edit Entry low-level interface for threading """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item.set_interface(DB)
 
         if new:
@@ -303,7 +303,7 @@ class FeedexGUIActions:
 
     def mark_thr(self, mode, item):
         """ Marks entry as read """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item = item.convert(FeedexEntry, DB, id=item['id'])
         if not item.exists: return -1
 
@@ -335,7 +335,7 @@ class FeedexGUIActions:
 
     def open_entry_thr(self, item, *args):
         """ Wrappper for opening entry and learning in a separate thread """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item = item.convert(FeedexEntry, DB, id=item['id'])
         item.open()
         DB.close()
@@ -570,7 +570,7 @@ class FeedexGUIActions:
 #       Mass Operations
 
     def on_multi_thr(self, oper, result, ids, *args):
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
 
         if isinstance(result, ResultEntry):
             ent = FX_ENT_ENTRY
@@ -720,7 +720,7 @@ class FeedexGUIActions:
 
 
     def on_empty_trash_thr(self, *args):
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         DB.empty_trash()        
         DB.close()
         fdx.bus_append(FX_ACTION_RELOAD_TRASH)
@@ -891,7 +891,7 @@ class FeedexGUIActions:
 
     def on_maintenance_thr(self, *args, **kargs):
         """ DB Maintenance thread """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         err = DB.maintenance()
         DB.close()
         fdx.bus_append(FX_ACTION_UNBLOCK_DB)
@@ -909,7 +909,7 @@ class FeedexGUIActions:
 
 
     def on_clear_cache_thr(self, *args, **kargs):
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         DB.clear_cache(-1)
         DB.close()
         fdx.bus_append(FX_ACTION_UNBLOCK_DB)
@@ -938,7 +938,7 @@ class FeedexGUIActions:
 
 
     def recalc_thr(self, act, *args):
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         if act == 'relearn': DB.recalculate('..', learn=True, rank=False, index=False)
         elif act == 'reindex': DB.recalculate('..', learn=False, rank=False, index=True)
         elif act == 'rerank': DB.recalculate('..', learn=False, rank=True, index=False)
@@ -1037,7 +1037,7 @@ class FeedexGUIActions:
 
 
     def import_entries_thr(self, efile, **kargs):
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         err = DB.import_entries(efile=efile)
         DB.close()
         fdx.bus_append(FX_ACTION_UNBLOCK_DB)
@@ -1110,7 +1110,7 @@ class FeedexGUIActions:
 
     def import_catalog_thr(self, item, **args):
         """ Import feeds from catalog - threading """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item.DB = DB
         item.feed.set_interface(DB)
         item.do_import()
@@ -1142,7 +1142,7 @@ class FeedexGUIActions:
 
     def edit_entry_req_thr(self, item:FeedexEntry):
         """ Add Entry from ext. request low-level interface for threading """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item.set_interface(DB)
         err = item.add(validate=False, no_commit=False)
         if err == 0: 
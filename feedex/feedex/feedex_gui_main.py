@@ -318,6 +318,7 @@ Hit <b>Ctrl-F2</b> for Quick Main Menu"""))
         self.DB.clear_param('session_id')
         # Close DB
         self.DB.close()
+        if fdx.db_pool is not None: fdx.db_pool.close()
 
 
     def _on_state_event(self, widget, event): self.gui_cache['win_maximized'] = bool(event.new_window_state & Gdk.WindowState.MAXIMIZED)
@@ -450,6 +451,15 @@ Hit <b>Ctrl-F2</b> for Quick Main Menu"""))
                         if hasattr(tb, 'query_combo'): self.act.reload_history_all()
                         break
 
+            elif code == FX_ACTION_APPEND_WINDOW:
+                uid = m[1]
+                for i in range(self.upper_notebook.get_n_pages()):
+                    tb = self.upper_notebook.get_nth_page(i)
+                    if tb is None: continue
+                    if tb.uid == uid:
+                        tb.append_window(m[2], m[3], m[4])
+                        break
+
             elif code == FX_ACTION_FINISHED_FILTERING:
                 uid = m[1]
                 for i in range(self.upper_notebook.get_n_pages()):
@@ -1794,7 +1804,7 @@ def feedex_run_aux_win(ent, idict, **kargs):
 
     def add_ent_thr(ent, item, **kargs):
         """ It is better to send requests to threads """
-        DB = FeedexDatabase(connect=True)
+        DB = FeedexDatabase(connect=True, pooled=True)
         item.set_interface(DB)
         if ent == FX_ENT_ENTRY: fdx.dnotify('edit', _('Adding new Note...'))
         elif ent == FX_ENT_FEED: fdx.dnotify('rss', _('Adding new Feed...'))
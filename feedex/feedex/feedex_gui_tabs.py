@@ -49,6 +49,13 @@ class FeedexTab(Gtk.VBox):
 
         self.page_no = 1
 
+        # Lazy result windows
+        self.search_no = 0 # Current search number to discard windows from superseded searches
+        self.streaming = False # Are result windows still being appended?
+        self.page_keys = {} # Seek keys for page numbers
+        self.page_keys_sig = None # ... and query they are valid for
+        self.window = None
+
 
         # GUI init stuff
         Gtk.VBox.__init__(self, homogeneous = False, spacing = 0)
@@ -794,9 +801,9 @@ Escape: \ (only if before wildcards and field markers)""") )
         """ Unblock search widgets """
         if hasattr(self, 'search_button'): self.search_button.set_sensitive(True)
         if hasattr(self, 'query_combo'): self.query_combo.set_sensitive(True)
-        if hasattr(self, 'page_prev_button'):
+        if hasattr(self, 'page_prev_button') and not self.streaming:
             if self.page_no != 1: self.page_prev_button.set_sensitive(True)
-        if hasattr(self, 'page_next_button'):
+        if hasattr(self, 'page_next_button') and not self.streaming:
             if not self.table.result_no < f_get_combo(self.page_len_combo): self.page_next_button.set_sensitive(True)
         if hasattr(self, 'page_no_label'): self.page_no_label.set_markup(f'Page <b>{self.page_no}</b>')
 
@@ -828,9 +835,7 @@ Escape: \ (only if before wildcards and field markers)""") )
         self.spinner.stop()
         self.header_icon.show()
         
-        if self.table.result_no2 != 0: len_str = f'{self.table.result_no} {_("of")} {self.table.result_no2}'
-        else: len_str = f'{self.table.result_no}'
-        self.header.set_markup( f'{self.final_status} ({len_str})' )
+        self._show_result_no()
 
         if self.MW.curr_upper.uid == self.uid and self.table.feed_sums is not None:
             self.MW.feed_tab.redecorate(self.table.curr_feed_filters, self.table.feed_sums)
@@ -852,6 +857,59 @@ Escape: \ (only if before wildcards and field markers)""") )
 
 
 
+    def _show_result_no(self, **kargs):
+        """ Show result count in tab header """
+        if self.table.result_no2 != 0: len_str = f'{self.table.result_no} {_("of")} {self.table.result_no2}'
+        else: len_str = f'{self.table.result_no}'
+        if self.streaming: len_str = f'{len_str} ...'
+        self.header.set_markup( f'{self.final_status} ({len_str})' )
+
+
+
+    def append_window(self, search_no:int, results:tuple, done:bool, **kargs):
+        """ Append next window of results pulled by search thread """
+        if search_no != self.search_no: return 0
+        if len(results) > 0: self.table.append_results(results)
+        if done:
+            self.streaming = False
+            self.unblock_search()
+            if self.MW.curr_upper.uid == self.uid and self.table.feed_sums is not None:
+                self.MW.feed_tab.redecorate(self.table.curr_feed_filters, self.table.feed_sums)
+        self._show_result_no()
+        return 0
+
+
+
+
+    def _query_window(self, QP, qr, filters, **kargs):
+        """ Query first window of results and keep the rest to be pulled after the first screen is shown.
+            Pages are entered by seeking past the last row of the previous page if possible """
+        sig = (qr, tuple(sorted( (k, str(v)) for k,v in filters.items() if k != 'page' )),)
+        if sig != self.page_keys_sig:
+            self.page_keys.clear()
+            self.page_keys_sig = sig
+
+        self.window = FeedexQueryWindow(QP, qr, filters, after=self.page_keys.get(self.page_no), window=QUERY_WINDOW_LENGTH, **kargs)
+        results = self.window.next()
+        if self.window.status != 0: return self.window.status
+        QP.results = results
+        QP.result_no = len(results)
+        return 0
+
+
+
+    def _pull_windows(self, win, search_no:int, page_no:int, **kargs):
+        """ Pull remaining result windows and send them to main thread """
+        while not win.done:
+            if search_no != self.search_no: return 0
+            results = win.next()
+            fdx.bus_append((FX_ACTION_APPEND_WINDOW, self.uid, search_no, results, win.done,))
+        if win.status == 0 and win.after is not None: self.page_keys[page_no + 1] = win.after
+        return 0
+
+
+
+
     def query_thr(self, qr, filters, **kargs):
         """ Wrapper for sending queries """
         # DB interface for queries
@@ -862,7 +920,7 @@ Escape: \ (only if before wildcards and field markers)""") )
             DB = None
             QP = FeedexCatalogQuery()
         else:
-            DB = FeedexDatabase(connect=True)
+            DB = FeedexDatabase(connect=True, pooled=True)
             DB.connect_QP()
             QP = DB.Q
 
@@ -874,13 +932,16 @@ Escape: \ (only if before wildcards and field markers)""") )
         else: empty = False
 
         err = 0
+        search_no = self.search_no
+        page_no = self.page_no
+        self.window = None
 
         # Do query ...
         if self.type in {FX_TAB_SEARCH, FX_TAB_NOTES,}:
 
             feed_name = f_get_combo(self.cat_combo, name=True)
 
-            if not empty: err = QP.query(qr, filters)
+            if not empty: err = self._query_window(QP, qr, filters)
             elif rank_scheme == FX_RANK_RECOM: err = QP.recommend(filters, no_history=True)
             elif rank_scheme == FX_RANK_TREND: err = QP.trending('', filters, no_history=True)
             elif rank_scheme == FX_RANK_DEBUBBLE:
@@ -888,7 +949,7 @@ Escape: \ (only if before wildcards and field markers)""") )
                 err = QP.recommend(filters, no_history=True)
             else:
                 filters['sort'] = 'pubdate'
-                err = QP.query('', filters, no_history=True)
+                err = self._query_window(QP, '', filters, no_history=True)
 
 
             if empty:
@@ -905,7 +966,7 @@ Escape: \ (only if before wildcards and field markers)""") )
  
             if qr == FX_PLACE_TRASH_BIN:
 
-                err = QP.query('', {'deleted':True, 'sort':'adddate'}, no_history=True)
+                err = self._query_window(QP, '', {'deleted':True, 'sort':'adddate'}, no_history=True)
                 self.final_status = _('Trash bin')
 
             else:
@@ -1032,8 +1093,13 @@ Escape: \ (only if before wildcards and field markers)""") )
         if err == 0: self.table.populate(QP)
         else: self.final_status = f"""<span foreground="red">{self.final_status}</span>"""
 
-        if DB is not None: DB.close()
+        # Show first window before pulling the rest
+        win = self.window
+        self.streaming = err == 0 and win is not None and not win.done
         fdx.bus_append((FX_ACTION_FINISHED_SEARCH, self.uid,))
+        if self.streaming: self._pull_windows(win, search_no, page_no)
+
+        if DB is not None: DB.close()
 
 
 
@@ -1044,6 +1110,8 @@ Escape: \ (only if before wildcards and field markers)""") )
         """ As above, threading"""
         if self.busy: return -1
         self.busy = True
+        self.search_no += 1
+        self.streaming = False
         
         if self.type in {FX_TAB_TREE, FX_TAB_TRENDS,}: self.block_search(_("Generating summary...") )
         elif self.type in {FX_TAB_RULES, FX_TAB_FLAGS, FX_TAB_PLUGINS, FX_TAB_LEARNED,}: self.block_search(_("Getting data...") )
@@ -1395,6 +1463,31 @@ class FeedexGUITable:
 
 
 
+    def append_results(self, results, **kargs):
+        """ Append a list of results (e.g. next query window) at the end of the store """
+        if type(self.results) is tuple: self.results = list(self.results)
+        if isinstance(self.result, (ResultEntry, ResultContext,)): update_sums = True
+        else: update_sums = False
+
+        self.lock.acquire()
+        for r in results:
+            self.results.append(r)
+            ix = len(self.results) - 1
+            self.result.populate(r)
+            self.result.humanize()
+            item = self.gen_store_item(ix, update_sums=update_sums)
+            if self.is_tree:
+                if self.store is not None: self.store.append(None, item)
+            else:
+                if self.store is not None: self.store.append(item)
+                if self.filtered_store is not None and self.curr_feed_filters is not None and self.result['feed_id'] in self.curr_feed_filters:
+                    self.filtered_store.append(item)
+        self.result_no = len(self.results)
+        self.lock.release()
+
+
+
+
     def _for_each_remove(self, model, path, iter, id):
         """ Check match for each item and do the removing """
         if model[iter][self.result.gindex('id')] == id:
@@ -140,6 +140,7 @@ FX_ACTION_HANDLE_IMAGES = 9
 FX_ACTION_FINISHED_SEARCH = 10
 FX_ACTION_FINISHED_FILTERING = 11
 FX_ACTION_RELOAD_TRASH = 12
+FX_ACTION_APPEND_WINDOW = 13
 
 
 
@@ -10,6 +10,20 @@ from feedex_headers import *
 
 
 
+class FeedexTimeoutProcessor(urllib.request.BaseHandler):
+    """ Sets timeout for every request made by urllib opener (e.g. inside feedparser), so global socket timeout does not need to be changed """
+    def __init__(self, timeout:int):
+        self.timeout = timeout
+
+    def http_request(self, req):
+        req.timeout = self.timeout
+        return req
+
+    https_request = http_request
+
+
+
+
 
 class FeedexRSSHandler:  
     """ RSS handler for Feedex and a handler base class """
@@ -47,6 +61,11 @@ class FeedexRSSHandler:
         self.agent = fdx.config.get('user_agent', FEEDEX_USER_AGENT)
         self.fallback_agent = fdx.config.get('fallback_user_agent')
 
+        self.downloaded = False # Was feed downloaded in advance (e.g. by a worker thread)?
+        self.download_err = 0
+        self.download_time = 0
+        self.response = None # Response downloaded by external engine (see FeedexAsyncDownloader)
+
         self.images = []
 
 
@@ -95,18 +114,51 @@ class FeedexRSSHandler:
 
 
 
+    def request_headers(self, **kargs):
+        """ HTTP request headers for external download engine. Returns None if feed needs authentication handlers """
+        if self.http_headers.get('handlers') is not None: return None
+        headers = {'User-Agent': self.http_headers.get('agent', self.agent)}
+        if not kargs.get('force', False):
+            headers['If-None-Match'] = self.http_headers.get('etag')
+            headers['If-Modified-Since'] = self.http_headers.get('modified')
+        return headers
+
+
+    def set_response(self, response:dict):
+        """ Set response downloaded by external engine, so it is parsed instead of downloaded """
+        self.response = response
+
+
+    def _get_response(self, **kargs):
+        """ Pop externally downloaded response or return None if there was an error """
+        response, self.response = self.response, None
+        if response.get('error') is not None:
+            self.error = True
+            msg(FX_ERROR_HANDLER, _('Download error: %a'), response.get('error'))
+            return None
+        return response
+
+
+
     def _do_download(self, url:str, **kargs):
         """ Method for downloading specifically - to be overwritten for child classes/ different HTTP-based protocols"""
+        if self.response is not None:
+            response = self._get_response()
+            if response is None: return {}
+            if response['status'] in {304,}: raw = {}
+            else: raw = feedparser.parse(response['body'], response_headers=response['headers'])
+            raw['status'] = response['status']
+            raw['href'] = response['href']
+            raw['etag'] = response['headers'].get('etag')
+            raw['modified'] = response['headers'].get('last-modified')
+            return raw
+
         try:
+            # Timeout is set per request, as handlers may download in many threads at once
+            headers = self.http_headers.copy()
             timeout = scast(fdx.config.get('fetch_timeout'), int, 0)
-            if timeout != 0:
-                old_timeout = socket.getdefaulttimeout()
-                socket.setdefaulttimeout(timeout)
-            
-            raw = feedparser.parse(url, **self.http_headers)
-            if timeout != 0: socket.setdefaulttimeout(old_timeout)
-            
-            return raw
+            if timeout != 0: headers['handlers'] = list(headers.get('handlers', [])) + [FeedexTimeoutProcessor(timeout)]
+            return feedparser.parse(url, **headers)
         
         except Exception as e:
             self.error = True
@@ -152,7 +204,10 @@ class FeedexRSSHandler:
                 if new_url not in {None,'',}:
                     # Watch out for endless redirect loops!!!
                     self.redirected = True
-                    ret = self.download(url=url, do_redirects=False, force=force, redirected=True)
+                    status = self.status
+                    ret = self.download(url=new_url, do_redirects=False, force=force, redirected=True)
+                    # Keep original redirect status, so permanent redirects can be saved
+                    if ret == 0 and self.changed: self.status = self.feed_delta['http_status'] = status
                     return ret
                 else:
                     return msg(FX_ERROR_HANDLER, _('URL to resource empty!'))
@@ -191,24 +246,36 @@ class FeedexRSSHandler:
 
 
     
-    def fetch(self, **kargs):
-        """ Consolidate and return downloaded RSS """
-        force = kargs.get('force',False)
-        pguids = list(kargs.get('pguids',()))
-        plinks = list(kargs.get('plinks',()))
-        last_read = kargs.get('last_read',0)
-
+    def prefetch(self, **kargs):
+        """ Download feed in advance (e.g. in a worker thread), so fetch() only needs to parse the results """
         self.error = False
         self.status = None
         self.modified = None
         self.etag = None
         self.redirected = False
 
+        self.download_time = int(datetime.now().timestamp())
+        self.download_err = self.download(force=kargs.get('force',False))
+        self.downloaded = True
+        return self.download_err
+
+
+
+    def fetch(self, **kargs):
+        """ Consolidate and return downloaded RSS """
+        force = kargs.get('force',False)
+        pguids = set(kargs.get('pguids',()))
+        plinks = set(kargs.get('plinks',()))
+        last_read = kargs.get('last_read',0)
+
         self.entries = []
 
-        now_last = int(datetime.now().timestamp())
+        # Download now, unless it was done beforehand
+        if not self.downloaded: self.prefetch(force=force)
+        self.downloaded = False
+        err = self.download_err
+        now_last = self.download_time
 
-        err = self.download(force=force)
         if err != 0 or self.error or self.feed_raw == {}: return err
         self.feed_delta['lastchecked'] = now_last
         if not self.changed: return msg(_('Feed unchanged (304)'))
@@ -252,8 +319,8 @@ class FeedexRSSHandler:
             # Go on if nothing change
             if pub_date_entry <= last_read: continue
             # Check for duplicates in saved entries by complaring to previously compiled lists
-            if (entry.get('guid'),) in pguids and entry.get('guid') not in {'',None,}: continue
-            if (entry.get('link'),) in plinks and entry.get('link') not in {'',None,}: continue
+            if entry.get('guid') in pguids and entry.get('guid') not in {'',None,}: continue
+            if entry.get('link') in plinks and entry.get('link') not in {'',None,}: continue
 
             self.entry = {}
 
@@ -344,8 +411,8 @@ class FeedexRSSHandler:
             for l in entry.get('links',()): link_string = f"""{link_string}{l.get('href','')}\n"""
             self.entry['links'] = nullif(f"""{link_string}{links}""",'')
 
-            pguids.append(self.entry['guid'])
-            plinks.append(self.entry['link'])
+            pguids.add(self.entry['guid'])
+            plinks.add(self.entry['link'])
             yield self.entry
 
 
@@ -366,10 +433,8 @@ class FeedexRSSHandler:
             # Fallback to catalog icons
             if not os.path.isfile(icon):
                 feed_url = ''
-                for f in fdx.feeds_cache:
-                    if f[self.ifeed.get_index('id')] == feed_id: 
-                        feed_url = f[self.ifeed.get_index('url')]
-                        break
+                f = fdx.load_parent(feed_id)
+                if f != -1: feed_url = coalesce(f[self.ifeed.get_index('url')], '')
                 if feed_url != '':
                     thumbnail = os.path.join(FEEDEX_FEED_CATALOG_CACHE, 'thumbnails', f"""{fdx.hash_url(feed_url)}.img""")
                     if os.path.isfile(thumbnail):
@@ -541,13 +606,29 @@ class FeedexHTMLHandler(FeedexRSSHandler):
 
     def _do_download(self, url: str, **kargs):
         """ Download HTML resource """
-        response, html = fdx.download_res(url, output_pipe='', user_agent=self.agent, mimetypes=FEEDEX_TEXT_MIMES)
-        if type(response) is int or type(html) is not str: return {}
-
         feed_raw = {}
-        feed_raw['status'] = response.status
-        feed_raw['etag'] = response.headers.get('etag')
-        feed_raw['modified'] = response.headers.get('modified')
+        if self.response is not None:
+            response = self._get_response()
+            if response is None: return {}
+            content_type = slist(scast(response['headers'].get('content-type'), str, '').split(';'), 0, '').strip()
+            if response['status'] not in {304,} and content_type not in FEEDEX_TEXT_MIMES:
+                self.error = True
+                msg(FX_ERROR_HANDLER, _('Invalid content type (%a)!'), content_type)
+                return {}
+            feed_raw['status'] = response['status']
+            feed_raw['href'] = response['href']
+            feed_raw['etag'] = response['headers'].get('etag')
+            feed_raw['modified'] = response['headers'].get('last-modified')
+            html = response['body'].decode('utf-8', errors='replace')
+        
+        else:
+            response, html = fdx.download_res(url, output_pipe='', user_agent=self.agent, mimetypes=FEEDEX_TEXT_MIMES)
+            if type(response) is int or type(html) is not str: return {}
+            feed_raw['status'] = response.status
+            feed_raw['etag'] = response.headers.get('etag')
+            feed_raw['href'] = response.url
+            feed_raw['modified'] = response.headers.get('last-modified')
+
         feed_raw['raw_html'] = html
 
         if kargs.get('download_only',False): return feed_raw
@@ -669,10 +750,8 @@ class FeedexScriptHandler:
             return {}
 
 
-        
-
-
-
 
 
 
+# Handler classes by name used in feeds' 'handler' field ('local' feeds are not fetched)
+FEEDEX_HANDLERS = {'rss': FeedexRSSHandler, 'html': FeedexHTMLHandler, 'script': FeedexScriptHandler,}
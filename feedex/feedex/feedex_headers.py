@@ -14,16 +14,29 @@ from math import log10
 import subprocess
 import time
 import pickle
-from shutil import copyfile
+from shutil import copyfile, rmtree
 from random import randint
 import json
 import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from collections import deque
+import queue
+import asyncio
 import socket
+import ssl
+import io
+import zlib
+import html
+try: import fcntl # Advisory file locks (not available on all platforms)
+except ImportError: fcntl = None
 #import itertools
 
 # Downloaded
 import feedparser
 import urllib.request
+import urllib.parse
 import hashlib
 
 import sqlite3
@@ -48,15 +61,16 @@ from feedex_containers import SQLContainer, SQLContainerEditable, ResultEntry, R
     FeedexDBStats
 
 from smallsem import SmallSem
-from feedex_nlp import FeedexLP
+from feedex_nlp import FeedexLP, recalc_worker_init, recalc_worker
 
 from feedex_feed import FeedexFeed, FeedexCatalog, ResultCatItem
 from feedex_entry import FeedexEntry
 
-from feedex_handlers import FeedexRSSHandler, FeedexHTMLHandler, FeedexScriptHandler
+from feedex_handlers import FeedexRSSHandler, FeedexHTMLHandler, FeedexScriptHandler, FEEDEX_HANDLERS
+from feedex_downloader import FeedexAsyncDownloader
 
 
-from feeder_query import FeedexQuery, FeedexQueryInterface, FeedexCatalogQuery
+from feeder_query import FeedexQuery, FeedexQueryInterface, FeedexQueryWindow, FeedexCatalogQuery
 from feeder import FeedexDatabase, FeedexDatabaseError, FeedexDataError, FeedexDatabaseLockedError, FeedexDatabaseNotFoundError
 
 
@@ -102,129 +102,158 @@ class FeedexLP(SmallSem):
 
 
     def gen_index_strings(self, text:str, **kwargs):
-        """ Tokenize with tagging and statistics for indexing. """
+        """ Tokenize with tagging and statistics for indexing. 
+            Token classes are cached per model, so every distinct token is syllabified, stemmed etc. only once """
         field_offset = kwargs.get('field_offset',0)
         field_len = 0
 
-        ix_token_str = ''
-        ix_exact_token_str = ''
+        toks = []
+        extoks = []
+        rank_toks = []
         
         # Dictionary of pos lists for semantic stuff
         sems = {} 
         for p in SEM_TERMS: sems[p] = []
 
+        cache = self.ling.get('ix_token_cache')
+        if cache is None or len(cache) > LP_TOKEN_CACHE_MAX:
+            cache = {}
+            self.ling['ix_token_cache'] = cache
         
+        classes = {} # Classes of tokens in this text ...
+        freqs = {} # ... and their frequencies for stats
+        variants = self.variants
+
         # Iterate over all tokens
         for ipos, t in enumerate(self.tokenize_ix_gen(text, kwargs.get('split',False))):
 
-            tlen = len(t)
-            if tlen < 1: continue
+            cls = classes.get(t)
+            if cls is None:
+                if len(t) < 1: continue
+                cls = cache.get(t)
+                if cls is None:
+                    cls = self._ix_token_class(t)
+                    cache[t] = cls
+                classes[t] = cls
+                freqs[t] = 1
+            else: freqs[t] += 1
 
-            to_rank = False # Flag marking a token for later ranking 
+            tok, extok, to_rank, sem_keys, stats, is_var = cls
 
             # Needed to accurately position semantic wildcards
             ipos = field_offset + ipos
             field_len += 1
 
-            tok = ''
-            extok = ''
-
-            if t in self.divs:
-
-                tok = t
-                extok = tok
-                sems[PREFIXES['div']].append(ipos)
-                if t in self.sent_end: self.stats['sent_count'] += 1
-
+            for k in sem_keys: sems[k].append(ipos)
 
-            elif t in self.punctation:
-                tok = t
-                extok = tok
-                sems[PREFIXES['div']].append(ipos)
+            if is_var:
+                vs = variants.get(tok)
+                if vs is None: variants[tok] = [extok]
+                else: vs.append(extok)
 
-            elif self._isnum(t):
-                tok = t
-                extok = tok
-                sems[PREFIXES['num']].append(ipos)
-                self.stats['numerals_count'] += 1
-                self.stats['word_count'] += 1
-
-
-
-
-            else:
-                self.stats['word_count'] += 1
+            toks.append(tok)
+            extoks.append(extok)
+            if to_rank: rank_toks.append(tok)
 
-                if self.writing_system == 1: 
-                    self.stats['char_count'] += len(t)
+        for t, fr in freqs.items():
+            for k, v in classes[t][4]: self.stats[k] += v * fr
 
-                    case = self._case(t)
-                    if case > 0:
-                        self.stats['caps_count'] += 1
-                        if case == 1: sems[PREFIXES['cap']].append(ipos)
-                        else: sems[PREFIXES['allcap']].append(ipos)
+        if field_len == 0: return ('', '', sems, field_len)
 
-                    syls = len(self.pyphen.inserted(t).split('-'))
-                    if syls >= 3:
-                        self.stats['polysyl_count'] += 1
-                        sems[PREFIXES['polysyl']].append(ipos)
-
-                    cextok = t
-                    t = t.lower()
-                    extok = t
-                    tok = self.stemmer.stemWord(t)
-                    if tok not in self.variants.keys(): self.variants[tok] = []
-                    self.variants[tok].append(t)
-
-                    to_rank = True
+        ix_token_str = ' ' + ' '.join(toks)
+        # Exact string has always been built with a leading space for each token - kept for identical output
+        ix_exact_token_str = ' ' * field_len + ' ' + ' '.join(extoks)
+        if len(rank_toks) > 0: self.rank_string = ''.join((self.rank_string, ' '.join(rank_toks), ' '))
 
+        return (ix_token_str, ix_exact_token_str, sems, field_len)
 
-                elif self.writing_system == 2:
-                    syls = 1
-                    self.stats['char_count'] += 1
-                    case = self.case(t)
-                    if case > 0: 
-                        self.stats['caps_count'] += 1
-                        sems[PREFIXES['cap']].append(ipos)
-                    t = t.lower()
 
-                    if t in self.commons:
-                        self.stats['com_word_count'] += 1
 
-                    tok = t
-                    extok = tok
+    def _ix_token_class(self, t:str):
+        """ Classify token for indexing: (token, exact token, ranking flag, semantic tags, stat increments, stemming variant flag) """
+        tok = ''
+        extok = ''
+        to_rank = False
+        sem_keys = []
+        stats = []
+        is_var = False
 
-                    to_rank = True
+        if t in self.divs:
+            tok = t
+            extok = tok
+            sem_keys.append(PREFIXES['div'])
+            if t in self.sent_end: stats.append(('sent_count',1))
 
+        elif t in self.punctation:
+            tok = t
+            extok = tok
+            sem_keys.append(PREFIXES['div'])
 
-                if tok in self.commons:
-                    self.stats['com_word_count'] += 1
-                elif extok in self.stops:
-                    self.stats['com_word_count'] += 1
-                    to_rank = False
-                elif extok in self.swadesh:
-                    self.stats['com_word_count'] += 1
-                else:
-                    sems[PREFIXES['uncomm']].append(ipos)
-                
-                    # This is a good rule of thumb for 'wild' symbols
-                    if syls <= 1:
-                        if self._isrnum(extok): sems[PREFIXES['rnum']].append(ipos)
-                        elif cextok in UNIT_ENTS: sems[PREFIXES['unit']].append(ipos)
-                        elif cextok in CURRENCY_ENTS: sems[PREFIXES['curr']].append(ipos)
-                        elif self._contains_item(extok, CURRENCY_SHORT_ENTS): sems[PREFIXES['curr']].append(ipos)
-                        elif self._contains_item(extok, GREEK_ENTS): sems[PREFIXES['greek']].append(ipos)
-                        elif self._contains_item(extok, MATH_ENTS): sems[PREFIXES['math']].append(ipos)
+        elif self._isnum(t):
+            tok = t
+            extok = tok
+            sem_keys.append(PREFIXES['num'])
+            stats.append(('numerals_count',1))
+            stats.append(('word_count',1))
 
+        else:
+            stats.append(('word_count',1))
+            cextok = t
+            syls = 1
+
+            if self.writing_system == 1: 
+                stats.append(('char_count',len(t)))
+
+                case = self._case(t)
+                if case > 0:
+                    stats.append(('caps_count',1))
+                    if case == 1: sem_keys.append(PREFIXES['cap'])
+                    else: sem_keys.append(PREFIXES['allcap'])
+
+                syls = len(self.pyphen.inserted(t).split('-'))
+                if syls >= 3:
+                    stats.append(('polysyl_count',1))
+                    sem_keys.append(PREFIXES['polysyl'])
+
+                t = t.lower()
+                extok = t
+                tok = self.stemmer.stemWord(t)
+                is_var = True
+                to_rank = True
+
+            elif self.writing_system == 2:
+                stats.append(('char_count',1))
+                case = self._case(t)
+                if case > 0: 
+                    stats.append(('caps_count',1))
+                    sem_keys.append(PREFIXES['cap'])
+                t = t.lower()
+
+                if t in self.commons: stats.append(('com_word_count',1))
 
+                tok = t
+                extok = tok
+                to_rank = True
 
-            ix_token_str = f"""{ix_token_str} {tok}"""
-            ix_exact_token_str = f""" {ix_exact_token_str} {extok}"""
 
-            if to_rank:
-                self.rank_string = f'''{self.rank_string}{tok} '''
+            if tok in self.commons: stats.append(('com_word_count',1))
+            elif extok in self.stops:
+                stats.append(('com_word_count',1))
+                to_rank = False
+            elif extok in self.swadesh: stats.append(('com_word_count',1))
+            else:
+                sem_keys.append(PREFIXES['uncomm'])
+            
+                # This is a good rule of thumb for 'wild' symbols
+                if syls <= 1:
+                    if self._isrnum(extok): sem_keys.append(PREFIXES['rnum'])
+                    elif cextok in UNIT_ENTS: sem_keys.append(PREFIXES['unit'])
+                    elif cextok in CURRENCY_ENTS: sem_keys.append(PREFIXES['curr'])
+                    elif self._contains_item(extok, CURRENCY_SHORT_ENTS): sem_keys.append(PREFIXES['curr'])
+                    elif self._contains_item(extok, GREEK_ENTS): sem_keys.append(PREFIXES['greek'])
+                    elif self._contains_item(extok, MATH_ENTS): sem_keys.append(PREFIXES['math'])
 
-        return (ix_token_str, ix_exact_token_str, sems, field_len)
+        return (tok, extok, to_rank, tuple(sem_keys), tuple(stats), is_var)
 
 
 
@@ -358,6 +387,7 @@ class FeedexLP(SmallSem):
         self.set_model(remember_lang)
         
         fdx.rules_val_cache = val_rules
+        fdx.rules_engine = FeedexRuleEngine(val_rules)
         debug(7, 'Rules validated...')
 
 
@@ -380,13 +410,12 @@ class FeedexLP(SmallSem):
         flag_freq_dist = {}
 
         if fdx.rules_val_cache is None: self.validate_rules()
+        if fdx.rules_engine is None or fdx.rules_engine.rules is not fdx.rules_val_cache: fdx.rules_engine = FeedexRuleEngine(fdx.rules_val_cache)
 
-        for r in fdx.rules_val_cache:
+        for r, matched in fdx.rules_engine.match(self, entry, ranking_token_str, self.get_model()):
             name    = r[1]
             qtype   = r[2]
             feed    = r[3]
-            if feed is not None and feed != -1 and entry['feed_id'] != feed: continue
-
             field   = r[4]
             string  = r[5]
 
@@ -394,46 +423,10 @@ class FeedexLP(SmallSem):
             else: case_ins = False
 
             lang        = r[7]
-            if lang is not None and lang != self.get_model(): continue
-            
             rweight     = r[8]
             additive    = r[9]
             rflag       = r[10]
 
-            matched = 0
-
-            if string == '' and feed is not None and feed != -1: matched = 1
-            elif qtype == 1:
-                matched = ranking_token_str.count(string)
-
-            elif qtype in {0,2,}:
-                if field in {None, -1,}: field_lst = LING_TEXT_LIST
-                else: field_lst = (field,)
-
-
-                if qtype == 2:
-
-                    for f in field_lst:
-                        if type(entry[f]) is not str: continue
-
-                        if case_ins: matches = re.findall(string, entry[f], re.IGNORECASE)
-                        else: matches = re.findall(string, entry[f])
-                        matched += len(matches)
-
-
-                elif qtype == 0:
-
-                    for f in field_lst:
-                        if type(entry[f]) is not str: continue
-                        f = entry[f]
-                        if case_ins: fs = f.lower()
-                        else: fs = f
-                        new_matched = self.str_matcher(string['spl_string'], string['spl_string_len'], string['beg'], string['end'], fs, snippets=False)[0]
-                        matched += new_matched
-
-
-
-
             if matched > 0:
 
                 if additive == 1: importance += matched * rweight
@@ -668,6 +661,101 @@ class FeedexLP(SmallSem):
         return f'{beg}{string[llimit:idx]}', f'{string[idx:idx+l]}', f'{string[idx+l:rlimit]}{end}'
 
 
+
+    def compile_matcher(self, strings):
+        """ Compile a list of literal strings into a matcher for match_snippets: strings with no other string as prefix
+            are searched for, longer ones are only checked where their prefix was found (longest first) """
+        strings = sorted({s for s in strings if type(s) is str and s != ''}, key=len)
+        if len(strings) == 0: return None
+        roots = {}
+        for s in strings:
+            for r in roots.keys():
+                if s.startswith(r):
+                    roots[r].insert(0, s)
+                    break
+            else: roots[s] = []
+        return tuple([(r, tuple(l)) for r,l in roots.items()])
+
+
+
+    def match_snippets(self, matcher, field:str, **kargs):
+        """ Extract snippets for all matches of a compiled matcher in a single pass - gives the same triples as str_matcher/srange
+            for literal strings, but cleans the original string once and overlapping variants are matched only once """
+        if matcher is None: return 0, []
+        orig_field = kargs.get('orig_field', field)
+        max_len = kargs.get('max_len', 0)
+        rng = kargs.get('rng', 70)
+
+        field = field.replace('\n',' ').replace('\r',' ')
+
+        spans = []
+        for r, longer in matcher:
+            idx = field.find(r)
+            while idx != -1:
+                l = len(r)
+                for v in longer:
+                    if field.startswith(v, idx):
+                        l = len(v)
+                        break
+                spans.append((idx, idx+l))
+                idx = field.find(r, idx+1)
+        if len(spans) == 0: return 0, []
+        spans.sort()
+
+        string = orig_field.replace('\n',' ').replace('\r',' ').replace(self.BOLD_MARKUP_BEG,'').replace(self.BOLD_MARKUP_END,'')
+        sl = len(field)
+
+        snips = []
+        matches = 0
+        last = 0
+        for idx, ridx in spans:
+            if idx < last: continue # Overlaps previous match
+            last = ridx
+            matches += 1
+            if matches > MAX_SNIPPET_COUNT: continue
+            if max_len > 0 and ridx - idx > max_len: continue
+            llimit = idx - rng
+            if llimit <= 0: beg, llimit = '', 0
+            else: beg = '...'
+            rlimit = ridx + rng
+            if rlimit >= sl: end, rlimit = '', sl
+            else: end = '...'
+            snips.append( (f'{beg}{string[llimit:idx]}', string[idx:ridx], f'{string[ridx:rlimit]}{end}') )
+
+        return matches, snips
+
+
+
+    def marked_snippets(self, string:str, beg_mark:str, end_mark:str, **kargs):
+        """ Split text with marked matches (e.g. generated by Xapian) into snippet triples.
+            Xapian escapes HTML in snippets, so text is unescaped unless escaped=False is given """
+        max_len = kargs.get('max_len', 0)
+        rng = kargs.get('rng', 70)
+        if kargs.get('escaped', True): unescape = html.unescape
+        else: unescape = lambda x: x
+
+        plain = []
+        spans = []
+        pos = 0
+        for i, p in enumerate(string.replace('\n',' ').replace('\r',' ').split(beg_mark)):
+            if i > 0 and end_mark in p:
+                m, p = p.split(end_mark, 1)
+                m = unescape(m)
+                spans.append((pos, pos + len(m)))
+                plain.append(m)
+                pos += len(m)
+            p = unescape(p)
+            plain.append(p)
+            pos += len(p)
+        plain = ''.join(plain)
+
+        snips = []
+        for b, e in spans[:MAX_SNIPPET_COUNT]:
+            if b == e or (max_len > 0 and e - b > max_len): continue
+            snips.append( (plain[max(b - rng, 0):b], plain[b:e], plain[e:e + rng]) )
+        return snips
+
+
     #######################################################################33
     #   Utilities
     #
@@ -686,4 +774,273 @@ class FeedexLP(SmallSem):
         """ Check if string contains any list item """
         for i in lst:
             if i in string: return True
-        return False
\ No newline at end of file
+        return False
+
+
+
+
+
+#######################################################################33
+#   Compiled rule matching
+#
+
+
+class FeedexAhoCorasick:
+    """ Aho-Corasick automaton for counting occurrences of many strings in one pass over text.
+        Counts are non-overlapping per pattern, i.e. the same as str.count would give """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.lens = []
+        self.ids = {}
+
+
+    def add(self, string:str):
+        """ Add pattern and return its id (patterns are deduplicated) """
+        pid = self.ids.get(string)
+        if pid is not None: return pid
+        pid = len(self.lens)
+        self.ids[string] = pid
+        self.lens.append(len(string))
+
+        state = 0
+        for c in string:
+            nxt = self.goto[state].get(c)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[state][c] = nxt
+            state = nxt
+        self.out[state].append(pid)
+        return pid
+
+
+    def build(self):
+        """ Compute failure links and merge outputs - must be called after all patterns are added """
+        queue = deque(self.goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f != 0 and c not in self.goto[f]: f = self.fail[f]
+                f = self.goto[f].get(c, 0)
+                if f == nxt: f = 0
+                self.fail[nxt] = f
+                self.out[nxt] = self.out[nxt] + self.out[f]
+
+
+    def count(self, text:str):
+        """ Returns a dictionary of pattern ids and their counts in text """
+        counts = {}
+        if len(self.lens) == 0: return counts
+        last_end = {}
+        goto, fail, out, lens = self.goto, self.fail, self.out, self.lens
+        state = 0
+        for i, c in enumerate(text):
+            while state != 0 and c not in goto[state]: state = fail[state]
+            state = goto[state].get(c, 0)
+            for pid in out[state]:
+                if i - lens[pid] >= last_end.get(pid, -1):
+                    counts[pid] = counts.get(pid, 0) + 1
+                    last_end[pid] = i
+        return counts
+
+
+
+
+
+class FeedexRuleEngine:
+    """ Validated rules compiled for ranking: rules are bucketed by feed and language, plain and stemmed rules
+        are matched with Aho-Corasick automata and regex rules are gated by combined regexes, 
+        so each field of an entry is scanned once instead of once per rule """
+
+    def __init__(self, rules:list):
+        self.rules = rules # Validated rules this engine was built from
+
+        self.buckets = {} # (feed_id, lang) -> ordered rule indices
+        self.feed_rules = set() # Rules matched by feed alone
+
+        self.stem_ac = FeedexAhoCorasick() # Stemmed rules are matched against ranking string
+        self.stem_pats = {}
+
+        self.plain_ac = {False:FeedexAhoCorasick(), True:FeedexAhoCorasick()} # Plain rules (case sensitive/insensitive)
+        self.plain_pats = {}
+
+        self.regexes = {}
+        self.rx_gates = {False:None, True:None} # Combined regexes to quickly skip fields without any match
+
+        self.slow = set() # Rules too complex for the above - matched one by one
+
+        rx_strings = {False:[], True:[]}
+
+        for i, r in enumerate(rules):
+            qtype, feed, field, string, case_ins, lang = r[2], r[3], r[4], r[5], (r[6] == 1), r[7]
+            if feed == -1: feed = None
+            self.buckets.setdefault((feed, lang), []).append(i)
+
+            if field in {None, -1,}: fields = LING_TEXT_LIST
+            else: fields = (field,)
+            ling_fields = set(fields).issubset(LING_TEXT_LIST)
+
+            if string == '' and feed is not None: self.feed_rules.add(i)
+            elif qtype == 1 and string != '': self.stem_pats[i] = self.stem_ac.add(string)
+            elif qtype == 0 and ling_fields and type(string) is dict and not string.get('empty', True) and not string['beg'] and not string['end'] \
+                and string['spl_string_len'] == 1 and type(string['spl_string'][0]) is str and string['spl_string'][0] != '':
+                self.plain_pats[i] = (case_ins, self.plain_ac[case_ins].add(string['spl_string'][0]), fields)
+            elif qtype == 2 and ling_fields and string != '':
+                try: rx = re.compile(string, re.IGNORECASE) if case_ins else re.compile(string)
+                except re.error: 
+                    self.slow.add(i)
+                    continue
+                # Backreferences would break when combined
+                gated = re.search(r'\\[0-9]|\(\?P=', string) is None
+                if gated: rx_strings[case_ins].append(f'(?:{string})')
+                self.regexes[i] = (rx, fields, case_ins, gated)
+            else: self.slow.add(i)
+
+        self.stem_ac.build()
+        for ac in self.plain_ac.values(): ac.build()
+
+        for case_ins, strs in rx_strings.items():
+            if len(strs) == 0: continue
+            try: self.rx_gates[case_ins] = re.compile('|'.join(strs), re.IGNORECASE) if case_ins else re.compile('|'.join(strs))
+            except re.error: self.rx_gates[case_ins] = None # e.g. global inline flags - every rule is evaluated then
+
+
+    def candidates(self, feed_id, lang):
+        """ Ordered indices of rules applicable to given feed and language """
+        keys = {(None, None), (None, lang), (feed_id, None), (feed_id, lang),}
+        cands = []
+        for k in keys: cands.extend(self.buckets.get(k, ()))
+        cands.sort()
+        return cands
+
+
+    def match(self, LP, entry, ranking_token_str:str, lang):
+        """ Generates (rule, matched) tuples for rules matching entry, in original rule order """
+        stem_counts = None
+        plain_counts = {}
+        rx_fields = {}
+
+        for i in self.candidates(entry['feed_id'], lang):
+            r = self.rules[i]
+            matched = 0
+
+            if i in self.feed_rules: matched = 1
+
+            elif i in self.stem_pats:
+                if stem_counts is None: stem_counts = self.stem_ac.count(ranking_token_str)
+                matched = stem_counts.get(self.stem_pats[i], 0)
+
+            elif i in self.plain_pats:
+                case_ins, pid, fields = self.plain_pats[i]
+                for f in fields:
+                    counts = plain_counts.get((f, case_ins))
+                    if counts is None:
+                        text = entry[f]
+                        if type(text) is not str: counts = {}
+                        else:
+                            if case_ins: text = text.lower()
+                            counts = self.plain_ac[case_ins].count(text.replace('\n',' ').replace('\r',' '))
+                        plain_counts[(f, case_ins)] = counts
+                    matched += counts.get(pid, 0)
+
+            elif i in self.regexes:
+                rx, fields, case_ins, gated = self.regexes[i]
+                for f in fields:
+                    text = entry[f]
+                    if type(text) is not str: continue
+                    if gated and self.rx_gates[case_ins] is not None:
+                        hit = rx_fields.get((f, case_ins))
+                        if hit is None:
+                            hit = self.rx_gates[case_ins].search(text) is not None
+                            rx_fields[(f, case_ins)] = hit
+                        if not hit: continue
+                    matched += len(rx.findall(text))
+
+            else: matched = self._match_slow(LP, r, entry, ranking_token_str)
+
+            if matched > 0: yield r, matched
+
+
+    def _match_slow(self, LP, r, entry, ranking_token_str:str):
+        """ Match single rule without compiled structures """
+        qtype, feed, field, string, case_ins = r[2], r[3], r[4], r[5], (r[6] == 1)
+        matched = 0
+        if string == '' and feed is not None and feed != -1: matched = 1
+        elif qtype == 1: matched = ranking_token_str.count(string)
+        elif qtype in {0,2,}:
+            if field in {None, -1,}: field_lst = LING_TEXT_LIST
+            else: field_lst = (field,)
+
+            for f in field_lst:
+                if type(entry[f]) is not str: continue
+                if qtype == 2:
+                    if case_ins: matched += len(re.findall(string, entry[f], re.IGNORECASE))
+                    else: matched += len(re.findall(string, entry[f]))
+                else:
+                    if case_ins: fs = entry[f].lower()
+                    else: fs = entry[f]
+                    matched += LP.str_matcher(string['spl_string'], string['spl_string_len'], string['beg'], string['end'], fs, snippets=False)[0]
+        return matched
+
+
+
+
+
+
+
+#######################################################################33
+#   Process pool workers for mass recalculation (see FeedexDatabase._recalculate)
+#
+
+_RECALC_LP = None
+
+def recalc_worker_init(config, rules_val_cache):
+    """ Setup language processor in a worker process. Rules are validated by parent, so no DB connection is needed here """
+    global _RECALC_LP
+    fdx.config = config
+    fdx.rules_val_cache = rules_val_cache
+    _RECALC_LP = FeedexLP(None)
+
+
+
+def recalc_worker(rows, mode:str, learning_depth:int):
+    """ Do CPU-bound linguistic processing for a batch of entry rows (as selected by RECALC_MULTI_SQL).
+        Returns a list of compact results (one per row) to be written to DB and index by parent:
+            index: {'stats', 'ix_strings', 'variants'}
+            rank:  {'stats', 'importance', 'flag'}
+            learn: {'model', 'features'} or None for unread entries """
+    LP = _RECALC_LP
+    results = []
+    for row in rows:
+        entry = dict(zip(ENTRIES_SQL_TABLE, row))
+        LP.set_model(entry['lang'])
+
+        if mode == 'learn':
+            if coalesce(entry['read'], 0) == 0: 
+                results.append(None)
+                continue
+            learning_string = ''
+            for f in LING_TEXT_LIST: learning_string = f"""{learning_string}  {scast(entry[f], str, '')}"""
+            results.append({'model':LP.get_model(), 'features':LP.extract_features(learning_string, depth=learning_depth)})
+            continue
+
+        ix_strings, rank_string = LP.index(entry)
+        LP.calculate_stats()
+        entry.update(LP.stats)
+        res = {'stats':LP.stats.copy()}
+
+        if mode == 'rank': res['importance'], res['flag'] = LP.rank(entry, rank_string, to_disp=False)
+        else:
+            res['ix_strings'] = dict(ix_strings)
+            res['variants'] = {k:list(v) for k,v in LP.variants.items()}
+        
+        results.append(res)
+
+    return results
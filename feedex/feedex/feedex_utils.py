@@ -281,6 +281,101 @@ def print_json(data):
 
 
 
+def json_items_gen(f, **kargs):
+    """ Stream items from a file with a JSON array or with one JSON value per line (NDJSON) without reading it whole.
+        Invalid lines are reported and skipped, errors inside an array raise ValueError """
+    chunk_size = kargs.get('chunk_size', JSON_STREAM_CHUNK)
+    max_item_size = kargs.get('max_item_size', JSON_STREAM_MAX_ITEM)
+
+    buf = ''
+    eof = False
+    while not eof and buf.strip() == '':
+        chunk = f.read(chunk_size)
+        if chunk == '': eof = True
+        buf = f'{buf}{chunk}'
+    buf = buf.lstrip()
+    if buf == '': return 0
+
+    # Lines can also hold arrays (entries as lists), so array is assumed only if the first line is not a complete value followed by more lines
+    ndjson = not buf.startswith('[')
+    if not ndjson:
+        while not eof and '\n' not in buf and len(buf) < chunk_size:
+            chunk = f.read(chunk_size)
+            if chunk == '': eof = True
+            buf = f'{buf}{chunk}'
+        first, nl, rest = buf.partition('\n')
+        if nl != '':
+            if rest.strip() == '' and not eof:
+                chunk = f.read(chunk_size)
+                if chunk == '': eof = True
+                buf = f'{buf}{chunk}'
+                rest = f'{rest}{chunk}'
+            if rest.strip() != '':
+                try:
+                    json.loads(first)
+                    ndjson = True
+                except json.JSONDecodeError: pass
+
+    # Newline-delimited JSON
+    if ndjson:
+        lines = buf.split('\n')
+        tail = lines.pop()
+        lines.append(f'{tail}{f.readline()}')
+        buf = None
+        i = 0
+        while True:
+            for line in lines:
+                i += 1
+                line = line.strip()
+                if line == '': continue
+                try: yield json.loads(line)
+                except json.JSONDecodeError as e: msg(FX_ERROR_IO, _('Invalid JSON in line %a: %b'), i, e)
+            if lines is f: return 0
+            lines = f
+
+    # JSON array - parsed item by item from a sliding buffer
+    decoder = json.JSONDecoder()
+    pos = 1
+    ii = 0
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,': pos += 1
+            if pos < len(buf) or eof: break
+            chunk = f.read(chunk_size)
+            if chunk == '': eof = True
+            buf, pos = chunk, 0
+
+        if pos >= len(buf): raise ValueError(_('Unexpected end of JSON array'))
+        if buf[pos] == ']':
+            # Anything but whitespace after array means it was not an array (e.g. NDJSON with a very long first line)
+            rest = buf[pos+1:]
+            while True:
+                if rest.strip() != '': raise ValueError(_('Unexpected data after JSON array (item %a)'), ii)
+                if eof: return 0
+                rest = f.read(chunk_size)
+                if rest == '': eof = True
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # Scalar near the end of buffer could be cut in half - a number cut after '.', 'e' or sign is decoded
+                # only partially, so it is complete only if followed by a delimiter or far enough from the end
+                if eof or type(item) in (dict, list,): break
+                if end < len(buf) and (len(buf) - end > 2 or buf[end] in ' \t\r\n,]'): break
+            except json.JSONDecodeError as e:
+                if eof: raise ValueError(_('Invalid JSON (item %a): %b'), ii, e)
+            if len(buf) - pos > max_item_size: raise ValueError(_('Item %a is too large'), ii)
+            chunk = f.read(chunk_size)
+            if chunk == '': eof = True
+            buf, pos = f'{buf[pos:]}{chunk}', 0
+
+        yield item
+        ii += 1
+        pos = end
+        if pos > chunk_size: buf, pos = buf[pos:], 0
+
+
+
 
 
 class FeedexError(Exception):
@@ -308,12 +403,171 @@ class FeedexConfigError(FeedexError):
 class FeedexCommandLineError(FeedexError):
     """ Invalid command line arguments were given """
     def __init__(self, *args, **kargs): 
-        kargs['code'] = kargs.get('code', FX_ERROR_CL)        
+        kargs['code'] = kargs.get('code', FX_ERROR_CL)
         super().__init__(*args, **kargs)
 
 
 
 
+###############################################################33
+#
+#           Locks
+
+def pid_alive(pid):
+    """ Check if process with given PID is running (always True if it can not be checked on this platform) """
+    pid = scast(pid, int, 0)
+    if pid <= 0: return False
+    if os.name != 'posix': return True
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    except OSError: return False
+    return True
+
+
+
+class FeedexLock:
+    """ Local reader/writer lock. Waiting threads sleep on a condition and are woken as soon as lock is released.
+        Lock is reentrant for holding thread, writer can also take shared locks and waiting writers
+        stop new readers from coming in """
+
+    def __init__(self):
+        self.cond = threading.Condition(threading.Lock())
+        self.writer = None # Thread holding exclusive lock...
+        self.depth = 0 # ... and how many times it took it
+        self.writers_waiting = 0
+        self.readers = {} # Threads holding shared lock -> depth
+
+
+    def acquire(self, **kargs):
+        """ Take lock. Returns False if it was not free within timeout (None - wait indefinitely, 0 - just check) """
+        shared = kargs.get('shared', False)
+        timeout = kargs.get('timeout')
+        me = threading.get_ident()
+
+        with self.cond:
+            if self.writer == me:
+                self.depth += 1
+                return True
+
+            if shared:
+                if me in self.readers:
+                    self.readers[me] += 1
+                    return True
+                if not self.cond.wait_for(lambda: self.writer is None and self.writers_waiting == 0, timeout): return False
+                self.readers[me] = 1
+                return True
+
+            if me in self.readers: return False # Upgrading shared lock would deadlock with other readers
+            self.writers_waiting += 1
+            try: free = self.cond.wait_for(lambda: self.writer is None and len(self.readers) == 0, timeout)
+            finally: self.writers_waiting -= 1
+            if free: self.writer, self.depth = me, 1
+            else: self.cond.notify_all() # Readers held back by this writer can go on
+            return free
+
+
+    def release(self):
+        """ Release lock held by current thread and wake up waiting ones """
+        me = threading.get_ident()
+        with self.cond:
+            if self.writer == me:
+                self.depth -= 1
+                if self.depth > 0: return 0
+                self.writer = None
+            elif me in self.readers:
+                self.readers[me] -= 1
+                if self.readers[me] > 0: return 0
+                del self.readers[me]
+            else: return -1
+            self.cond.notify_all()
+        return 0
+
+
+    def locked(self):
+        """ Is lock taken by anyone? """
+        with self.cond: return self.writer is not None or len(self.readers) > 0
+
+
+
+
+class FeedexFileLock:
+    """ Advisory lock on a file coordinating processes (and separate handles within one process).
+        OS releases it when holder dies, so it can not go stale. PID of exclusive holder is written to the file """
+
+    def __init__(self, path:str):
+        self.path = path
+        self.fd = None
+        self.shared = None
+
+
+    def acquire(self, **kargs):
+        """ Take lock. Returns False if it was not free within timeout (None - block until released, 0 - just check) """
+        shared = kargs.get('shared', False)
+        timeout = kargs.get('timeout')
+
+        if self.fd is not None: return True
+        if fcntl is None: return True # No advisory locks on this platform - rely on DB engines' own locking
+
+        try: self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            msg(FX_ERROR_IO, _('Error opening lock file %a: %b'), self.path, e)
+            return False
+
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            if timeout is None: fcntl.flock(self.fd, mode) # Kernel wakes us up right after release
+            else:
+                deadline = time.monotonic() + timeout
+                interval = 0.001
+                while True:
+                    try:
+                        fcntl.flock(self.fd, mode | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            self._close()
+                            return False
+                        time.sleep(min(interval, left))
+                        interval = min(interval * 2, FILE_LOCK_POLL_MAX)
+
+            if not shared:
+                os.ftruncate(self.fd, 0)
+                os.write(self.fd, str(os.getpid()).encode())
+
+        except OSError as e:
+            self._close()
+            msg(FX_ERROR_IO, _('Error locking file %a: %b'), self.path, e)
+            return False
+
+        self.shared = shared
+        return True
+
+
+    def release(self):
+        """ Release lock (if held) """
+        if self.fd is None: return 0
+        try: fcntl.flock(self.fd, fcntl.LOCK_UN)
+        except OSError: pass
+        self._close()
+        return 0
+
+    def _close(self):
+        try: os.close(self.fd)
+        except OSError: pass
+        self.fd, self.shared = None, None
+
+
+    def holder(self):
+        """ PID of last exclusive holder (None if unknown) """
+        try:
+            with open(self.path, 'r') as f: return scast(f.read().strip(), int, None)
+        except OSError: return None
+
+
+
+
 
 
 
@@ -334,8 +588,10 @@ class FeedexMainBus:
         
         # Cached DB data 
         self.__dict__['feeds_cache'] = None
+        self.__dict__['feeds_ix'] = self._index_feeds(None) # Lookup indexes for feeds cache (replaced together with it)
         self.__dict__['rules_cache'] = None
         self.__dict__['rules_val_cache'] = None
+        self.__dict__['rules_engine'] = None # Compiled rules for ranking
         self.__dict__['search_history_cache'] = None
         self.__dict__['flags_cache'] = None
         self.__dict__['terms_cache'] = None
@@ -350,6 +606,8 @@ class FeedexMainBus:
 
         self.__dict__['doc_count'] = None
 
+        self.__dict__['db_pool'] = None # Process-wide connection pool
+
         # Connection counter
         self.__dict__['conn_num'] = 0
 
@@ -376,7 +634,7 @@ class FeedexMainBus:
         self.__dict__['cli_param_error'] = False
 
         # Local DB locks
-        self.__dict__['db_lock'] = False
+        self.__dict__['db_lock'] = FeedexLock() # SQL access lock (shared for reading)
         self.__dict__['db_fetch_lock'] = False
         self.__dict__['db_entry_lock'] = False
         self.__dict__['db_feed_lock'] = False
@@ -402,11 +660,28 @@ class FeedexMainBus:
 
 
     def __setattr__(self, __name: str, __value) -> None:
-        """ Setter with lock """
+        """ Setter with lock. Feed lookup indexes are swapped together with feeds cache """
+        if __name == 'feeds_cache': feeds_ix = self._index_feeds(__value)
         self.lock.acquire()
         self.__dict__[__name] = __value
+        if __name == 'feeds_cache': self.__dict__['feeds_ix'] = feeds_ix
         self.lock.release()
 
+
+    def _index_feeds(self, feeds):
+        """ Build lookup indexes for feeds cache: id -> row, category name -> id, parent id -> child ids and url -> feed id (not deleted) """
+        feeds_ix = {'id':{}, 'cat_name':{}, 'children':{}, 'url':{}}
+        if feeds is None: return feeds_ix
+
+        id_ix, is_cat_ix, name_ix = FEEDS_SQL_TABLE.index('id'), FEEDS_SQL_TABLE.index('is_category'), FEEDS_SQL_TABLE.index('name')
+        parent_ix, url_ix, del_ix = FEEDS_SQL_TABLE.index('parent_id'), FEEDS_SQL_TABLE.index('url'), FEEDS_SQL_TABLE.index('deleted')
+        for f in feeds:
+            feeds_ix['id'][f[id_ix]] = f
+            if f[parent_ix] is not None: feeds_ix['children'].setdefault(f[parent_ix], []).append(f[id_ix])
+            if f[is_cat_ix] == 1: feeds_ix['cat_name'].setdefault(f[name_ix], f[id_ix])
+            elif f[url_ix] not in {None, '',} and f[del_ix] != 1: feeds_ix['url'].setdefault(f[url_ix], f[id_ix])
+        return feeds_ix
+
     # Connectors
     def connect_CLP(self, **kargs):
         if self.CLP is None: self.reconnect_CLP(**kargs)
@@ -726,44 +1001,45 @@ class FeedexMainBus:
         """ Return name of a IDd feed/category """
         with_id = kargs.get('with_id',True)
 
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('id')] == id:
-                name = coalesce(
-                f[FEEDS_SQL_TABLE.index('name')],
-                f[FEEDS_SQL_TABLE.index('title')],
-                f[FEEDS_SQL_TABLE.index('url')]
-                )
+        f = self.feeds_ix['id'].get(id)
+        if f is None: return '<???>'
+        name = coalesce(
+        f[FEEDS_SQL_TABLE.index('name')],
+        f[FEEDS_SQL_TABLE.index('title')],
+        f[FEEDS_SQL_TABLE.index('url')]
+        )
 
-                if name in {'',None}: name = f"""{id}"""
-                else:
-                    name = ellipsize(name, 200)
-                    if with_id: name = f"""{name} ({id})"""
-                return name
-        return '<???>'
+        if name in {'',None}: name = f"""{id}"""
+        else:
+            name = ellipsize(name, 200)
+            if with_id: name = f"""{name} ({id})"""
+        return name
 
 
     def load_feed(self, id):
         """ Loads feed to tuple """
         id = scast(id, int, -1)
         if id == -1: return -1
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('id')] == id and f[FEEDS_SQL_TABLE.index('is_category')] != 1: return f
+        f = self.feeds_ix['id'].get(id)
+        if f is not None and f[FEEDS_SQL_TABLE.index('is_category')] != 1: return f
         return -1
 
     def load_cat(self, id):
         """ Loads feed to tuple """
         id = scast(id, int, -1)
         if id == -1: return -1
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('id')] == id and f[FEEDS_SQL_TABLE.index('is_category')] == 1: return f
+        f = self.feeds_ix['id'].get(id)
+        if f is not None and f[FEEDS_SQL_TABLE.index('is_category')] == 1: return f
         return -1
     
     def load_parent(self, id):
         id = scast(id, int, -1)
         if id == -1: return -1
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('id')] == id: return f
-        return -1
+        return self.feeds_ix['id'].get(id, -1)
+
+    def get_feed_children(self, id):
+        """ Get IDs of feeds/categories with given parent """
+        return tuple(self.feeds_ix['children'].get(scast(id, int, -1), ()))
 
 
 
@@ -784,19 +1060,19 @@ class FeedexMainBus:
         """ resolves if name is a category """
         name = scast(name, str, None)
         if name is None: return None
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('is_category')] == 1:
-                if f[FEEDS_SQL_TABLE.index('name')] == name: return f[FEEDS_SQL_TABLE.index('id')]
-        return -1
+        return self.feeds_ix['cat_name'].get(name, -1)
+
+    def res_feed_url(self, url):
+        """ Resolves feed URL to id of a feed that is not deleted """
+        return self.feeds_ix['url'].get(scast(url, str, None), -1)
 
     def is_cat_feed(self, id):
         """ Checks if given id belongs to a category """
         id = scast(id, int, -1)
-        for f in self.feeds_cache:
-            if f[FEEDS_SQL_TABLE.index('id')] == id: 
-                if f[FEEDS_SQL_TABLE.index('is_category')] == 1: return 1
-                else: return 2
-        return -1
+        f = self.feeds_ix['id'].get(id)
+        if f is None: return -1
+        if f[FEEDS_SQL_TABLE.index('is_category')] == 1: return 1
+        return 2
 
     def is_flag(self, id):
         """ Check if given id belings to a flag """
@@ -855,7 +1131,6 @@ class FeedexMainBus:
     
         headers = {'User-Agent' : coalesce(kargs.get('user_agent', self.config.get('user_agent')), FEEDEX_USER_AGENT) }
         timeout = scast(kargs.get('timeout', self.config.get('fetch_timeout',0)), int, 0)
-        if timeout != 0: headers['timeout'] = timeout
 
         ofile = kargs.get('ofile')
         mimetypes = kargs.get('mimetypes', FEEDEX_IMAGE_MIMES)
@@ -864,7 +1139,8 @@ class FeedexMainBus:
 
         try:
             request = urllib.request.Request(url, None, headers)
-            response = urllib.request.urlopen(request)
+            if timeout != 0: response = urllib.request.urlopen(request, timeout=timeout)
+            else: response = urllib.request.urlopen(request)
 
             if response.status in {200, 201, 202, 203, 204, 205, 206}:
                 content_type = slist(scast(response.info().get('Content-Type'), str, '').split(';'), 0, '')
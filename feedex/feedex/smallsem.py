@@ -19,7 +19,6 @@
 
 
 
-import numpy as np
 import snowballstemmer
 import xapian
 
@@ -31,6 +30,8 @@ import re
 import chardet
 import pyphen
 
+from smallsem_model import load_model_header, load_model_data, SmallSemModelError, MODEL_EXT, PICKLE_MODEL_EXT
+
 
 
 
@@ -142,18 +143,27 @@ class SmallSem:
 
 
     def load_lings(self):
-        """ Load language headers """
+        """ Load language headers. Compact models are read lazily (see smallsem_model), pickled ones are a fallback """
         self.lings = []
         self.ling = {}
 
-        for f in os.listdir(self.models_path):
-            
+        loaded = set()
+        files = os.listdir(self.models_path)
+        for f in files:
+            if not f.endswith(MODEL_EXT): continue
             filename = os.path.join(self.models_path, f)
-            if not filename.endswith('_model.pkl'): continue
+            try: self.lings.append(load_model_header(filename))
+            except (OSError, SmallSemModelError) as e:
+                sys.stderr.write(f'Error loading {filename} file: {e}')
+                continue
+            loaded.add(f[:-len(MODEL_EXT)])
 
+        for f in files:
+            if not f.endswith(PICKLE_MODEL_EXT) or f[:-len(PICKLE_MODEL_EXT)] in loaded: continue
+            filename = os.path.join(self.models_path, f)
             try:
                 with open(filename, "rb") as ff: self.lings.append(pickle.load(ff))
-            except (OSError,) as e:
+            except (OSError, pickle.UnpicklingError) as e:
                 sys.stderr.write(f'Error loading {filename} file: {e}')
                 continue
 
@@ -161,6 +171,19 @@ class SmallSem:
 
 
 
+    def _load_model(self, h):
+        """ Make sure full model data is loaded and build lookup sets (once per model) """
+        if h.get('_sets') is None:
+            try: load_model_data(h)
+            except (OSError, SmallSemModelError) as e:
+                sys.stderr.write(f'Error loading {h.get("_file")} file: {e}')
+            sets = {}
+            for k in ('stops','swadesh','commons','commons_stemmed',): sets[k] = frozenset(h.get(k,()))
+            h['_sets'] = sets
+        return h['_sets']
+
+
+
     
 
     def _is_in_ling_names(self, name, name_list):
@@ -184,6 +207,7 @@ class SmallSem:
                 if h['names'][0] == self.get_model(): return name
                 
                 found = True
+                sets = self._load_model(h)
                 self.ling = h
                 model_id = h['names'][0]
                 
@@ -219,13 +243,13 @@ class SmallSem:
 
                 self.aliases = h.get('aliases',{})
                 self.divs = h.get('divs',self.DIVS)
-                self.stops = h.get('stops',())
+                self.stops = sets['stops']
                 self.punctation = h.get('punctation',self.PUNCTATIONS)
                 self.tok_repl = h.get('token_replacements',self.REPLACEMENTS)
                 self.sent_beg = h.get('sent_beg',self.SENT_BEG)
                 self.sent_end = h.get('sent_end',self.SENT_END)
-                self.commons = h.get('commons_stemmed',())
-                self.swadesh = h.get('swadesh',())
+                self.commons = sets['commons_stemmed']
+                self.swadesh = sets['swadesh']
  
                 self.writing_system = h.get('writing_system',1)
                 self.bicameral = h.get('bicameral',1)
@@ -299,13 +323,17 @@ class SmallSem:
     def tokenize_feat_gen(self, text, **kwargs):
         """ Token generator trimmed of trash and stops """
         
+        stems = {} # Stemming cache - tokens repeat a lot in longer texts
         for i,t in enumerate(self.tokenize_gen(self.feat_tokenizer, text)):
             
             if t in self.divs: continue
             if self._isnum(t): continue
 
             tok = t.lower()
-            stemmed = self.stemmer.stemWord(tok)
+            stemmed = stems.get(tok)
+            if stemmed is None:
+                stemmed = self.stemmer.stemWord(tok)
+                stems[tok] = stemmed
             
             if tok in self.stops or stemmed in self.stops: continue
 
@@ -337,6 +365,7 @@ class SmallSem:
 
     def _case(self, t:str):
         """ Check token's case and code it into (0,1,2)"""
+        case = 0
         if self.writing_system == 1:
             if t.islower(): case = 0
             elif t.isupper() and len(t) > 1: case = 2
@@ -494,26 +523,18 @@ class SmallSem:
 
 
         #######
-        # Next comes extracting important word pairs using coocurrence matrix. Not really necessary to do it with NymPy,
-        cooc_mx = np.zeros( (max(inv_vocab.keys())+1, max(inv_vocab.keys())+1) )
-        for k,v in vocab.items():
-            for i,t in enumerate(tokens):
-                if t['id'] == v[0] and i < doc_len-1:
-                    other_id = tokens[i+1]['id']
-                    cooc_mx[v[0]][other_id] += 1
-
-        ixs1, ixs2 = np.where(cooc_mx > 1) # Use 
+        # Next comes extracting important word pairs by counting adjacent token pairs in one pass (sparse co-occurrence)
+        ids = [t['id'] for t in tokens]
+        pair_freqs = {}
+        for pair in zip(ids, ids[1:]): pair_freqs[pair] = pair_freqs.get(pair, 0) + 1
 
         composites = []
-        for i in range(len(ixs1)):
-            t1 = inv_vocab[ixs1[i]][0]
-            t2 = inv_vocab[ixs2[i]][0]
-            t1_stem = self.stemmer.stemWord(t1.lower())
-            t2_stem = self.stemmer.stemWord(t2.lower())
-
+        for id1, id2 in sorted(p for p,fr in pair_freqs.items() if fr > 1): # Sorted, so order is the same as for dense matrix
+            t1, w1 = inv_vocab[id1]
+            t2, w2 = inv_vocab[id2]
             composites.append(
-            [f"""{t1} {t2}""", cooc_mx[ixs1[i]][ixs2[i]] * (inv_vocab[ixs1[i]][1]+inv_vocab[ixs2[i]][1])/2, # The weight of each pair is average of weights of components
-             f"""{t1_stem} {t2_stem}""",
+            [f"""{t1} {t2}""", pair_freqs[(id1, id2)] * (w1+w2)/2, # The weight of each pair is average of weights of components
+             f"""{token_freqs[t1][1]} {token_freqs[t2][1]}""", # Stems are already known
             ]
             )
         
@@ -624,17 +645,18 @@ class SmallSem:
         for l in self.lings:
             lname = l.get('names',[None])[0]
             freq_dist[lname] = 0
+            sets = self._load_model(l)
             if l.get('writing_system') == 1:
                 for t in tokens:
-                    if t in l.get('stops',()): freq_dist[lname] += 1
-                    elif t in l.get('swadesh',()): freq_dist[lname] += 1
-                    elif t in l.get('commons',()): freq_dist[lname] += 1
+                    if t in sets['stops']: freq_dist[lname] += 1
+                    elif t in sets['swadesh']: freq_dist[lname] += 1
+                    elif t in sets['commons']: freq_dist[lname] += 1
 
             elif l.get('writing_system') == 2:
                 for c in sample:
-                    if c in l.get('stops',()): freq_dist[lname] += 1
-                    elif c in l.get('swadesh',()): freq_dist[lname] += 1
-                    elif c in l.get('commons',()): freq_dist[lname] += 1
+                    if c in sets['stops']: freq_dist[lname] += 1
+                    elif c in sets['swadesh']: freq_dist[lname] += 1
+                    elif c in sets['commons']: freq_dist[lname] += 1
 
 
         max_fr = max(freq_dist.values())
@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#  Author: Karol Pałac (palac.karol@gmail.com)
+
+
+"""
+Compact binary format for SmallSem language models
+
+Layout (little endian):
+    magic           8 bytes     b'SSMODEL\\x00'
+    version         uint16
+    reserved        uint16
+    header length   uint32
+    header          JSON (UTF-8):   {'header' : {small fields needed to choose a model},
+                                     'sections' : {field : [type, offset, length, count]} }
+    sections        'strs' - string lists joined with NUL, 'json' - everything else. Offsets start after header
+
+Only the header is read when models are listed. Sections are read from memory-mapped file when model is used
+for the first time. Usage as a script converts pickled models: smallsem_model.py FILE_model.pkl [...]
+
+"""
+
+
+import os
+import sys
+import json
+import struct
+import mmap
+import pickle
+
+
+
+MODEL_MAGIC = b'SSMODEL\x00'
+MODEL_FORMAT_VERSION = 1
+MODEL_EXT = '_model.ssm'
+PICKLE_MODEL_EXT = '_model.pkl'
+
+_PREFIX = struct.Struct('<8sHHI')
+
+
+
+class SmallSemModelError(Exception):
+    """ Invalid or unsupported model file """
+    pass
+
+
+
+def _tuplify(val):
+    """ Restore tuples (JSON gives lists) """
+    if isinstance(val, list): return tuple([_tuplify(v) for v in val])
+    if isinstance(val, dict): return {k:_tuplify(v) for k,v in val.items()}
+    return val
+
+
+def _is_header_field(k, v):
+    return k == 'names' or v is None or type(v) in (str, int, float, bool)
+
+
+
+def save_model(model:dict, filename:str):
+    """ Write model to compact binary file """
+    header = {}
+    sections = {}
+    data = []
+    offset = 0
+    for k,v in model.items():
+        if _is_header_field(k, v):
+            header[k] = v
+            continue
+
+        if isinstance(v, (tuple, list, set, frozenset)) and all([type(s) is str for s in v]):
+            if any(['\x00' in s for s in v]): raise SmallSemModelError(f'Invalid character in {k} field')
+            tp, count, raw = 'strs', len(v), '\x00'.join(v).encode('utf-8')
+        else:
+            try: tp, count, raw = 'json', 1, json.dumps(v, ensure_ascii=False).encode('utf-8')
+            except (TypeError, ValueError) as e: raise SmallSemModelError(f'Field {k} can not be saved: {e}')
+
+        sections[k] = [tp, offset, len(raw), count]
+        data.append(raw)
+        offset += len(raw)
+
+    head = json.dumps({'header':header, 'sections':sections}, ensure_ascii=False).encode('utf-8')
+    tmp_file = f'{filename}.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(_PREFIX.pack(MODEL_MAGIC, MODEL_FORMAT_VERSION, 0, len(head)))
+        f.write(head)
+        for d in data: f.write(d)
+    os.replace(tmp_file, filename)
+    return 0
+
+
+
+def load_model_header(filename:str):
+    """ Read model header only. Full data is loaded later by load_model_data """
+    with open(filename, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size: raise SmallSemModelError(f'{filename} is not a model file')
+        magic, version, _, head_len = _PREFIX.unpack(prefix)
+        if magic != MODEL_MAGIC: raise SmallSemModelError(f'{filename} is not a model file')
+        if version > MODEL_FORMAT_VERSION: raise SmallSemModelError(f'{filename}: unsupported model format version ({version})')
+        try: head = json.loads(f.read(head_len).decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e: raise SmallSemModelError(f'{filename}: invalid header ({e})')
+
+    h = _tuplify(head.get('header',{}))
+    if type(h.get('names')) is not tuple or len(h['names']) == 0: raise SmallSemModelError(f'{filename}: model has no names')
+    h['_file'] = filename
+    h['_data_offset'] = _PREFIX.size + head_len
+    h['_sections'] = head.get('sections',{})
+    h['_loaded'] = False
+    return h
+
+
+
+def load_model_data(h:dict):
+    """ Load sections of a model whose header was read by load_model_header (does nothing for fully loaded models) """
+    if h.get('_loaded', True): return h
+    data = {}
+    with open(h['_file'], 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for k, (tp, offset, length, count) in h['_sections'].items():
+                beg = h['_data_offset'] + offset
+                raw = mm[beg:beg+length]
+                if len(raw) != length: raise SmallSemModelError(f'{h["_file"]}: file truncated')
+                try:
+                    if tp == 'strs':
+                        if count == 0: data[k] = ()
+                        else: data[k] = tuple(raw.decode('utf-8').split('\x00'))
+                    else: data[k] = _tuplify(json.loads(raw.decode('utf-8')))
+                except (UnicodeDecodeError, ValueError) as e: raise SmallSemModelError(f'{h["_file"]}: invalid field {k} ({e})')
+
+    h.update(data)
+    h['_loaded'] = True
+    return h
+
+
+
+
+if __name__ == '__main__':
+    # Convert pickled models given as arguments
+    for pkl_file in sys.argv[1:]:
+        with open(pkl_file, 'rb') as f: model = pickle.load(f)
+        out_file = pkl_file[:-len(PICKLE_MODEL_EXT)] + MODEL_EXT if pkl_file.endswith(PICKLE_MODEL_EXT) else f'{pkl_file}.ssm'
+        save_model(model, out_file)
+        print(f'{pkl_file} -> {out_file}')